@@ -0,0 +1 @@
+python3 bench/run.py "$@"
\ No newline at end of file
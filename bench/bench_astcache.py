@@ -0,0 +1,40 @@
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import corpus
+from astcache import ASTCache
+from block_markdown import iter_block_nodes
+
+def main():
+    pages = [corpus.markdown_page(1, number) for number in range(500)]
+    hashes = [hashlib.sha256(page.encode("utf-8")).hexdigest() for page in pages]
+
+    start = time.perf_counter()
+    trees = [list(iter_block_nodes(page.splitlines())) for page in pages]
+    parse = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = ASTCache(root)
+        start = time.perf_counter()
+        for number, (nodes, source_hash) in enumerate(zip(trees, hashes)):
+            cache.save(f"{number}.html", source_hash, nodes)
+        save = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for number, source_hash in enumerate(hashes):
+            cache.load(f"{number}.html", source_hash)
+        load = time.perf_counter() - start
+        size = sum(os.path.getsize(cache.path(f"{number}.html")) for number in range(len(pages)))
+
+    print(f"{len(pages)} pages, {size / len(pages):.0f} bytes per cached tree")
+    print(f"{'parse':>10} {parse:>8.3f} s")
+    print(f"{'save':>10} {save:>8.3f} s")
+    print(f"{'load':>10} {load:>8.3f} s  ({parse / load:.1f}x faster than parsing)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from gencontent import generate_page
+
+BLOCKS = """## Function {number}
+
+Calls **function {number}** with an _optional_ `argument` and returns a
+[reference](/api/{number}.html).
+
+- first parameter
+- second parameter
+
+```python
+result = function_{number}(argument)
+```
+
+"""
+
+def write_markdown(path, sections):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# API reference\n\n")
+        for number in range(sections):
+            f.write(BLOCKS.format(number=number))
+
+def main():
+    print(f"{'file (MB)':>10} {'seconds':>9} {'peak traced (KB)':>17}")
+    with tempfile.TemporaryDirectory() as root:
+        source = os.path.join(root, "api.md")
+        dest = os.path.join(root, "api.html")
+        for sections in (1_000, 10_000, 50_000):
+            write_markdown(source, sections)
+            size = os.path.getsize(source)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            generate_page(source, "<title>{{ Title }}</title>{{ Content }}", dest)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(f"{size / 1e6:>10.1f} {elapsed:>9.3f} {peak / 1e3:>17.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from build import build_site
+
+PAGE = """# Page {number}
+
+This is **page {number}** with an _italic_ word, some `inline code` and a
+[link](/pages/{next}.html) to the next page.
+
+## Details
+
+More text for page {number}, with an ![image](/images/{number}.png).
+"""
+
+def write_corpus(content_dir, pages):
+    for number in range(pages):
+        path = os.path.join(content_dir, "pages", f"{number}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(PAGE.format(number=number, next=number + 1))
+
+def timed_build(*args):
+    start = time.perf_counter()
+    result = build_site(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        content_dir = os.path.join(root, "content")
+        template_path = os.path.join(root, "template.html")
+        build_args = (content_dir, template_path, os.path.join(root, "public"), os.path.join(root, "manifest.json"))
+
+        write_corpus(content_dir, args.pages)
+        with open(template_path, "w", encoding="utf-8") as f:
+            f.write("<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>")
+
+        elapsed, result = timed_build(*build_args)
+        print(f"cold build:    {elapsed:8.3f}s  {result}")
+
+        elapsed, result = timed_build(*build_args)
+        print(f"no-op build:   {elapsed:8.3f}s  {result}")
+
+        with open(os.path.join(content_dir, "pages", "0.md"), "a", encoding="utf-8") as f:
+            f.write("\nAn edit.\n")
+        elapsed, result = timed_build(*build_args)
+        print(f"one-page edit: {elapsed:8.3f}s  {result}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+from html import escape
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import corpus
+from escaping import needs_escape
+from inline_markdown import text_to_textnodes
+from textnode import INLINE_HTML_FORMATS, TextType, text_nodes_to_html
+
+def naive_text_nodes_to_html(text_nodes):
+    # Every leaf through html.escape, text and attributes alike.
+    parts = []
+    for text_node in text_nodes:
+        if text_node.text_type is TextType.TEXT:
+            parts.append(escape(text_node.text, quote=False))
+            continue
+        if text_node.text_type is TextType.IMAGE:
+            text = escape(text_node.text)
+        else:
+            text = escape(text_node.text, quote=False)
+        url = text_node.url
+        if url is not None:
+            url = escape(url)
+        parts.append(INLINE_HTML_FORMATS[text_node.text_type].format(text, url))
+    return "".join(parts)
+
+def paragraphs(count=2000):
+    return [
+        corpus.inline_heavy_text(seed, sentences=3) + corpus.link_heavy_text(seed, links=3)
+        for seed in range(count)
+    ]
+
+def best_of(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main():
+    clean = paragraphs()
+    # Every fourth paragraph has something that needs escaping.
+    special = [
+        paragraph.replace(" ", " & <", 1) if number % 4 == 0 else paragraph
+        for number, paragraph in enumerate(clean)
+    ]
+
+    print(f"{'corpus':>8} {'html.escape (s)':>16} {'per node (s)':>13} {'per paragraph (s)':>18}")
+    for name, texts in (("clean", clean), ("special", special)):
+        parsed = [(paragraph, text_to_textnodes(paragraph)) for paragraph in texts]
+        for paragraph, nodes in parsed:
+            expected = naive_text_nodes_to_html(nodes)
+            if text_nodes_to_html(nodes) != expected or text_nodes_to_html(nodes, needs_escape(paragraph)) != expected:
+                raise AssertionError("escaping output differs from html.escape")
+
+        naive = best_of(lambda: [naive_text_nodes_to_html(nodes) for _, nodes in parsed])
+        per_node = best_of(lambda: [text_nodes_to_html(nodes) for _, nodes in parsed])
+        per_paragraph = best_of(
+            lambda: [text_nodes_to_html(nodes, needs_escape(paragraph)) for paragraph, nodes in parsed]
+        )
+        print(f"{name:>8} {naive:>16.4f} {per_node:>13.4f} {per_paragraph:>18.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from highlight import HighlightCache, highlight
+
+SNIPPET = '''@cache
+def function_{number}(argument, count={number}):
+    """Return the {number}th value."""
+    # Loop until the count runs out.
+    values = [argument * index for index in range(count)]
+    return sum(values) + len("{number}")
+'''
+
+def main():
+    jobs = os.cpu_count() or 1
+    snippets = [("python", SNIPPET.format(number=number)) for number in range(5000)]
+
+    start = time.perf_counter()
+    for language, code in snippets:
+        highlight(code, language)
+    uncached = time.perf_counter() - start
+
+    cache = HighlightCache()
+    start = time.perf_counter()
+    cache.warm(snippets, jobs)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for language, code in snippets:
+        cache.render(code, language)
+    warm = time.perf_counter() - start
+
+    print(f"{len(snippets)} snippets, {jobs} jobs")
+    print(f"{'uncached':>10} {uncached:>8.3f} s")
+    print(f"{'cold':>10} {cold:>8.3f} s")
+    print(f"{'cached':>10} {warm:>8.3f} s  ({cache.hit_rate:.0%} hit rate)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inline_markdown import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+from textnode import TextNode, TextType
+
+SENTENCE = (
+    "This is **bold** text with an _italic_ word, some `inline code`, "
+    "an ![image](https://example.com/img.png) and a [link](https://example.com). "
+)
+
+def chained_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+def best_of(func, text, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main():
+    print(f"{'sentences':>10} {'chained (s)':>12} {'single (s)':>12} {'speedup':>8}")
+    for count in (10, 100, 1000, 5000):
+        text = SENTENCE * count
+        if chained_text_to_textnodes(text) != text_to_textnodes(text):
+            raise AssertionError("text_to_textnodes output differs from chained passes")
+
+        chained = best_of(chained_text_to_textnodes, text)
+        single = best_of(text_to_textnodes, text)
+        print(f"{count:>10} {chained:>12.5f} {single:>12.5f} {chained / single:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
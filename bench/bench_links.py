@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inline_markdown import split_nodes_image, split_nodes_link
+from textnode import TextNode, TextType
+
+def best_of(func, nodes, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(nodes)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main():
+    print(f"{'per paragraph':>14} {'function':>18} {'total (s)':>11} {'ns/match':>10}")
+    for count in (1, 100, 10000):
+        links = TextNode("see [docs](https://example.com/docs) and " * count, TextType.TEXT)
+        images = TextNode("see ![logo](https://example.com/logo.png) and " * count, TextType.TEXT)
+
+        for name, func, node in (
+            ("split_nodes_link", split_nodes_link, links),
+            ("split_nodes_image", split_nodes_image, images),
+        ):
+            elapsed = best_of(func, [node])
+            print(f"{count:>14} {name:>18} {elapsed:>11.5f} {elapsed / count * 1e9:>10.0f}")
+
+if __name__ == "__main__":
+    main()
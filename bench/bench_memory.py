@@ -0,0 +1,76 @@
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+PARAGRAPHS = 100_000
+
+# Dict-backed copies of the node classes as they were before __slots__, so
+# both layouts can be measured side by side in one process.
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+class DictLeafNode(DictHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, None, props)
+
+class DictParentNode(DictHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+def build_corpus(text_cls, leaf_cls, parent_cls):
+    # Strings are shared across paragraphs so only node overhead is measured.
+    text_nodes = []
+    paragraphs = []
+    for _ in range(PARAGRAPHS):
+        text_nodes.append(text_cls("This is ", TextType.TEXT))
+        text_nodes.append(text_cls("bold", TextType.BOLD))
+        text_nodes.append(text_cls(" and a ", TextType.TEXT))
+        text_nodes.append(text_cls("link", TextType.LINK, "https://example.com"))
+        children = [
+            leaf_cls(None, "This is "),
+            leaf_cls("b", "bold"),
+            leaf_cls(None, " and a "),
+            leaf_cls("a", "link"),
+        ]
+        paragraphs.append(parent_cls("p", children))
+    return text_nodes, paragraphs
+
+def measure(text_cls, leaf_cls, parent_cls):
+    gc.collect()
+    tracemalloc.start()
+    corpus = build_corpus(text_cls, leaf_cls, parent_cls)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    text_nodes, paragraphs = corpus
+    node_count = len(text_nodes) + len(paragraphs) * 5
+    del corpus, text_nodes, paragraphs
+    gc.collect()
+    return current, node_count
+
+def main():
+    print(f"{'layout':>8} {'nodes':>10} {'total (MB)':>11} {'bytes/node':>11}")
+    for name, classes in (
+        ("dict", (DictTextNode, DictLeafNode, DictParentNode)),
+        ("slots", (TextNode, LeafNode, ParentNode)),
+    ):
+        total, node_count = measure(*classes)
+        print(f"{name:>8} {node_count:>10} {total / 1e6:>11.1f} {total / node_count:>11.1f}")
+
+if __name__ == "__main__":
+    main()
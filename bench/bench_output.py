@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import corpus
+from build import build_site, find_files
+from output import remove_site
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Time cold and no-op builds through the staged output writer")
+    parser.add_argument("--pages", type=int, default=20000, help="size of the generated site")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="worker processes for rendering")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, template_path = corpus.write_site(root, args.pages)
+        dest_dir = os.path.join(root, "public")
+        manifest_path = os.path.join(root, "manifest.json")
+
+        def build():
+            return build_site(content_dir, template_path, dest_dir, manifest_path, jobs=args.jobs)
+
+        result, cold = timed(build)
+        print(f"{'cold':>10} {cold:>8.3f} s  {len(result.written)} pages written")
+
+        result, noop = timed(build)
+        print(f"{'no-op':>10} {noop:>8.3f} s  {len(result.written)} pages written")
+
+        # Trailing blank lines change every source but no page, so every
+        # page is rendered again and none is written.
+        for source in find_files(content_dir, ".md"):
+            with open(os.path.join(content_dir, source), "a", encoding="utf-8") as f:
+                f.write("\n\n")
+        result, same = timed(build)
+        print(f"{'unchanged':>10} {same:>8.3f} s  {len(result.rebuilt)} pages rendered, {len(result.written)} written")
+
+        remove_site(dest_dir)
+        os.remove(manifest_path)
+
+if __name__ == "__main__":
+    main()
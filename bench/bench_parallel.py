@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_build import write_corpus
+from build import build_site
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs available")
+    print(f"{'jobs':>5} {'seconds':>9} {'pages/sec':>10}")
+
+    with tempfile.TemporaryDirectory() as root:
+        content_dir = os.path.join(root, "content")
+        template_path = os.path.join(root, "template.html")
+        write_corpus(content_dir, args.pages)
+        with open(template_path, "w", encoding="utf-8") as f:
+            f.write("<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>")
+
+        for jobs in (1, 2, 4, 8):
+            dest_dir = os.path.join(root, f"public-{jobs}")
+            manifest_path = os.path.join(root, f"manifest-{jobs}.json")
+            start = time.perf_counter()
+            build_site(content_dir, template_path, dest_dir, manifest_path, force=True, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            print(f"{jobs:>5} {elapsed:>9.3f} {args.pages / elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import corpus
+from build import find_files, hash_file, output_path_for, read_title
+from search import update_search_index
+
+def manifest_pages(content_dir):
+    # The fields update_search_index reads from the build manifest, without
+    # rendering the whole site first.
+    pages = {}
+    for source in find_files(content_dir, ".md"):
+        path = os.path.join(content_dir, source)
+        pages[source] = {"source": hash_file(path), "output": output_path_for(source), "title": read_title(path)}
+    return pages
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def peak_memory(func):
+    # Traced separately: tracemalloc slows everything down several times.
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Time building and updating the search index")
+    parser.add_argument("--pages", type=int, default=2000, help="size of the generated site")
+    parser.add_argument("--edits", type=int, default=10, help="pages changed before the incremental update")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, _ = corpus.write_site(root, args.pages)
+        dest_dir = os.path.join(root, "public")
+        state = os.path.join(root, "search.json")
+        pages = manifest_pages(content_dir)
+
+        result, cold = timed(lambda: update_search_index(content_dir, dest_dir, pages, state))
+        index_dir = os.path.join(dest_dir, "search")
+        size = sum(os.path.getsize(os.path.join(index_dir, name)) for name in os.listdir(index_dir))
+        os.remove(state)
+        cold_peak = peak_memory(lambda: update_search_index(content_dir, dest_dir, pages, state))
+        print(f"{args.pages} pages, {len(result.shards)} shards, {size / 1_000_000:.1f} MB")
+        print(f"{'cold':>12} {cold:>8.3f} s  peak {cold_peak / 1_000_000:.1f} MB")
+
+        _, noop = timed(lambda: update_search_index(content_dir, dest_dir, pages, state))
+        print(f"{'no-op':>12} {noop:>8.3f} s")
+
+        for number in range(args.edits):
+            path = os.path.join(content_dir, "pages", str(number % 100), f"{number}.md")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(f"\n\nEdited paragraph {number}.\n")
+        pages = manifest_pages(content_dir)
+        result, incremental = timed(lambda: update_search_index(content_dir, dest_dir, pages, state))
+        print(f"{'incremental':>12} {incremental:>8.3f} s  ({len(result.shards)} shards rewritten)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from template import compile_template
+
+def layout(size):
+    # A realistic layout: a large head and navigation around the content.
+    navigation = "".join(f'<li><a href="/pages/{number}.html">Page {number}</a></li>' for number in range(size))
+    return (
+        "<!doctype html><html><head><title>{{ Title }}</title></head>"
+        f"<body><nav><ul>{navigation}</ul></nav><article>{{{{ Content }}}}</article></body></html>"
+    )
+
+def replace_render(template, title, content):
+    return template.replace("{{ Title }}", title).replace("{{ Content }}", content)
+
+def best_of(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main():
+    pages = 1000
+    content = "<p>Some page content.</p>" * 50
+    print(f"{'nav links':>10} {'replace (s)':>12} {'compiled (s)':>13} {'speedup':>8}")
+    for size in (10, 100, 1000):
+        text = layout(size)
+        template = compile_template(text)
+        values = {"Title": "Page", "Content": content}
+        if replace_render(text, "Page", content) != template.render(values):
+            raise AssertionError("compiled template output differs from str.replace")
+
+        replaced = best_of(lambda: [replace_render(text, "Page", content) for _ in range(pages)])
+        compiled = best_of(lambda: [template.render(values) for _ in range(pages)])
+        print(f"{size:>10} {replaced:>12.4f} {compiled:>13.4f} {replaced / compiled:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import random
+
+WORDS = (
+    "static site generator markdown parser node tree render page template "
+    "content build cache link image paragraph heading list quote code block"
+).split()
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def inline_heavy_text(seed=1, sentences=2000):
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(sentences):
+        parts.append(
+            f"{words(rng, 4)} **{words(rng, 2)}** {words(rng, 3)} _{words(rng, 1)}_ "
+            f"`{words(rng, 2)}` {words(rng, 5)}. "
+        )
+    return "".join(parts)
+
+def link_heavy_text(seed=2, links=2000):
+    rng = random.Random(seed)
+    parts = []
+    for number in range(links):
+        if number % 3 == 0:
+            parts.append(f"{words(rng, 3)} ![{words(rng, 2)}](/images/{number}.png) ")
+        else:
+            parts.append(f"{words(rng, 3)} [{words(rng, 2)}](/pages/{number}.html) ")
+    return "".join(parts)
+
+def page_url(number):
+    return f"/pages/{number % 100}/{number}.html"
+
+def markdown_page(seed, number, sections=6, pages=1000):
+    rng = random.Random(seed * 100_003 + number)
+    blocks = [f"# Page {number}"]
+    for section in range(sections):
+        blocks.append(f"## {words(rng, 3).title()}")
+        blocks.append(
+            f"{words(rng, 8)} **{words(rng, 2)}** {words(rng, 6)} _{words(rng, 2)}_\n"
+            f"{words(rng, 5)} [{words(rng, 2)}]({page_url(rng.randrange(pages))}) `{words(rng, 1)}`."
+        )
+        blocks.append("\n".join(f"- {words(rng, 4)}" for _ in range(3)))
+        if section % 2 == 0:
+            blocks.append(f"```python\nvalue = {rng.randrange(100)}\nprint(value)\n```")
+        else:
+            blocks.append(f"> {words(rng, 10)}\n> {words(rng, 6)}")
+    return "\n\n".join(blocks) + "\n"
+
+def large_markdown(seed=3, pages=50):
+    return "".join(markdown_page(seed, number) for number in range(pages))
+
+TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+
+def write_site(root, pages, seed=4):
+    content_dir = os.path.join(root, "content")
+    for number in range(pages):
+        path = os.path.join(content_dir, "pages", str(number % 100), f"{number}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markdown_page(seed, number, pages=pages))
+
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, "w", encoding="utf-8") as f:
+        f.write(TEMPLATE)
+
+    return content_dir, template_path
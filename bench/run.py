@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import corpus
+from block_markdown import markdown_to_html_node
+from build import build_site
+from htmlnode import LeafNode, ParentNode
+from inline_markdown import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+from output import remove_site
+from template import compile_template
+from textnode import TextNode, TextType, text_node_to_html_node, text_nodes_to_html
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def calibrate(func):
+    # Returns a timer for func and how many calls make up one sample: as
+    # many as it takes to run for at least 0.2 s (timeit's autorange), so
+    # benchmarks that finish in a few milliseconds aren't at the mercy of
+    # timer and scheduler noise. The garbage collector stays on, since
+    # allocation-heavy stages pay for it in real builds too.
+    timer = timeit.Timer(func, setup="gc.enable()")
+    number, _ = timer.autorange()
+    return timer, number
+
+def deep_tree(depth):
+    node = LeafNode("b", "leaf")
+    for _ in range(depth):
+        node = ParentNode("span", [LeafNode(None, "text "), node])
+    return node
+
+def wide_tree(paragraphs):
+    children = []
+    for number in range(paragraphs):
+        children.append(ParentNode("p", [
+            LeafNode(None, "Some text with "),
+            LeafNode("b", "bold"),
+            LeafNode("a", "a link", {"href": f"/pages/{number}.html"}),
+        ]))
+    return ParentNode("div", children)
+
+def stage_benchmarks():
+    inline_text = corpus.inline_heavy_text()
+    link_text = corpus.link_heavy_text()
+    markdown = corpus.large_markdown()
+    inline_nodes = text_to_textnodes(inline_text + link_text)
+    deep = deep_tree(5000)
+    wide = wide_tree(5000)
+    layout = compile_template(corpus.TEMPLATE)
+    page = {"Title": "Page", "Content": "<p>content</p>" * 50}
+
+    def delimiters():
+        nodes = [TextNode(inline_text, TextType.TEXT)]
+        nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+        nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+        split_nodes_delimiter(nodes, "`", TextType.CODE)
+
+    def images_and_links():
+        split_nodes_link(split_nodes_image([TextNode(link_text, TextType.TEXT)]))
+
+    return {
+        "split_nodes_delimiter": delimiters,
+        "split_nodes_image_link": images_and_links,
+        "text_to_textnodes": lambda: text_to_textnodes(inline_text + link_text),
+        "text_node_to_html_node": lambda: [text_node_to_html_node(node).to_html() for node in inline_nodes],
+        "text_nodes_to_html": lambda: text_nodes_to_html(inline_nodes),
+        "parent_to_html_deep": deep.to_html,
+        "parent_to_html_wide": wide.to_html,
+        "markdown_to_html_node": lambda: markdown_to_html_node(markdown).to_html(),
+        "template_render": lambda: [layout.render(page) for _ in range(1000)],
+    }
+
+def build_benchmarks(root, pages):
+    content_dir, template_path = corpus.write_site(root, pages)
+    dest_dir = os.path.join(root, "public")
+    manifest_path = os.path.join(root, "manifest.json")
+
+    def cold():
+        remove_site(dest_dir)
+        build_site(content_dir, template_path, dest_dir, manifest_path, force=True)
+
+    def noop():
+        build_site(content_dir, template_path, dest_dir, manifest_path)
+
+    return {"build_cold": cold, "build_noop": noop}
+
+def run(pages, repeat):
+    # Samples are taken round-robin rather than one benchmark at a time, so
+    # a slow stretch of a busy machine costs every benchmark one sample
+    # instead of all of one benchmark's. The median is kept: the best
+    # sample is a lucky outlier as often as not, and one in a baseline
+    # makes every later run look like a regression.
+    samples = {}
+    with tempfile.TemporaryDirectory() as root:
+        benchmarks = stage_benchmarks()
+        benchmarks.update(build_benchmarks(root, pages))
+        timers = {name: calibrate(func) for name, func in benchmarks.items()}
+        for _ in range(repeat):
+            for name, (timer, number) in timers.items():
+                samples.setdefault(name, []).append(timer.timeit(number) / number)
+    results = {name: statistics.median(times) for name, times in samples.items()}
+    for name, seconds in results.items():
+        print(f"{name:>24} {seconds * 1000:>10.2f} ms")
+    return results
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, seconds in results.items():
+        expected = baseline.get(name)
+        if expected is not None and seconds > expected * (1 + tolerance):
+            regressions.append((name, expected, seconds))
+    return regressions
+
+def minor_version(version):
+    return ".".join(version.split(".")[:2])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the markdown-to-HTML pipeline")
+    parser.add_argument("--pages", type=int, default=1000, help="pages in the synthetic build corpus")
+    parser.add_argument("--repeat", type=int, default=7, help="samples per benchmark, each at least 0.2 s long; the median is kept")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args()
+
+    results = run(args.pages, args.repeat)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "pages": args.pages,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    # Timings from another interpreter or another kind of machine say
+    # nothing about this change, so they're not compared at all.
+    current = {"python": minor_version(report["python"]), "machine": report["machine"]}
+    recorded = {"python": minor_version(baseline.get("python", "")), "machine": baseline.get("machine")}
+    for key in current:
+        if recorded[key] != current[key]:
+            print(f"baseline was recorded with {key} {recorded[key]}, this is {current[key]}; run with --update-baseline here instead")
+            return 1
+
+    if baseline.get("pages") != args.pages:
+        print(f"baseline was recorded with --pages {baseline.get('pages')}; build timings are not comparable")
+        return 1
+
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"\nPERFORMANCE REGRESSION (more than {args.tolerance:.0%} slower than baseline):")
+        for name, expected, seconds in regressions:
+            print(f"  {name}: {expected * 1000:.2f} ms -> {seconds * 1000:.2f} ms ({seconds / expected - 1:+.0%})")
+        return 1
+
+    print(f"\nno regressions against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
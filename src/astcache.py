@@ -0,0 +1,287 @@
+import mmap
+import os
+import struct
+
+from block_markdown import iter_block_nodes
+from highlight import HIGHLIGHTER_VERSION
+from htmlnode import LeafNode, ParentNode, RawLeafNode
+from inline_cache import INLINE_CACHE_VERSION
+from linkcheck import PageIndex
+from textnode import TextNode, TextType
+
+# Bump when the encoding below changes. The inline and highlighter versions
+# are written alongside it, since a tree holds their rendered output, so a
+# change to either parser invalidates every cached tree too.
+AST_FORMAT_VERSION = 2
+AST_MAGIC = b"SSGA"
+
+# magic, format version, inline version, highlighter version, sha256 of
+# the source the tree was parsed from, number of strings
+HEADER = struct.Struct("<4sHHH32sI")
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+
+LEAF = 0
+RAW_LEAF = 1
+PARENT = 2
+TEXT = 3
+LIST = 4
+
+# The tags the block parser produces, stored as one byte. Anything else is
+# TAG_STRING followed by a string reference; 0 is no tag.
+TAGS = (
+    None, "div", "p", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "code", "blockquote",
+    "ul", "ol", "li", "a", "img", "b", "i", "span",
+)
+TAG_IDS = {tag: number for number, tag in enumerate(TAGS)}
+TAG_STRING = 255
+
+TEXT_TYPES = tuple(TextType)
+TEXT_TYPE_IDS = {text_type: number for number, text_type in enumerate(TEXT_TYPES)}
+
+class StringTable:
+    # Every distinct string is stored once and referred to by index + 1,
+    # leaving 0 for None.
+    def __init__(self):
+        self.indexes = {}
+
+    def ref(self, value):
+        if value is None:
+            return 0
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.indexes) + 1
+        return index
+
+def encode_tag(out, tag, strings):
+    number = TAG_IDS.get(tag)
+    if number is not None:
+        out += U8.pack(number)
+    else:
+        out += U8.pack(TAG_STRING)
+        out += U32.pack(strings.ref(tag))
+
+def encode_props(out, props, strings):
+    items = props.items() if props else ()
+    out += U16.pack(len(items))
+    for key, value in items:
+        out += U32.pack(strings.ref(key))
+        out += U32.pack(strings.ref(str(value)))
+
+def encode_nodes(nodes, source_hash):
+    # Returns the encoded form of a list of HTMLNode trees, TextNodes, or
+    # lists of either. Children, and list items, follow their parent,
+    # prefixed by how many there are. Like
+    # iter_html, the walk uses an explicit stack rather than recursion.
+    strings = StringTable()
+    body = bytearray(U32.pack(len(nodes)))
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, TextNode):
+            body += U8.pack(TEXT)
+            body += U8.pack(TEXT_TYPE_IDS[node.text_type])
+            body += U32.pack(strings.ref(node.text))
+            body += U32.pack(strings.ref(node.url))
+        elif isinstance(node, RawLeafNode):
+            body += U8.pack(RAW_LEAF)
+            body += U32.pack(strings.ref(node.value))
+        elif isinstance(node, LeafNode):
+            body += U8.pack(LEAF)
+            encode_tag(body, node.tag, strings)
+            encode_props(body, node.props, strings)
+            body += U32.pack(strings.ref(node.value))
+        elif isinstance(node, ParentNode):
+            children = node.children or []
+            body += U8.pack(PARENT)
+            encode_tag(body, node.tag, strings)
+            encode_props(body, node.props, strings)
+            body += U32.pack(len(children))
+            stack.extend(reversed(children))
+        elif isinstance(node, list):
+            body += U8.pack(LIST)
+            body += U32.pack(len(node))
+            stack.extend(reversed(node))
+        else:
+            raise ValueError(f"invalid AST: cannot encode {type(node).__name__}")
+
+    out = bytearray(HEADER.pack(
+        AST_MAGIC, AST_FORMAT_VERSION, INLINE_CACHE_VERSION, HIGHLIGHTER_VERSION,
+        bytes.fromhex(source_hash), len(strings.indexes),
+    ))
+    for value in strings.indexes:
+        data = value.encode("utf-8")
+        out += U32.pack(len(data))
+        out += data
+    out += body
+    return bytes(out)
+
+def read_header(buffer):
+    # Returns (source hash, number of strings), or None if the buffer was
+    # written by another version of the format or the parsers.
+    if len(buffer) < HEADER.size:
+        return None
+    magic, version, inline_version, highlighter_version, digest, count = HEADER.unpack_from(buffer, 0)
+    if (
+        magic != AST_MAGIC
+        or version != AST_FORMAT_VERSION
+        or inline_version != INLINE_CACHE_VERSION
+        or highlighter_version != HIGHLIGHTER_VERSION
+    ):
+        return None
+    return digest.hex(), count
+
+def decode_nodes(buffer):
+    header = read_header(buffer)
+    if header is None:
+        raise ValueError("invalid AST: unknown format or version")
+
+    offset = HEADER.size
+    strings = [None]
+    for _ in range(header[1]):
+        (length,) = U32.unpack_from(buffer, offset)
+        offset += 4
+        strings.append(str(buffer[offset:offset + length], "utf-8"))
+        offset += length
+
+    def read_tag():
+        nonlocal offset
+        number = buffer[offset]
+        offset += 1
+        if number != TAG_STRING:
+            return TAGS[number]
+        (ref,) = U32.unpack_from(buffer, offset)
+        offset += 4
+        return strings[ref]
+
+    def read_props():
+        nonlocal offset
+        (count,) = U16.unpack_from(buffer, offset)
+        offset += 2
+        if not count:
+            return None
+        props = {}
+        for _ in range(count):
+            key, value = struct.unpack_from("<II", buffer, offset)
+            offset += 8
+            props[strings[key]] = strings[value]
+        return props
+
+    (count,) = U32.unpack_from(buffer, offset)
+    offset += 4
+    roots = []
+    # Each entry is a list still being filled and how many nodes it lacks.
+    stack = [[roots, count]]
+    while stack:
+        top = stack[-1]
+        if not top[1]:
+            stack.pop()
+            continue
+        top[1] -= 1
+
+        kind = buffer[offset]
+        offset += 1
+        if kind == TEXT:
+            text_type = TEXT_TYPES[buffer[offset]]
+            text, url = struct.unpack_from("<II", buffer, offset + 1)
+            offset += 9
+            node = TextNode(strings[text], text_type, strings[url])
+        elif kind == RAW_LEAF:
+            (value,) = U32.unpack_from(buffer, offset)
+            offset += 4
+            node = RawLeafNode(strings[value])
+        elif kind == LEAF:
+            tag = read_tag()
+            props = read_props()
+            (value,) = U32.unpack_from(buffer, offset)
+            offset += 4
+            node = LeafNode(tag, strings[value], props)
+        elif kind == PARENT:
+            tag = read_tag()
+            props = read_props()
+            (children,) = U32.unpack_from(buffer, offset)
+            offset += 4
+            node = ParentNode(tag, [], props)
+            stack.append([node.children, children])
+        elif kind == LIST:
+            (items,) = U32.unpack_from(buffer, offset)
+            offset += 4
+            node = []
+            stack.append([node, items])
+        else:
+            raise ValueError(f"invalid AST: unknown node kind {kind}")
+        top[0].append(node)
+
+    return roots
+
+class ASTCache:
+    # Parsed blocks of each page, one file per page under directory, keyed
+    # by output path and stamped with the hash of their source. Each block
+    # is its node tree and the TextNodes of its inline markdown, as
+    # PageIndex keeps them. Rendering saves them as a side effect; anything
+    # that needs a page's content later, such as the search index, loads
+    # them instead of parsing the markdown again. The TextNodes are stored
+    # as parsed; the trees as the page rendered them, with the titles of
+    # empty links and image sizes filled in.
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"ASTCache({self.directory!r}, hits={self.hits}, misses={self.misses})"
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".ast")
+
+    def save(self, key, source_hash, nodes):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encode_nodes(nodes, source_hash))
+        os.replace(tmp_path, path)
+
+    def load(self, key, source_hash):
+        # Returns the cached nodes, or None if there are none for this
+        # version of the source.
+        try:
+            f = open(self.path(key), "rb")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                self.misses += 1
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                header = read_header(buffer)
+                if header is None or header[0] != source_hash:
+                    self.misses += 1
+                    return None
+                nodes = decode_nodes(buffer)
+
+        self.hits += 1
+        return nodes
+
+    def remove(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def page_nodes(self, key, source_path, source_hash, inline_cache=None, highlight_cache=None):
+        # The [node, inline TextNode lists] of each block of a page, parsed
+        # and cached if they weren't.
+        nodes = self.load(key, source_hash)
+        if nodes is None:
+            page_index = PageIndex(keep_nodes=True)
+            with open(source_path, encoding="utf-8") as f:
+                for _ in iter_block_nodes(f, inline_cache, highlight_cache, page_index):
+                    pass
+            nodes = page_index.nodes
+            self.save(key, source_hash, nodes)
+        return nodes
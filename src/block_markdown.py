@@ -0,0 +1,259 @@
+from enum import Enum
+
+from escaping import needs_escape
+from highlight import highlight
+from htmlnode import LeafNode, ParentNode, RawLeafNode
+from inline_markdown import text_to_textnodes
+from patterns import compiled
+from textnode import CONTEXT_TEXT_TYPES, PageContext, text_nodes_to_html
+
+class BlockType(Enum):
+    PARAGRAPH = "paragraph"
+    HEADING = "heading"
+    CODE = "code"
+    QUOTE = "quote"
+    UNORDERED_LIST = "unordered_list"
+    ORDERED_LIST = "ordered_list"
+
+CODE_FENCE = "```"
+
+def iter_blocks(lines):
+    # Consumes lines one at a time and yields each block as soon as it is
+    # complete, so only the current block is ever held in memory. Blank
+    # lines separate blocks, except inside a fenced code block.
+    block = []
+    in_code = False
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+
+        if in_code:
+            block.append(line)
+            if line.rstrip().endswith(CODE_FENCE):
+                yield "\n".join(block).strip()
+                block = []
+                in_code = False
+            continue
+
+        if line.strip() == "":
+            if block:
+                yield "\n".join(block).strip()
+                block = []
+            continue
+
+        if not block and line.lstrip().startswith(CODE_FENCE):
+            stripped = line.strip()
+            if len(stripped) >= 2 * len(CODE_FENCE) and stripped.endswith(CODE_FENCE):
+                yield stripped
+                continue
+            in_code = True
+
+        block.append(line)
+
+    if block:
+        yield "\n".join(block).strip()
+
+def markdown_to_blocks(markdown):
+    return list(iter_blocks(markdown.splitlines()))
+
+def heading_level(block):
+    level = len(block) - len(block.lstrip("#"))
+    if 1 <= level <= 6 and block[level:level + 1] == " ":
+        return level
+    return 0
+
+def is_ordered_list(lines):
+    for number, line in enumerate(lines, start=1):
+        if not line.startswith(f"{number}. "):
+            return False
+    return True
+
+def block_to_block_type(block):
+    if heading_level(block):
+        return BlockType.HEADING
+
+    if len(block) >= 2 * len(CODE_FENCE) and block.startswith(CODE_FENCE) and block.endswith(CODE_FENCE):
+        return BlockType.CODE
+
+    lines = block.split("\n")
+
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE
+
+    if all(line.startswith("- ") or line.startswith("* ") for line in lines):
+        return BlockType.UNORDERED_LIST
+
+    if is_ordered_list(lines):
+        return BlockType.ORDERED_LIST
+
+    return BlockType.PARAGRAPH
+
+def parse_inline(text, inline_cache=None):
+    # A fragment of inline markdown: the text, its TextNodes and, when it
+    # comes from the cache, its HTML. Parsed once, it serves both the HTML
+    # and the page index.
+    if inline_cache is not None:
+        return inline_cache.lookup(text)
+    return text, text_to_textnodes(text), None
+
+def fragment_to_children(fragment, context=None):
+    # Inline markup is rendered, and escaped, straight to an HTML fragment.
+    # Cached HTML is used unless the page context changes the fragment's
+    # links or images, or minifies their attributes.
+    text, text_nodes, html = fragment
+    if html is None or (
+        context is not None and any(node.text_type in CONTEXT_TEXT_TYPES for node in text_nodes)
+    ):
+        minify = context is not None and context.minify
+        html = text_nodes_to_html(text_nodes, needs_escape(text), context, minify)
+    return [RawLeafNode(html)]
+
+SLUG_STRIP_PATTERN = r"[^\w\s-]"
+
+def heading_id(text_nodes):
+    # A GitHub-style slug of the heading's text without markup, so other
+    # pages can link to #sections.
+    plain = "".join(node.text for node in text_nodes)
+    return "-".join(compiled(SLUG_STRIP_PATTERN).sub("", plain.lower()).split())
+
+def unique_heading_id(slug, slugs):
+    # Like GitHub, repeats of a slug on the same page get "-1", "-2", ...
+    # slugs maps every id used so far to the last suffix tried for it.
+    count = slugs.get(slug)
+    if count is None:
+        slugs[slug] = 0
+        return slug
+
+    while True:
+        count += 1
+        candidate = f"{slug}-{count}"
+        if candidate not in slugs:
+            break
+    slugs[slug] = count
+    slugs[candidate] = 0
+    return candidate
+
+def heading_to_html_node(level, fragment, slugs=None, context=None):
+    slug = heading_id(fragment[1])
+    if slug and slugs is not None:
+        slug = unique_heading_id(slug, slugs)
+    props = {"id": slug} if slug else None
+    return ParentNode(f"h{level}", fragment_to_children(fragment, context), props)
+
+def parse_code_block(block):
+    lines = block.split("\n")
+    if len(lines) == 1:
+        return "", block[len(CODE_FENCE):-len(CODE_FENCE)]
+
+    language = lines[0][len(CODE_FENCE):].strip()
+    closing = lines[-1][:-len(CODE_FENCE)]
+    code = "\n".join(lines[1:-1] + ([closing] if closing.strip() else [])) + "\n"
+    return language, code
+
+def iter_code_blocks(lines):
+    for block in iter_blocks(lines):
+        if block_to_block_type(block) == BlockType.CODE:
+            yield parse_code_block(block)
+
+def code_to_html_node(block, highlight_cache=None):
+    language, code = parse_code_block(block)
+    if not language:
+        return ParentNode("pre", [LeafNode("code", code)])
+
+    if highlight_cache is not None:
+        highlighted = highlight_cache.render(code, language)
+    else:
+        highlighted = highlight(code, language)
+
+    props = {"class": f"language-{language}"}
+    if highlighted is None:
+        return ParentNode("pre", [LeafNode("code", code, props)])
+    return ParentNode("pre", [ParentNode("code", [RawLeafNode(highlighted)], props)])
+
+def quote_to_html_node(fragment, context=None):
+    return ParentNode("blockquote", fragment_to_children(fragment, context))
+
+def list_to_html_node(tag, fragments, context=None):
+    children = [ParentNode("li", fragment_to_children(fragment, context)) for fragment in fragments]
+    return ParentNode(tag, children)
+
+def paragraph_to_html_node(fragment, context=None):
+    return ParentNode("p", fragment_to_children(fragment, context))
+
+def block_inline_texts(block, block_type=None):
+    # The inline markdown of a block, one string per heading, paragraph,
+    # quote or list item. Code blocks have none.
+    if block_type is None:
+        block_type = block_to_block_type(block)
+
+    if block_type == BlockType.HEADING:
+        return [block[heading_level(block) + 1:]]
+
+    if block_type == BlockType.CODE:
+        return []
+
+    if block_type == BlockType.QUOTE:
+        return [" ".join(line[1:].lstrip() for line in block.split("\n"))]
+
+    if block_type == BlockType.UNORDERED_LIST:
+        return [line[2:] for line in block.split("\n")]
+
+    if block_type == BlockType.ORDERED_LIST:
+        return [line.split(". ", 1)[1] for line in block.split("\n")]
+
+    return [" ".join(block.split("\n"))]
+
+def block_to_html_node(block, inline_cache=None, highlight_cache=None, fragments=None, slugs=None, context=None):
+    # fragments, when given, are the block's parse_inline results, in the
+    # order of block_inline_texts. slugs collects the page's heading ids,
+    # and context is the page's textnode.PageContext.
+    block_type = block_to_block_type(block)
+
+    if block_type == BlockType.CODE:
+        return code_to_html_node(block, highlight_cache)
+
+    if fragments is None:
+        fragments = [parse_inline(text, inline_cache) for text in block_inline_texts(block, block_type)]
+
+    if block_type == BlockType.HEADING:
+        return heading_to_html_node(heading_level(block), fragments[0], slugs, context)
+
+    if block_type == BlockType.QUOTE:
+        return quote_to_html_node(fragments[0], context)
+
+    if block_type == BlockType.UNORDERED_LIST:
+        return list_to_html_node("ul", fragments, context)
+
+    if block_type == BlockType.ORDERED_LIST:
+        return list_to_html_node("ol", fragments, context)
+
+    return paragraph_to_html_node(fragments[0], context)
+
+def iter_block_nodes(lines, inline_cache=None, highlight_cache=None, page_index=None, context=None):
+    slugs = {}
+    for block in iter_blocks(lines):
+        fragments = [parse_inline(text, inline_cache) for text in block_inline_texts(block)]
+        node = block_to_html_node(block, inline_cache, highlight_cache, fragments, slugs, context)
+        if page_index is not None:
+            page_index.add(node, [text_nodes for _, text_nodes, _ in fragments])
+        yield node
+
+def markdown_to_html_node(markdown, inline_cache=None, highlight_cache=None):
+    return ParentNode("div", list(iter_block_nodes(markdown.splitlines(), inline_cache, highlight_cache)))
+
+def write_markdown_html(
+    lines, fp, inline_cache=None, highlight_cache=None, page_index=None, minify=False, context=None,
+):
+    # Streaming equivalent of markdown_to_html_node(...).write_html(fp):
+    # each block's tree is written and dropped before the next is parsed.
+    # Links and images are serialized into inline fragments as their blocks
+    # are built, before write_html sees them, so the context carries minify.
+    if minify:
+        if context is None:
+            context = PageContext(minify=True)
+        elif not context.minify:
+            context = PageContext(context.link_titles, context.images, context.asset_map, minify=True)
+    fp.write("<div>")
+    for node in iter_block_nodes(lines, inline_cache, highlight_cache, page_index, context):
+        node.write_html(fp, minify)
+    fp.write("</div>")
@@ -0,0 +1,456 @@
+import hashlib
+import json
+import os
+import zlib
+
+from block_markdown import iter_code_blocks
+from depgraph import TEMPLATE_NODE, DependencyGraph
+from gencontent import extract_title_from_lines, rewrite_asset_urls, write_page_file
+from linkcheck import LinkTitles, PageImages, PageIndex, check_links
+from output import OutputWriter
+from template import compile_template, load_template
+
+# Bump whenever rendering changes in a way that should invalidate every
+# page recorded in an existing manifest.
+MANIFEST_VERSION = 14
+
+# Page entries are saved in shards next to the manifest, bucketed by a hash
+# of their source path, so a build that changes a few pages rewrites a few
+# shards rather than every page's entry.
+MANIFEST_SHARDS = 64
+
+class BuildResult:
+    def __init__(self):
+        self.rebuilt = []
+        # Why each rebuilt page was rebuilt.
+        self.reasons = {}
+        # Rebuilt pages whose output bytes changed; the rest weren't written.
+        self.written = []
+        self.removed = []
+        self.unchanged = 0
+        self.checked = []
+        self.broken = {}
+        self.manifest = None
+
+    def __repr__(self):
+        return f"BuildResult(rebuilt={len(self.rebuilt)}, removed={len(self.removed)}, unchanged={self.unchanged})"
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def empty_manifest():
+    return {
+        "version": MANIFEST_VERSION,
+        "template": None,
+        "pages": {},
+        "assets": [],
+        "images": {},
+        "graph": DependencyGraph().to_json(),
+        "shards": {},
+    }
+
+def manifest_shard_dir(path):
+    return os.path.splitext(path)[0] + ".pages"
+
+def manifest_shard(source):
+    return f"{zlib.crc32(source.encode('utf-8')) % MANIFEST_SHARDS:02x}"
+
+def load_manifest(path):
+    # The manifest maps each shard to the save that last wrote it. A shard
+    # written by any other save, as when a build was interrupted while
+    # saving, means the pages can't be trusted, and every one is rebuilt.
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return empty_manifest()
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return empty_manifest()
+
+    pages = {}
+    shard_dir = manifest_shard_dir(path)
+    for shard, save_id in manifest["shards"].items():
+        try:
+            with open(os.path.join(shard_dir, f"{shard}.json"), encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return empty_manifest()
+        if data.get("save") != save_id:
+            return empty_manifest()
+        pages.update(data["pages"])
+    manifest["pages"] = pages
+    return manifest
+
+def save_build_manifest(path, manifest, old_pages):
+    # Writes the shards holding pages added, changed or removed since
+    # old_pages, which are told apart by identity: build_site keeps the
+    # entries of untouched pages as they were. Then writes the manifest,
+    # without the pages, recording the shards in manifest["shards"].
+    pages = manifest["pages"]
+    changed = {manifest_shard(source) for source, entry in pages.items() if old_pages.get(source) is not entry}
+    changed.update(manifest_shard(source) for source in old_pages if source not in pages)
+
+    shard_pages = {shard: {} for shard in changed}
+    if changed:
+        for source, entry in pages.items():
+            shard = manifest_shard(source)
+            if shard in shard_pages:
+                shard_pages[shard][source] = entry
+
+    save_id = os.urandom(8).hex()
+    shards = manifest["shards"] = dict(manifest["shards"])
+    shard_dir = manifest_shard_dir(path)
+    for shard, entries in shard_pages.items():
+        shard_path = os.path.join(shard_dir, f"{shard}.json")
+        if entries:
+            save_manifest(shard_path, {"save": save_id, "pages": entries})
+            shards[shard] = save_id
+        elif shards.pop(shard, None) is not None:
+            os.remove(shard_path)
+
+    save_manifest(path, {key: value for key, value in manifest.items() if key != "pages"})
+
+def save_manifest(path, manifest):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(manifest, separators=(",", ":"), sort_keys=True))
+    os.replace(tmp_path, path)
+
+def find_files(directory, extension):
+    paths = []
+    pending = [("", directory)]
+    while pending:
+        prefix, directory = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append((f"{prefix}{entry.name}/", entry.path))
+                elif entry.name.endswith(extension):
+                    paths.append(prefix + entry.name)
+    return sorted(paths)
+
+def output_path_for(source):
+    return source[:-len(".md")] + ".html"
+
+def remove_output(dest_dir, output):
+    path = os.path.join(dest_dir, output)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+    dest_dir = os.path.abspath(dest_dir)
+    directory = os.path.dirname(os.path.abspath(path))
+    while directory != dest_dir and directory.startswith(dest_dir):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+def read_title(path):
+    with open(path, encoding="utf-8") as f:
+        return extract_title_from_lines(f)
+
+# Worker processes receive the template, titles, images and options once,
+# through the pool initializer, rather than pickled alongside every page.
+# Each worker also gets its own copy of the inline cache, so a warm cache
+# helps parallel builds too, although entries added by workers are not
+# persisted. The highlight cache is warmed in the parent before the pool
+# starts, so workers only ever hit it.
+_worker_template = None
+_worker_inline_cache = None
+_worker_asset_map = None
+_worker_highlight_cache = None
+_worker_titles = None
+_worker_ast_cache = None
+_worker_images = None
+_worker_minify = False
+_worker_writer = None
+
+def _init_worker(template, inline_cache, asset_map, highlight_cache, titles, ast_cache, images, minify, dest_dir, staging_dir):
+    global _worker_template, _worker_inline_cache, _worker_asset_map, _worker_highlight_cache
+    global _worker_titles, _worker_ast_cache, _worker_images, _worker_minify, _worker_writer
+    _worker_template = template
+    _worker_inline_cache = inline_cache
+    _worker_asset_map = asset_map
+    _worker_highlight_cache = highlight_cache
+    _worker_titles = titles
+    _worker_ast_cache = ast_cache
+    _worker_images = images
+    _worker_minify = minify
+    # Workers are already parallel, so each writes its pages into the
+    # parent's new version of the site itself; the parent publishes it.
+    _worker_writer = OutputWriter(dest_dir, threads=0, staging_dir=staging_dir)
+
+def render_page(page, template, inline_cache, asset_map, highlight_cache, titles, ast_cache, images, minify, writer):
+    source_path, output, source_hash, html_hash = page
+    page_index = PageIndex(keep_nodes=ast_cache is not None)
+    # The page streams into the writer, which hashes it as it goes.
+    with writer.open(output, html_hash) as fp:
+        write_page_file(
+            source_path, template, fp,
+            inline_cache, asset_map, highlight_cache, page_index, LinkTitles(output, titles),
+            None if images is None else PageImages(output, images), minify,
+        )
+    if ast_cache is not None:
+        ast_cache.save(output, source_hash, page_index.nodes)
+    fields = page_index.to_dict()
+    fields["html"] = fp.hash
+    return fields
+
+def _render_in_worker(page):
+    return render_page(
+        page, _worker_template, _worker_inline_cache, _worker_asset_map,
+        _worker_highlight_cache, _worker_titles, _worker_ast_cache, _worker_images, _worker_minify,
+        _worker_writer,
+    )
+
+def iter_page_code_blocks(pages):
+    for source_path, _, _, _ in pages:
+        with open(source_path, encoding="utf-8") as f:
+            yield from iter_code_blocks(f)
+
+def render_pages(
+    pages, template, writer, jobs=1, inline_cache=None, asset_map=None, highlight_cache=None,
+    titles=None, ast_cache=None, images=None, minify=False,
+):
+    # Pages are (source path, output relative to the destination, source
+    # hash, hash of the output on disk or None) tuples. Returns the manifest
+    # fields of each page, its link index and output hash, in order. Output
+    # is only staged; the caller commits the writer.
+    if titles is None:
+        titles = {}
+    if jobs <= 1 or len(pages) < 2:
+        return [
+            render_page(
+                page, template, inline_cache, asset_map, highlight_cache, titles, ast_cache, images, minify, writer,
+            )
+            for page in pages
+        ]
+
+    if highlight_cache is not None:
+        highlight_cache.warm(iter_page_code_blocks(pages), jobs)
+
+    # A few chunks per worker keeps the load balanced while amortizing the
+    # pickling cost of each task over many pages.
+    chunksize = max(1, len(pages) // (jobs * 4))
+    # Imported here: the process pool machinery is a noticeable share of
+    # startup time, and most builds never need it.
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker,
+        initargs=(
+            template, inline_cache, asset_map, highlight_cache, titles, ast_cache, images, minify,
+            writer.dest_dir, writer.staging_dir,
+        ),
+    ) as executor:
+        return list(executor.map(_render_in_worker, pages, chunksize=chunksize))
+
+def build_site(
+    content_dir, template_path, dest_dir, manifest_path,
+    force=False, jobs=1, inline_cache=None, manifest=None, asset_map=None, highlight_cache=None,
+    ast_cache=None, images=None, minify=False,
+):
+    # Long-running callers such as watch mode pass the previous result's
+    # manifest back in to skip re-reading it from disk.
+    if force:
+        old_manifest = empty_manifest()
+    elif manifest is not None:
+        old_manifest = manifest
+    else:
+        old_manifest = load_manifest(manifest_path)
+    old_pages = old_manifest["pages"]
+
+    # Compiled once and reused until the file changes; workers receive
+    # the compiled template rather than re-parsing it.
+    template = load_template(template_path)
+    template_data = template.source.encode("utf-8")
+    # Fingerprinted asset names and minification are baked into every
+    # page, so they count as part of the template.
+    if asset_map:
+        template_data += json.dumps(asset_map, sort_keys=True).encode("utf-8")
+    if minify:
+        template_data += b"\0minify"
+    template_hash = hash_bytes(template_data)
+    template_changed = old_manifest["template"] != template_hash
+
+    result = BuildResult()
+    new_pages = {}
+    # One directory listing is much cheaper than a stat per output.
+    dest_files = find_files(dest_dir, "")
+    existing_outputs = {path for path in dest_files if path.endswith(".html")}
+
+    for source in find_files(content_dir, ".md"):
+        source_path = os.path.join(content_dir, source)
+        stat = os.stat(source_path)
+        output = output_path_for(source)
+        entry = old_pages.get(source)
+        output_exists = output in existing_outputs
+
+        # Unchanged size and mtime means we can trust the recorded hash
+        # without reading the file at all.
+        if (
+            entry is not None
+            and output_exists
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            new_pages[source] = entry
+            continue
+
+        source_hash = hash_file(source_path)
+
+        if entry is None:
+            result.reasons[source] = "new page"
+        elif not output_exists:
+            result.reasons[source] = "output missing"
+        elif entry["source"] != source_hash:
+            result.reasons[source] = "source changed"
+
+        if source in result.reasons:
+            new_pages[source] = {"title": read_title(source_path)}
+        else:
+            new_pages[source] = dict(entry)
+
+        new_pages[source].update({
+            "source": source_hash,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "output": output,
+        })
+
+    removed = [source for source in old_pages if source not in new_pages]
+
+    # Pages that weren't edited still need rebuilding if something they
+    # show did change: the template, the title of a page they link to, or
+    # the size or derivatives of an image. Only entries that were re-read
+    # can have a new title.
+    changed = {old_pages[source]["output"] for source in removed}
+    # None turns the image stage off; an empty map still lazy-loads images.
+    page_images = images
+    if images is None:
+        images = {}
+    old_images = old_manifest["images"]
+    if images != old_images:
+        changed.update(path for path in images.keys() | old_images.keys() if images.get(path) != old_images.get(path))
+    for source, entry in new_pages.items():
+        old = old_pages.get(source)
+        if entry is not old and (old is None or entry["title"] != old["title"]):
+            changed.add(entry["output"])
+    if template_changed:
+        changed.add(TEMPLATE_NODE)
+
+    # The graph is only decoded when something changed, which keeps no-op
+    # builds from touching it.
+    graph_data = old_manifest["graph"]
+    if changed or result.reasons:
+        graph = DependencyGraph.from_json(graph_data)
+        for source in sorted(graph.dependents(changed)):
+            if source in new_pages and source not in result.reasons:
+                nodes = [node for node in graph.dependencies_of(source) if node in changed]
+                if TEMPLATE_NODE in nodes:
+                    result.reasons[source] = "template changed"
+                elif any(node in images or node in old_images for node in nodes):
+                    result.reasons[source] = f"image {', '.join(nodes)} changed"
+                else:
+                    result.reasons[source] = f"title of {', '.join(nodes)} changed"
+                # The entry may still be the previous manifest's, which
+                # must not be updated in place.
+                new_pages[source] = dict(new_pages[source])
+
+        result.rebuilt = sorted(result.reasons)
+        titles = {entry["output"]: entry["title"] for entry in new_pages.values()}
+        pending = []
+        for source in result.rebuilt:
+            entry = new_pages[source]
+            output = entry["output"]
+            # A page whose output comes out byte for byte the same as the
+            # file on disk, according to the manifest, isn't written again.
+            old = old_pages.get(source)
+            html_hash = old.get("html") if old is not None and output in existing_outputs else None
+            pending.append((os.path.join(content_dir, source), output, entry["source"], html_hash))
+
+        # The template's asset URLs are rewritten once, here, rather than in
+        # every page; the content's are set as it renders.
+        if asset_map and pending:
+            template = compile_template(rewrite_asset_urls(template.source, asset_map))
+
+        # Pages are written into a new version of the site, which is only
+        # published once every one of them rendered, in a single swap of
+        # the dest_dir symlink. A page that fails to render leaves the
+        # previous site intact, and readers never see a mix of the two.
+        # A single page, the common case in watch mode, isn't worth a thread.
+        writer = OutputWriter(dest_dir) if len(pending) > 1 else OutputWriter(dest_dir, threads=0)
+        writer.discard()
+        try:
+            indexes = render_pages(
+                pending, template, writer, jobs, inline_cache, asset_map, highlight_cache, titles, ast_cache,
+                page_images, minify,
+            )
+            for source in removed:
+                writer.remove(old_pages[source]["output"])
+            writer.commit()
+        except BaseException:
+            writer.discard()
+            raise
+
+        for source, page_index, page in zip(result.rebuilt, indexes, pending):
+            if page_index["html"] != page[3]:
+                result.written.append(source)
+            entry = new_pages[source]
+            title_links = page_index.pop("title_links")
+            entry.update(page_index)
+            entry["reason"] = result.reasons[source]
+            # Image dependencies are kept even while no images are measured,
+            # so turning measuring on rebuilds the pages that show them.
+            dependencies = LinkTitles(entry["output"], titles).dependencies(title_links)
+            dependencies.update(PageImages(entry["output"], images).dependencies(entry["images"]))
+            graph.set_dependencies(source, [TEMPLATE_NODE, *dependencies])
+
+        for source in removed:
+            if ast_cache is not None:
+                ast_cache.remove(old_pages[source]["output"])
+            graph.remove(source)
+        result.removed = removed
+        graph_data = graph.to_json()
+
+    result.unchanged = len(new_pages) - len(result.rebuilt)
+
+    # Static assets are copied before pages are built, so the listing
+    # already has them. Fingerprinted assets are linked by their plain name.
+    assets = {path for path in dest_files if not path.endswith(".html")}
+    if asset_map:
+        assets.update(path[1:] for path in asset_map)
+    result.checked = check_links(new_pages, old_pages, set(result.rebuilt), assets, set(old_manifest["assets"]))
+    result.broken = {source: entry["broken"] for source, entry in new_pages.items() if entry["broken"]}
+
+    result.manifest = {
+        "version": MANIFEST_VERSION,
+        "template": template_hash,
+        "pages": new_pages,
+        "assets": sorted(assets),
+        "images": images,
+        "graph": graph_data,
+        "shards": old_manifest["shards"],
+    }
+    if template_changed or result.manifest != old_manifest:
+        save_build_manifest(manifest_path, result.manifest, old_pages)
+
+    return result
@@ -0,0 +1,167 @@
+import json
+import os
+
+from build import find_files, hash_file, remove_output, save_manifest
+
+STATIC_MANIFEST_VERSION = 1
+
+# Assets that are safe to rename with a content hash. Anything else, such
+# as robots.txt or favicon.ico, has to keep the name clients ask for.
+FINGERPRINT_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".png", ".jpg", ".jpeg", ".gif", ".svg",
+    ".webp", ".avif", ".ico", ".woff", ".woff2",
+}
+FINGERPRINT_LENGTH = 8
+
+class StaticResult:
+    def __init__(self):
+        self.copied = []
+        self.removed = []
+        self.unchanged = 0
+        self.asset_map = {}
+
+    def __repr__(self):
+        return f"StaticResult(copied={len(self.copied)}, removed={len(self.removed)}, unchanged={self.unchanged})"
+
+def empty_static_manifest(fingerprint=False):
+    return {"version": STATIC_MANIFEST_VERSION, "fingerprint": fingerprint, "files": {}}
+
+def load_static_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return empty_static_manifest()
+
+    if not isinstance(manifest, dict) or manifest.get("version") != STATIC_MANIFEST_VERSION:
+        return empty_static_manifest()
+
+    return manifest
+
+def fingerprinted_path(path, digest):
+    root, extension = os.path.splitext(path)
+    if extension.lower() not in FINGERPRINT_EXTENSIONS:
+        return path
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{extension}"
+
+def copy_file_range_contents(source, dest):
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is None:
+        return False
+
+    try:
+        with open(source, "rb") as src, open(dest, "wb") as dst:
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except OSError:
+        return False
+
+    return remaining == 0
+
+def copy_file(source, dest, link=False):
+    # Copies land on a temporary name first, so a reader never sees a
+    # half-written asset and a hardlinked file is never written through.
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp_path = f"{dest}.tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+    linked = False
+    if link:
+        try:
+            os.link(source, tmp_path)
+            linked = True
+        except OSError:
+            pass
+
+    # copy_file_range lets the kernel (or a reflinking filesystem) do the
+    # copy; shutil.copyfile falls back to sendfile on Linux.
+    if not linked and not copy_file_range_contents(source, tmp_path):
+        import shutil
+        shutil.copyfile(source, tmp_path)
+
+    os.replace(tmp_path, dest)
+
+def sync_asset(source_path, dest_dir, source, entry, stat, output_exists, fingerprint, link):
+    digest = hash_file(source_path)
+    output = fingerprinted_path(source, digest) if fingerprint else source
+
+    copied = False
+    if entry is None or entry["hash"] != digest or entry["output"] != output or not output_exists(output):
+        copy_file(source_path, os.path.join(dest_dir, output), link)
+        copied = True
+
+    return copied, {
+        "hash": digest,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "output": output,
+    }
+
+def copy_static(static_dir, dest_dir, manifest_path, fingerprint=False, link=False, workers=None):
+    old_manifest = load_static_manifest(manifest_path)
+    old_files = old_manifest["files"]
+    # Switching fingerprinting on or off renames every output, so nothing
+    # recorded under the other mode can be reused.
+    reusable = old_files if old_manifest["fingerprint"] == fingerprint else {}
+
+    result = StaticResult()
+    new_files = {}
+    changed = []
+    existing_outputs = set(find_files(dest_dir, ""))
+
+    for source in find_files(static_dir, ""):
+        source_path = os.path.join(static_dir, source)
+        stat = os.stat(source_path)
+        entry = reusable.get(source)
+
+        if (
+            entry is not None
+            and entry["output"] in existing_outputs
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            new_files[source] = entry
+            result.unchanged += 1
+        else:
+            changed.append((source, source_path, entry, stat))
+
+    tasks = [
+        (source_path, dest_dir, source, entry, stat, existing_outputs.__contains__, fingerprint, link)
+        for source, source_path, entry, stat in changed
+    ]
+    if len(tasks) > 1:
+        # Hashing and copying are I/O bound, so threads overlap them well.
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            synced = list(executor.map(lambda task: sync_asset(*task), tasks))
+    else:
+        synced = [sync_asset(*task) for task in tasks]
+
+    for (source, _, _, _), (copied, entry) in zip(changed, synced):
+        new_files[source] = entry
+        if copied:
+            result.copied.append(source)
+        else:
+            result.unchanged += 1
+
+    outputs = {entry["output"] for entry in new_files.values()}
+    for source, entry in old_files.items():
+        if entry["output"] not in outputs:
+            remove_output(dest_dir, entry["output"])
+            if source not in new_files:
+                result.removed.append(source)
+
+    for source, entry in new_files.items():
+        if entry["output"] != source:
+            result.asset_map[f"/{source}"] = f"/{entry['output']}"
+
+    manifest = {"version": STATIC_MANIFEST_VERSION, "fingerprint": fingerprint, "files": new_files}
+    if manifest != old_manifest:
+        save_manifest(manifest_path, manifest)
+
+    return result
@@ -0,0 +1,75 @@
+TEMPLATE_NODE = "<template>"
+
+class DependencyGraph:
+    # Maps each page (by source path) to the nodes its rendered output
+    # depends on: TEMPLATE_NODE for the layout and asset names, and the
+    # output paths of pages whose titles it shows. Pages are rebuilt when
+    # a node they depend on changes; plain links don't count, since a
+    # link's text never changes when its target does.
+    #
+    # Node names are interned into one list and each page keeps indexes
+    # into it, which is also how the graph is saved, so loading it with the
+    # manifest needs no decoding at all.
+    def __init__(self):
+        self.nodes = []
+        self.node_indexes = None
+        self.rows = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"DependencyGraph(pages={len(self.rows)})"
+
+    @property
+    def dependencies(self):
+        return {page: self.dependencies_of(page) for page in self.rows}
+
+    def node_index(self, node):
+        if self.node_indexes is None:
+            self.node_indexes = {name: index for index, name in enumerate(self.nodes)}
+        index = self.node_indexes.get(node)
+        if index is None:
+            index = self.node_indexes[node] = len(self.nodes)
+            self.nodes.append(node)
+        return index
+
+    def set_dependencies(self, page, nodes):
+        self.rows[page] = [self.node_index(node) for node in sorted(set(nodes))]
+
+    def remove(self, page):
+        self.rows.pop(page, None)
+
+    def dependencies_of(self, page):
+        return [self.nodes[index] for index in self.rows.get(page, ())]
+
+    def dependents(self, changed):
+        # The pages that depend directly on any changed node. Nothing a
+        # page depends on is produced by rendering another page, so there
+        # is no need to follow the graph any further.
+        if self.node_indexes is None:
+            self.node_indexes = {name: index for index, name in enumerate(self.nodes)}
+        indexes = {self.node_indexes[node] for node in changed if node in self.node_indexes}
+        if not indexes:
+            return set()
+        return {page for page, row in self.rows.items() if not indexes.isdisjoint(row)}
+
+    def to_json(self):
+        # Nodes no page depends on any more, such as the outputs of removed
+        # pages, are dropped once they could make up half of the list.
+        if len(self.nodes) > 2 * len(self.rows) + 16:
+            used = sorted({index for row in self.rows.values() for index in row})
+            renumber = {old: new for new, old in enumerate(used)}
+            self.nodes = [self.nodes[index] for index in used]
+            self.node_indexes = None
+            self.rows = {page: [renumber[index] for index in row] for page, row in self.rows.items()}
+        return {"nodes": self.nodes, "pages": self.rows}
+
+    @classmethod
+    def from_json(cls, data):
+        # Copied, so updating the graph leaves the manifest it came from as
+        # it was; the rows themselves are only ever replaced.
+        graph = cls()
+        graph.nodes = list(data["nodes"])
+        graph.rows = dict(data["pages"])
+        return graph
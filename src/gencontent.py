@@ -0,0 +1,88 @@
+import io
+import os
+
+from block_markdown import write_markdown_html
+from escaping import escape_text
+from patterns import compiled
+from template import Template, compile_template
+from textnode import PageContext
+
+def extract_title(markdown):
+    return extract_title_from_lines(markdown.splitlines())
+
+def extract_title_from_lines(lines):
+    for line in lines:
+        if line.startswith("# "):
+            return line[2:].strip()
+
+    raise ValueError("invalid markdown: page has no h1 header")
+
+TAG_PATTERN = r"<[^>]*>"
+ASSET_URL_PATTERN = r'((?:src|href)=")(/[^"]*)"'
+
+def rewrite_asset_urls(html, asset_map):
+    # Rewrites root-relative src/href values to fingerprinted asset names,
+    # only inside tags, so text that merely looks like an attribute is left
+    # alone. build_site does this to the template once; the links and
+    # images of the content get their names from the PageContext.
+    def rewrite_tag(tag):
+        return compiled(ASSET_URL_PATTERN).sub(
+            lambda match: f'{match.group(1)}{asset_map.get(match.group(2), match.group(2))}"',
+            tag.group(),
+        )
+
+    return compiled(TAG_PATTERN).sub(rewrite_tag, html)
+
+def write_page(
+    lines, title, template, fp,
+    inline_cache=None, highlight_cache=None, page_index=None, link_titles=None, images=None, minify=False,
+    asset_map=None,
+):
+    if not isinstance(template, Template):
+        template = compile_template(template)
+
+    # Titles of empty links, image sizes and fingerprinted asset names are
+    # set on the content's nodes as they are built; the template's own
+    # links and images are left alone.
+    context = None
+    if link_titles is not None or images is not None or asset_map:
+        context = PageContext(link_titles, images, asset_map)
+
+    def write_content(out):
+        write_markdown_html(lines, out, inline_cache, highlight_cache, page_index, minify, context)
+
+    template.write(fp, {"Title": escape_text(title), "Content": write_content})
+
+def generate_page_html(markdown, template, inline_cache=None, highlight_cache=None):
+    fp = io.StringIO()
+    write_page(markdown.splitlines(), extract_title(markdown), template, fp, inline_cache, highlight_cache)
+    return fp.getvalue()
+
+def write_page_file(
+    from_path, template, fp,
+    inline_cache=None, asset_map=None, highlight_cache=None, page_index=None, link_titles=None,
+    images=None, minify=False,
+):
+    # The source is read twice, once to find the title and once to render
+    # it, so neither pass needs more than one block in memory. asset_map
+    # only applies to the content; see rewrite_asset_urls for the template.
+    with open(from_path, encoding="utf-8") as f:
+        title = extract_title_from_lines(f)
+
+    with open(from_path, encoding="utf-8") as f:
+        write_page(
+            f, title, template, fp,
+            inline_cache, highlight_cache, page_index, link_titles, images, minify, asset_map,
+        )
+
+def generate_page(
+    from_path, template, dest_path,
+    inline_cache=None, asset_map=None, highlight_cache=None, page_index=None, link_titles=None,
+    images=None, minify=False,
+):
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    with open(dest_path, "w", encoding="utf-8") as out:
+        write_page_file(
+            from_path, template, out,
+            inline_cache, asset_map, highlight_cache, page_index, link_titles, images, minify,
+        )
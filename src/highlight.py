@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from escaping import escape_text
+from patterns import compiled
+
+# Part of every cache key, so bumping it retires everything highlighted by
+# an older version of the lexers below without discarding the cache file.
+HIGHLIGHTER_VERSION = 1
+HIGHLIGHT_CACHE_FORMAT = 1
+
+# Below this many misses, starting a process pool costs more than it saves.
+HIGHLIGHT_POOL_THRESHOLD = 32
+
+NUMBER = r"(?P<number>\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?)\b)"
+NAME = r"(?P<name>[A-Za-z_$][\w$]*)"
+
+# Each lexer is one pattern of named groups, tried left to right at every
+# position, plus the keyword and builtin sets that classify plain names.
+PYTHON = (
+    r"(?P<comment>#[^\n]*)"
+    r"|(?P<string>(?:\b[rRbBfFuU]{1,2})?(?:\"\"\"[\s\S]*?(?:\"\"\"|$)|'''[\s\S]*?(?:'''|$)"
+    r"|\"(?:\\.|[^\"\\\n])*\"?|'(?:\\.|[^'\\\n])*'?))"
+    r"|(?P<decorator>@[A-Za-z_][\w.]*)"
+    "|" + NUMBER + "|" + NAME
+)
+PYTHON_KEYWORDS = frozenset(
+    "False None True and as assert async await break class continue def del elif else except "
+    "finally for from global if import in is lambda nonlocal not or pass raise return try while "
+    "with yield match case".split()
+)
+PYTHON_BUILTINS = frozenset(
+    "abs all any bool bytes callable dict dir enumerate filter float format getattr hasattr "
+    "hash int isinstance issubclass iter len list map max min next object open print range "
+    "repr reversed round set setattr sorted str sum super tuple type zip self cls".split()
+)
+
+JAVASCRIPT = (
+    r"(?P<comment>//[^\n]*|/\*[\s\S]*?(?:\*/|$))"
+    r"|(?P<string>\"(?:\\.|[^\"\\\n])*\"?|'(?:\\.|[^'\\\n])*'?|`(?:\\.|[^`\\])*`?)"
+    "|" + NUMBER + "|" + NAME
+)
+JAVASCRIPT_KEYWORDS = frozenset(
+    "async await break case catch class const continue debugger default delete do else export "
+    "extends false finally for from function if import in instanceof let new null of return "
+    "static super switch this throw true try typeof undefined var void while with yield "
+    "interface type enum implements".split()
+)
+JAVASCRIPT_BUILTINS = frozenset(
+    "Array Boolean Date Error JSON Map Math Number Object Promise RegExp Set String Symbol "
+    "console document window".split()
+)
+
+SHELL = (
+    r"(?P<comment>(?<![^\s])#[^\n]*)"
+    r"|(?P<string>\"(?:\\.|[^\"\\])*\"?|'[^']*'?)"
+    r"|(?P<variable>\$\{[^}\n]*\}?|\$(?:\w+|[@#?*!$-]))"
+    "|" + NUMBER + "|" + r"(?P<name>[A-Za-z_][\w-]*)"
+)
+SHELL_KEYWORDS = frozenset(
+    "case do done elif else esac fi for function if in local return select then until while".split()
+)
+SHELL_BUILTINS = frozenset(
+    "alias cd echo eval exec exit export printf pwd read set shift source test trap unset".split()
+)
+
+JSON = (
+    r"(?P<key>\"(?:\\.|[^\"\\\n])*\"(?=\s*:))"
+    r"|(?P<string>\"(?:\\.|[^\"\\\n])*\"?)"
+    r"|(?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)"
+    r"|(?P<name>[a-z]+)"
+)
+JSON_KEYWORDS = frozenset(["true", "false", "null"])
+
+LEXERS = {
+    "python": (PYTHON, PYTHON_KEYWORDS, PYTHON_BUILTINS),
+    "javascript": (JAVASCRIPT, JAVASCRIPT_KEYWORDS, JAVASCRIPT_BUILTINS),
+    "shell": (SHELL, SHELL_KEYWORDS, SHELL_BUILTINS),
+    "json": (JSON, JSON_KEYWORDS, frozenset()),
+}
+
+LANGUAGE_ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "js": "javascript",
+    "ts": "javascript",
+    "typescript": "javascript",
+    "sh": "shell",
+    "bash": "shell",
+    "zsh": "shell",
+}
+
+def lexer_name(language):
+    language = language.lower()
+    language = LANGUAGE_ALIASES.get(language, language)
+    return language if language in LEXERS else None
+
+def highlight(code, language):
+    # Returns escaped HTML with tokens wrapped in <span class="hl-...">, or
+    # None if there is no lexer for language.
+    name = lexer_name(language)
+    if name is None:
+        return None
+
+    pattern, keywords, builtins = LEXERS[name]
+    parts = []
+    position = 0
+    for match in compiled(pattern).finditer(code):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == "name":
+            if token in keywords:
+                kind = "keyword"
+            elif token in builtins:
+                kind = "builtin"
+            else:
+                continue
+
+        if match.start() > position:
+            parts.append(escape_text(code[position:match.start()]))
+        parts.append(f'<span class="hl-{kind}">{escape_text(token)}</span>')
+        position = match.end()
+
+    if position < len(code):
+        parts.append(escape_text(code[position:]))
+    return "".join(parts)
+
+def highlight_snippet(snippet):
+    name, code = snippet
+    return highlight(code, name)
+
+class HighlightCache:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"HighlightCache(entries={len(self.entries)}, hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def key(self, name, code):
+        digest = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        return f"{name}:{digest}:{HIGHLIGHTER_VERSION}"
+
+    def render(self, code, language):
+        name = lexer_name(language)
+        if name is None:
+            return None
+
+        key = self.key(name, code)
+        html = self.entries.get(key)
+        if html is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+        self.misses += 1
+        html = highlight(code, name)
+        self.store(key, html)
+        return html
+
+    def warm(self, snippets, jobs=1):
+        # Highlights every (language, code) snippet that isn't cached yet,
+        # in a process pool when there are enough of them to be worth it.
+        # Worker processes render from their own copy of the cache, so the
+        # hits and misses reported for the build are counted here: a
+        # snippet that is cached, or repeats one highlighted in this call,
+        # is a hit.
+        missing = {}
+        for language, code in snippets:
+            name = lexer_name(language)
+            if name is None:
+                continue
+            key = self.key(name, code)
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            elif key in missing:
+                self.hits += 1
+            else:
+                missing[key] = (name, code)
+
+        if jobs > 1 and len(missing) >= HIGHLIGHT_POOL_THRESHOLD:
+            from concurrent.futures import ProcessPoolExecutor
+            chunksize = max(1, len(missing) // (jobs * 4))
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                highlighted = list(executor.map(highlight_snippet, missing.values(), chunksize=chunksize))
+        else:
+            highlighted = [highlight_snippet(snippet) for snippet in missing.values()]
+
+        self.misses += len(missing)
+        for key, html in zip(missing, highlighted):
+            self.store(key, html)
+        return len(missing)
+
+    def store(self, key, html):
+        # Like InlineCache, sizes are counted in characters.
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(key) + len(previous)
+
+        self.entries[key] = html
+        self.size += len(key) + len(html)
+
+        while self.entries and self.max_bytes is not None and self.size > self.max_bytes:
+            old_key, old_html = self.entries.popitem(last=False)
+            self.size -= len(old_key) + len(old_html)
+            self.evictions += 1
+
+    def load(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+
+        if not isinstance(data, dict) or data.get("format") != HIGHLIGHT_CACHE_FORMAT:
+            return
+
+        evictions = self.evictions
+        suffix = f":{HIGHLIGHTER_VERSION}"
+        for key, html in data["entries"]:
+            if key.endswith(suffix):
+                self.store(key, html)
+        self.evictions = evictions
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {"format": HIGHLIGHT_CACHE_FORMAT, "entries": list(self.entries.items())}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp_path, path)
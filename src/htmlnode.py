@@ -1,58 +1,237 @@
+from escaping import escape_attribute, escape_text
+from patterns import compiled
+
+# Serialized attribute strings shared by every node with identical props,
+# keyed by the props items. Cleared when full rather than tracked as an LRU,
+# since most sites only use a handful of distinct props.
+PROPS_HTML_CACHE = {}
+PROPS_HTML_CACHE_SIZE = 4096
+
+# Elements whose whitespace is significant, so minified output leaves the
+# text inside them alone.
+PRESERVE_WHITESPACE_TAGS = {"pre", "textarea", "script", "style"}
+
+# HTML whitespace only: other Unicode spaces, such as &nbsp;, are content.
+WHITESPACE_PATTERN = r"[ \t\n\r\f]+"
+UNQUOTED_UNSAFE_PATTERN = r"[ \t\n\r\f\"'=<>`]"
+
+def serialize_props(items):
+    return "".join(f' {key}="{escape_attribute(str(value))}"' for key, value in items)
+
+def serialize_minified_props(items):
+    # Quotes are dropped from values that can be written without them.
+    parts = []
+    for key, value in items:
+        value = escape_attribute(str(value))
+        if not value:
+            parts.append(f" {key}")
+        elif compiled(UNQUOTED_UNSAFE_PATTERN).search(value):
+            parts.append(f' {key}="{value}"')
+        else:
+            parts.append(f" {key}={value}")
+    return "".join(parts)
+
+def cached_props_html(key, items, serialize):
+    try:
+        html_props = PROPS_HTML_CACHE.get(key)
+    except TypeError:
+        return serialize(items)
+
+    if html_props is None:
+        if len(PROPS_HTML_CACHE) >= PROPS_HTML_CACHE_SIZE:
+            PROPS_HTML_CACHE.clear()
+        html_props = serialize(items)
+        PROPS_HTML_CACHE[key] = html_props
+    return html_props
+
+def collapse_whitespace(text):
+    return compiled(WHITESPACE_PATTERN).sub(" ", text)
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "_props", "cached_props_html", "cached_minified_props_html")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
+
+    @property
+    def props(self):
+        return self._props
+
+    @props.setter
+    def props(self, props):
+        # Assigning props drops the serialized attributes cached for the
+        # old ones. The cache also keeps the props items it was built from,
+        # so changes made to the dict in place are noticed on the next read.
+        self._props = props
+        self.cached_props_html = None
+        self.cached_minified_props_html = None
         
-    def to_html(self):
+    def to_html(self, minify=False):
         raise NotImplementedError("to_html method not implemented")
+
+    def html_parts(self):
+        return self.to_html(), None, None
+
+    def minified_html_parts(self, collapse):
+        return self.html_parts()
+
+    def iter_html(self, minify=False):
+        if minify:
+            yield from self.iter_minified_html()
+            return
+
+        # Walks the tree with an explicit stack so deep nesting can't hit the
+        # recursion limit; closing tags are pushed as plain strings.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+                continue
+
+            opening, children, closing = node.html_parts()
+            yield opening
+
+            if children:
+                stack.append(closing)
+                stack.extend(reversed(children))
+            elif closing:
+                yield closing
+
+    def iter_minified_html(self):
+        # The same walk, with whitespace collapsed everywhere except inside
+        # PRESERVE_WHITESPACE_TAGS. Each entry carries whether its subtree
+        # may be collapsed. Kept apart from iter_html so the default output
+        # pays nothing for it.
+        stack = [(self, True)]
+        while stack:
+            node, collapse = stack.pop()
+            if isinstance(node, str):
+                yield node
+                continue
+
+            if node.tag in PRESERVE_WHITESPACE_TAGS:
+                collapse = False
+            opening, children, closing = node.minified_html_parts(collapse)
+            yield opening
+
+            if children:
+                stack.append((closing, collapse))
+                stack.extend((child, collapse) for child in reversed(children))
+            elif closing:
+                yield closing
+
+    def write_html(self, fp, minify=False):
+        fp.writelines(self.iter_html(minify))
     
-    def props_to_html(self):
-        html_props = ""
-        
-        if not self.props:
-            return html_props
-        
-        for key, value in self.props.items():
-            html_props += f' {key}="{value}"'
+    def props_to_html(self, minify=False):
+        if not self._props:
+            return ""
+
+        # The cached string is kept with a copy of the props it was built
+        # from. Comparing a handful of items against it is much cheaper than
+        # serializing again, and catches changes made to the dict in place.
+        props = self._props
+        if minify:
+            cached = self.cached_minified_props_html
+            if cached is None or cached[0] != props:
+                items = tuple(props.items())
+                cached = (dict(props), cached_props_html(("minified", items), items, serialize_minified_props))
+                self.cached_minified_props_html = cached
+            return cached[1]
 
-        return html_props
+        cached = self.cached_props_html
+        if cached is None or cached[0] != props:
+            items = tuple(props.items())
+            cached = self.cached_props_html = (dict(props), cached_props_html(items, items, serialize_props))
+        return cached[1]
         
     def __repr__(self):
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
+    def to_html(self, minify=False):
+        if minify:
+            return "".join(self.iter_minified_html())
+
         if self.value is None:
             raise ValueError("invalid HTML: leaf nodes must have a value")
         
         if self.tag is None:
-            return self.value
+            return escape_text(self.value)
         
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{escape_text(self.value)}</{self.tag}>"
+
+    def minified_html_parts(self, collapse):
+        if self.value is None:
+            raise ValueError("invalid HTML: leaf nodes must have a value")
+
+        value = escape_text(collapse_whitespace(self.value) if collapse else self.value)
+        if self.tag is None:
+            return value, None, None
+
+        return f"<{self.tag}{self.props_to_html(True)}>{value}</{self.tag}>", None, None
     
     def __repr__(self):
         return f"LeafNode(tag={self.tag}, value={self.value}, props={self.props})"
+
+class RawLeafNode(LeafNode):
+    # Trusted HTML that is already rendered and escaped, such as an inline
+    # fragment, emitted verbatim.
+    __slots__ = ()
+
+    def __init__(self, value):
+        super().__init__(None, value)
+
+    def to_html(self, minify=False):
+        if minify:
+            return "".join(self.iter_minified_html())
+
+        if self.value is None:
+            raise ValueError("invalid HTML: leaf nodes must have a value")
+
+        return self.value
+
+    def minified_html_parts(self, collapse):
+        # Only whitespace is touched: the fragment is already serialized, and
+        # its attributes are left as they are.
+        if self.value is None:
+            raise ValueError("invalid HTML: leaf nodes must have a value")
+
+        return collapse_whitespace(self.value) if collapse else self.value, None, None
+
+    def __repr__(self):
+        return f"RawLeafNode(value={self.value})"
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def to_html(self, minify=False):
+        return "".join(self.iter_html(minify))
+
+    def html_parts(self):
         if self.tag is None:
             raise ValueError("invalid HTML: parent nodes must have a tag")
         
         if self.children is None:
             raise ValueError("invalid HTML: parent nodes must have children")
         
-        children_html = ""
-        
-        for child in self.children:
-            children_html += child.to_html()
-        
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>", self.children, f"</{self.tag}>"
+
+    def minified_html_parts(self, collapse):
+        opening, children, closing = self.html_parts()
+        if self.props:
+            opening = f"<{self.tag}{self.props_to_html(True)}>"
+        return opening, children, closing
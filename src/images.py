@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import struct
+
+from build import find_files, hash_file, remove_output, save_manifest
+
+# Bump when derivatives should be regenerated, for example after changing
+# how they are resized. Part of every derivative's name, like the widths,
+# format and quality it was made with.
+IMAGE_PIPELINE_VERSION = 1
+IMAGE_MANIFEST_VERSION = 1
+
+RASTER_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+IMAGE_WIDTHS = (480, 960, 1600)
+IMAGE_QUALITY = 75
+DERIVATIVE_DIR = "_img"
+
+# Best first, since browsers take the first <source> they support.
+DERIVATIVE_FORMATS = (("avif", "AVIF", "image/avif"), ("webp", "WEBP", "image/webp"))
+
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+class ImageResult:
+    def __init__(self):
+        self.images = {}
+        self.generated = []
+        self.removed = []
+
+    def __repr__(self):
+        return f"ImageResult(images={len(self.images)}, generated={len(self.generated)}, removed={len(self.removed)})"
+
+def jpeg_size(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        if marker[1] in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack(">HH", data[1:5])
+            return width, height
+        f.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+def image_size(path):
+    # Reads (width, height) from the file header, without decoding the
+    # image or needing an imaging library. None for unknown formats.
+    with open(path, "rb") as f:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            chunk = head[12:16]
+            if chunk == b"VP8 ":
+                width, height = struct.unpack("<HH", head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b"VP8L":
+                bits = int.from_bytes(head[21:25], "little")
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+            return None
+        if head[:2] == b"\xFF\xD8":
+            return jpeg_size(f)
+    return None
+
+def available_formats():
+    # The derivative formats the installed Pillow can write. Pillow is
+    # optional: without it pages still get sizes and lazy loading, just no
+    # resized copies.
+    try:
+        from PIL import features
+    except ImportError:
+        return ()
+    return tuple(entry for entry in DERIVATIVE_FORMATS if features.check(entry[0]))
+
+def derivative_widths(width):
+    # Smaller copies at the standard widths, plus one at full size in the
+    # new format. Images are never scaled up.
+    return [candidate for candidate in IMAGE_WIDTHS if candidate < width] + [width]
+
+def derivative_path(digest, width, extension):
+    key = f"{digest}:{width}:{extension}:{IMAGE_QUALITY}:{IMAGE_PIPELINE_VERSION}"
+    name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return f"{DERIVATIVE_DIR}/{name}-{width}w.{extension}"
+
+def make_derivative(task):
+    source_path, output_path, width, pillow_format = task
+    from PIL import Image
+
+    with Image.open(source_path) as image:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    resized.save(tmp_path, pillow_format, quality=IMAGE_QUALITY)
+    os.replace(tmp_path, output_path)
+
+def empty_image_manifest():
+    return {"version": IMAGE_MANIFEST_VERSION, "files": {}}
+
+def load_image_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return empty_image_manifest()
+
+    if not isinstance(manifest, dict) or manifest.get("version") != IMAGE_MANIFEST_VERSION:
+        return empty_image_manifest()
+
+    return manifest
+
+def process_images(static_dir, dest_dir, manifest_path, jobs=1, formats=None):
+    # Measures every raster image in static_dir and writes its resized
+    # derivatives to dest_dir/_img. Derivatives are named after the source
+    # hash and their parameters, so one that exists is never made again.
+    # Returns, in result.images, what pages need to reference them.
+    if formats is None:
+        formats = available_formats()
+
+    old_manifest = load_image_manifest(manifest_path)
+    old_files = old_manifest["files"]
+    existing_outputs = set(find_files(os.path.join(dest_dir, DERIVATIVE_DIR), ""))
+
+    result = ImageResult()
+    new_files = {}
+    tasks = []
+    wanted = set()
+    for source in find_files(static_dir, ""):
+        if os.path.splitext(source)[1].lower() not in RASTER_EXTENSIONS:
+            continue
+        source_path = os.path.join(static_dir, source)
+        stat = os.stat(source_path)
+        entry = old_files.get(source)
+        if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            size = image_size(source_path)
+            if size is None:
+                continue
+            entry = {
+                "hash": hash_file(source_path),
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "width": size[0],
+                "height": size[1],
+            }
+        new_files[source] = entry
+
+        sources = []
+        for extension, pillow_format, mime_type in formats:
+            srcset = []
+            for width in derivative_widths(entry["width"]):
+                output = derivative_path(entry["hash"], width, extension)
+                name = output[len(DERIVATIVE_DIR) + 1:]
+                wanted.add(name)
+                if name not in existing_outputs:
+                    tasks.append((source_path, os.path.join(dest_dir, output), width, pillow_format))
+                    result.generated.append(output)
+                srcset.append(f"/{output} {width}w")
+            sources.append([mime_type, ", ".join(srcset)])
+
+        result.images[source] = {"width": entry["width"], "height": entry["height"], "sources": sources}
+
+    if jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(make_derivative, tasks))
+    else:
+        for task in tasks:
+            make_derivative(task)
+
+    # Derivatives of images that changed or went away are stale.
+    for name in sorted(existing_outputs - wanted):
+        remove_output(dest_dir, f"{DERIVATIVE_DIR}/{name}")
+        result.removed.append(f"{DERIVATIVE_DIR}/{name}")
+
+    manifest = {"version": IMAGE_MANIFEST_VERSION, "files": new_files}
+    if manifest != old_manifest:
+        save_manifest(manifest_path, manifest)
+
+    return result
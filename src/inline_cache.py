@@ -0,0 +1,97 @@
+import json
+import os
+from collections import OrderedDict
+
+from escaping import needs_escape
+from inline_markdown import text_to_textnodes
+from textnode import TextNode, TextType, text_nodes_to_html
+
+# Bump whenever inline parsing or rendering changes, so fragments persisted
+# by an older build are discarded instead of served.
+INLINE_CACHE_VERSION = 4
+
+def inline_to_html(text):
+    return text_nodes_to_html(text_to_textnodes(text), needs_escape(text))
+
+class InlineCache:
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"InlineCache(entries={len(self.entries)}, hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+
+    def lookup(self, text):
+        # Returns the fragment block_markdown.parse_inline would: the text,
+        # its TextNodes and its HTML, here rendered ahead of time.
+        fragment = self.entries.get(text)
+        if fragment is not None:
+            self.entries.move_to_end(text)
+            self.hits += 1
+            return fragment
+
+        self.misses += 1
+        text_nodes = text_to_textnodes(text)
+        fragment = (text, text_nodes, text_nodes_to_html(text_nodes, needs_escape(text)))
+        self.store(text, fragment)
+        return fragment
+
+    def render(self, text):
+        return self.lookup(text)[2]
+
+    def store(self, text, fragment):
+        # Sizes are counted in characters of the text and its HTML, which is
+        # close enough to bytes for bounding mostly-ASCII markdown.
+        previous = self.entries.pop(text, None)
+        if previous is not None:
+            self.size -= len(text) + len(previous[2])
+
+        self.entries[text] = fragment
+        self.size += len(text) + len(fragment[2])
+
+        while self.entries and (
+            (self.max_entries is not None and len(self.entries) > self.max_entries)
+            or (self.max_bytes is not None and self.size > self.max_bytes)
+        ):
+            old_text, old_fragment = self.entries.popitem(last=False)
+            self.size -= len(old_text) + len(old_fragment[2])
+            self.evictions += 1
+
+    def load(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+
+        if not isinstance(data, dict) or data.get("version") != INLINE_CACHE_VERSION:
+            return
+
+        evictions = self.evictions
+        for text, html, nodes in data["entries"]:
+            text_nodes = [TextNode(node_text, TextType(text_type), url) for node_text, text_type, url in nodes]
+            self.store(text, (text, text_nodes, html))
+        self.evictions = evictions
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        entries = [
+            [text, html, [[node.text, node.text_type.value, node.url] for node in text_nodes]]
+            for text, text_nodes, html in self.entries.values()
+        ]
+        data = {"version": INLINE_CACHE_VERSION, "entries": entries}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp_path, path)
@@ -1,5 +1,4 @@
-import re
-
+from patterns import compiled
 from textnode import TextNode, TextType
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -30,76 +29,102 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
     return new_nodes
 
+IMAGE_PATTERN = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
+LINK_PATTERN = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
+    matches = compiled(IMAGE_PATTERN).findall(text)
     return matches
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
+    matches = compiled(LINK_PATTERN).findall(text)
     return matches
 
-def split_nodes_image(old_nodes):
+def split_nodes_pattern(old_nodes, pattern, text_type):
     new_nodes = []
     for old_node in old_nodes:
         if old_node.text_type != TextType.TEXT:
             new_nodes.append(old_node)
             continue
-        
-        split_nodes = []
-        image_list = extract_markdown_images(old_node.text)
-        remaining_text = old_node.text
-
-        for alt, url in image_list:
-            markdown = f"![{alt}]({url})"
 
-            sections = remaining_text.split(markdown, 1)
-            before = sections[0]
-            after = sections[1]
+        text = old_node.text
+        split_nodes = []
+        position = 0
 
-            if before != "":
-                split_nodes.append(TextNode(before, TextType.TEXT))
+        for match in compiled(pattern).finditer(text):
+            if match.start() > position:
+                split_nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
 
-            split_nodes.append(TextNode(alt, TextType.IMAGE, url))
+            split_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
 
-            remaining_text = after
+            position = match.end()
 
-        if remaining_text != "":
-            split_nodes.append(TextNode(remaining_text, TextType.TEXT))
+        if position < len(text):
+            split_nodes.append(TextNode(text[position:], TextType.TEXT))
 
         new_nodes.extend(split_nodes)
-    
+
     return new_nodes
 
+def split_nodes_image(old_nodes):
+    return split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
+
 def split_nodes_link(old_nodes):
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
+    return split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+DELIMITERS = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
+# Priority of each delimiter, matching the order the split_nodes_* passes
+# are chained in. A delimiter is only recognized inside TEXT runs, so a
+# higher-priority delimiter showing up inside an open span always leaves an
+# unclosed section behind it.
+_DELIMITER_RANK = {delimiter: rank for rank, delimiter in enumerate(DELIMITERS)}
+
+# One master pattern for every inline token. Link and image spans may not
+# contain delimiter characters, because the chained passes split on those
+# before they ever look for links.
+INLINE_TOKEN_PATTERN = (
+    r"\*\*|_|`"
+    r"|(!?)\[((?:[^\[\]_`*]|\*(?!\*))*)\]\(((?:[^\(\)_`*]|\*(?!\*))*)\)"
+)
+
+def text_to_textnodes(text):
+    nodes = []
+    open_delimiter = None
+    start = 0
+
+    for match in compiled(INLINE_TOKEN_PATTERN).finditer(text):
+        token = match.group(0)
+
+        if open_delimiter is not None:
+            if token == open_delimiter:
+                if match.start() > start:
+                    nodes.append(TextNode(text[start:match.start()], DELIMITERS[token]))
+                open_delimiter = None
+                start = match.end()
+            elif _DELIMITER_RANK.get(token, len(DELIMITERS)) < _DELIMITER_RANK[open_delimiter]:
+                raise ValueError("invalid markdown, formatted section not closed")
             continue
-        
-        split_nodes = []
-        link_list = extract_markdown_links(old_node.text)
-        remaining_text = old_node.text
 
-        for alt, url in link_list:
-            markdown = f"[{alt}]({url})"
+        if match.start() > start:
+            nodes.append(TextNode(text[start:match.start()], TextType.TEXT))
+        start = match.end()
 
-            sections = remaining_text.split(markdown, 1)
-            before = sections[0]
-            after = sections[1]
+        if token in DELIMITERS:
+            open_delimiter = token
+        elif match.group(1):
+            nodes.append(TextNode(match.group(2), TextType.IMAGE, match.group(3)))
+        else:
+            nodes.append(TextNode(match.group(2), TextType.LINK, match.group(3)))
 
-            if before != "":
-                split_nodes.append(TextNode(before, TextType.TEXT))
+    if open_delimiter is not None:
+        raise ValueError("invalid markdown, formatted section not closed")
 
-            split_nodes.append(TextNode(alt, TextType.LINK, url))
+    if start < len(text):
+        nodes.append(TextNode(text[start:], TextType.TEXT))
 
-            remaining_text = after
-
-        if remaining_text != "":
-            split_nodes.append(TextNode(remaining_text, TextType.TEXT))
-
-        new_nodes.extend(split_nodes)
-    
-    return new_nodes
+    return nodes
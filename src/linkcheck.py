@@ -0,0 +1,193 @@
+import posixpath
+
+from block_markdown import iter_block_nodes
+from patterns import compiled
+from textnode import TextType
+
+EXTERNAL_URL_PATTERN = r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)"
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+class PageIndex:
+    # The outgoing links and images of a page and the anchors it defines.
+    # Filled in block by block while the page renders, from the block's
+    # node and the TextNodes of its inline markdown, so neither the HTML nor
+    # the markdown has to be parsed again. Links in code aren't links. With
+    # keep_nodes, each block's node and inline TextNode lists are kept too,
+    # as a [node, inline] pair, for the AST cache.
+    def __init__(self, keep_nodes=False):
+        self.nodes = [] if keep_nodes else None
+        self.links = {}
+        self.images = {}
+        self.anchors = {}
+        # Empty links, "[](/about)", which render the target's title.
+        self.title_links = {}
+
+    def add(self, node, inline):
+        if self.nodes is not None:
+            self.nodes.append([node, inline])
+        if node.tag in HEADING_TAGS and node.props:
+            self.anchors[node.props["id"]] = None
+        for text_nodes in inline:
+            for text_node in text_nodes:
+                if text_node.text_type is TextType.IMAGE:
+                    self.images[text_node.url] = None
+                elif text_node.text_type is TextType.LINK:
+                    self.links[text_node.url] = None
+                    if not text_node.text:
+                        self.title_links[text_node.url] = None
+
+    def to_dict(self):
+        return {
+            "links": list(self.links),
+            "images": list(self.images),
+            "anchors": list(self.anchors),
+            "title_links": list(self.title_links),
+        }
+
+def index_markdown(lines):
+    index = PageIndex()
+    for _ in iter_block_nodes(lines, page_index=index):
+        pass
+    return index.to_dict()
+
+def is_external(url):
+    return compiled(EXTERNAL_URL_PATTERN).match(url) is not None
+
+def resolve_url(url, output):
+    # Returns the output-relative paths an internal URL may refer to, most
+    # likely first, and its fragment. "/about" may be about, about.html or
+    # about/index.html.
+    path, _, fragment = url.partition("#")
+    path = path.partition("?")[0]
+    if not path:
+        return [output], fragment
+
+    if path.startswith("/"):
+        resolved = posixpath.normpath(path.lstrip("/") or ".")
+    else:
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(output), path))
+
+    if resolved == ".":
+        return ["index.html"], fragment
+    if path.endswith("/"):
+        return [f"{resolved}/index.html"], fragment
+    return [resolved, f"{resolved}.html", f"{resolved}/index.html"], fragment
+
+class LinkTitles:
+    # Titles for the empty links on the page at output, looked up in a
+    # mapping of every page's output path to its title.
+    def __init__(self, output, titles):
+        self.output = output
+        self.titles = titles
+
+    def target(self, url):
+        if is_external(url):
+            return None
+        candidates, _ = resolve_url(url, self.output)
+        return next((path for path in candidates if path in self.titles), None)
+
+    def get(self, url):
+        target = self.target(url)
+        return None if target is None else self.titles[target]
+
+    def dependencies(self, urls):
+        # The paths whose titles the page shows. A link to a page that
+        # doesn't exist yet depends on every path it may resolve to, so
+        # the page is rebuilt when one of them appears.
+        paths = set()
+        for url in urls:
+            target = self.target(url)
+            if target is not None:
+                paths.add(target)
+            elif not is_external(url):
+                paths.update(resolve_url(url, self.output)[0])
+        paths.discard(self.output)
+        return paths
+
+class PageImages:
+    # Sizes and derivatives of the local images on the page at output,
+    # looked up in the map process_images returns.
+    def __init__(self, output, images):
+        self.output = output
+        self.images = images
+
+    def path(self, url):
+        if is_external(url):
+            return None
+        return resolve_url(url, self.output)[0][0]
+
+    def get(self, url):
+        path = self.path(url)
+        return None if path is None else self.images.get(path)
+
+    def dependencies(self, urls):
+        paths = {self.path(url) for url in urls}
+        paths.discard(None)
+        return paths
+
+def link_targets(entry):
+    # Every path whose appearance, disappearance or change of anchors could
+    # change this page's result.
+    targets = set()
+    for url in entry["links"] + entry["images"]:
+        if not is_external(url):
+            targets.update(resolve_url(url, entry["output"])[0])
+    return sorted(targets)
+
+def find_broken(entry, pages, assets):
+    broken = []
+    for url in entry["links"]:
+        if is_external(url):
+            continue
+        candidates, fragment = resolve_url(url, entry["output"])
+        page = next((pages[path] for path in candidates if path in pages), None)
+        if page is not None:
+            if fragment and fragment not in page["anchors"]:
+                broken.append([url, "missing anchor"])
+        elif not any(path in assets for path in candidates):
+            broken.append([url, "missing page"])
+
+    for url in entry["images"]:
+        if is_external(url):
+            continue
+        candidates, _ = resolve_url(url, entry["output"])
+        if candidates[0] not in assets:
+            broken.append([url, "missing image"])
+
+    return broken
+
+def check_links(pages, old_pages, rebuilt, assets, old_assets):
+    # Validates every page's links against the whole site in one pass, but
+    # only re-checks pages that were rebuilt or that link to something that
+    # appeared, disappeared or changed its anchors. Everything else keeps
+    # the result recorded in its manifest entry. Returns the pages checked.
+    outputs = {entry["output"]: entry for entry in pages.values()}
+    old_outputs = {entry["output"]: entry for entry in old_pages.values()}
+
+    changed = assets ^ old_assets
+    for output in outputs.keys() | old_outputs.keys():
+        new = outputs.get(output)
+        old = old_outputs.get(output)
+        if new is None or old is None or new["anchors"] != old["anchors"]:
+            changed.add(output)
+
+    checked = []
+    for source, entry in pages.items():
+        # Targets are resolved only when something changed, which keeps
+        # no-op builds from touching any links at all.
+        if source not in rebuilt and (not changed or changed.isdisjoint(link_targets(entry))):
+            continue
+
+        # Entries can be shared with the previous manifest, so they are
+        # replaced rather than updated in place.
+        pages[source] = dict(entry, broken=find_broken(entry, outputs, assets))
+        checked.append(source)
+
+    return checked
+
+def format_broken(broken):
+    return [
+        f"{source}: broken link {url} ({reason})"
+        for source, links in sorted(broken.items())
+        for url, reason in links
+    ]
@@ -1,8 +1,214 @@
-from textnode import TextNode, TextType
+import argparse
+import sys
 
-def main():
-    node = TextNode("hello world", TextType.TEXT)
-    print(node)
+# Subcommands import their own dependencies, so rendering a single page
+# never loads the server, process pool or profiler.
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py", description="Static site generator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    site_parser = argparse.ArgumentParser(add_help=False)
+    site_parser.add_argument("--content", default="content", help="directory of markdown sources")
+    site_parser.add_argument("--template", default="template.html", help="page template")
+    site_parser.add_argument("--dest", default="public", help="output directory")
+    site_parser.add_argument("--manifest", default=".cache/manifest.json", help="incremental build manifest")
+    site_parser.add_argument("--static", default="static", help="directory of static assets copied into the output")
+    site_parser.add_argument("--static-manifest", default=".cache/static.json", help="incremental static asset manifest")
+
+    build_parser = subparsers.add_parser(
+        "build", parents=[site_parser], help="render markdown content into the output directory"
+    )
+    build_parser.add_argument("--force", action="store_true", help="ignore the manifest and rebuild every page")
+    build_parser.add_argument("--fingerprint", action="store_true", help="rename assets with a content hash and rewrite references")
+    build_parser.add_argument("--link-static", action="store_true", help="hardlink static assets instead of copying when possible")
+    build_parser.add_argument("--minify", action="store_true", help="collapse whitespace and drop unneeded attribute quotes in page content")
+    build_parser.add_argument("--precompress", action="store_true", help="write .gz (and .br, if brotli is installed) copies of HTML and CSS files")
+    build_parser.add_argument("--precompress-manifest", default=".cache/precompress.json", help="incremental precompression manifest")
+    build_parser.add_argument("--responsive-images", action="store_true", help="size and lazy-load images, with resized WebP/AVIF copies if Pillow is installed")
+    build_parser.add_argument("--image-manifest", default=".cache/images.json", help="incremental image manifest")
+    build_parser.add_argument("--jobs", "-j", type=int, default=1, help="number of worker processes for rendering")
+    build_parser.add_argument("--inline-cache", metavar="PATH", help="cache rendered inline markdown in PATH between builds")
+    build_parser.add_argument("--inline-cache-entries", type=int, default=100_000, help="maximum number of cached inline fragments")
+    build_parser.add_argument("--ast-cache", metavar="DIR", help="keep each page's parsed block tree in DIR for later reuse")
+    build_parser.add_argument("--search", action="store_true", help="write a client-side search index to DEST/search")
+    build_parser.add_argument("--search-state", default=".cache/search.json", help="incremental search index state")
+    build_parser.add_argument("--strict-links", action="store_true", help="exit with an error if any page has a broken link")
+    build_parser.add_argument("--highlight-cache", metavar="PATH", help="cache highlighted code blocks in PATH between builds")
+    build_parser.add_argument("--highlight-cache-bytes", type=int, default=64_000_000, help="approximate size limit of the highlight cache")
+    build_parser.add_argument("--profile", action="store_true", help="time each pipeline stage and report the slowest pages")
+    build_parser.add_argument("--profile-top", type=int, default=10, help="number of slowest pages to report")
+    build_parser.add_argument("--profile-pstats", metavar="PATH", help="also write a cProfile/pstats dump to PATH")
+    build_parser.add_argument("--profile-trace", metavar="PATH", help="also write a Chrome trace JSON to PATH")
+
+    render_parser = subparsers.add_parser("render", help="render one markdown file")
+    render_parser.add_argument("source", help="markdown file to render")
+    render_parser.add_argument("--template", default="template.html", help="page template")
+    render_parser.add_argument("--output", "-o", help="write the page here instead of to stdout")
+
+    why_parser = subparsers.add_parser("why", help="explain why a page was last rebuilt and what it depends on")
+    why_parser.add_argument("page", help="source path relative to the content directory, or output path")
+    why_parser.add_argument("--manifest", default=".cache/manifest.json", help="incremental build manifest")
+
+    serve_parser = subparsers.add_parser(
+        "serve", parents=[site_parser], help="build, then serve the output directory over HTTP"
+    )
+    serve_parser.add_argument("--port", type=int, default=8888, help="port to listen on")
+    serve_parser.add_argument("--watch", action="store_true", help="rebuild on changes and live-reload open pages")
+    serve_parser.add_argument("--interval", type=float, default=0.1, help="seconds between change polls")
+
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "build":
+        from build import build_site
+        from copystatic import copy_static
+
+        inline_cache = None
+        if args.inline_cache:
+            from inline_cache import InlineCache
+            inline_cache = InlineCache(max_entries=args.inline_cache_entries)
+            inline_cache.load(args.inline_cache)
+
+        # Off unless asked for, like the inline cache: with --jobs the whole
+        # cache is pickled to every worker.
+        highlight_cache = None
+        if args.highlight_cache:
+            from highlight import HighlightCache
+            highlight_cache = HighlightCache(max_bytes=args.highlight_cache_bytes)
+            highlight_cache.load(args.highlight_cache)
+
+        ast_cache = None
+        if args.ast_cache:
+            from astcache import ASTCache
+            ast_cache = ASTCache(args.ast_cache)
+
+        profiler = None
+        jobs = args.jobs
+        if args.profile or args.profile_pstats or args.profile_trace:
+            from profiling import Profiler
+            profiler = Profiler(trace=bool(args.profile_trace), cprofile=bool(args.profile_pstats))
+            if jobs > 1:
+                print("profiling only sees the main process; rendering with --jobs 1")
+                jobs = 1
+            profiler.start()
+
+        try:
+            static = copy_static(
+                args.static, args.dest, args.static_manifest,
+                fingerprint=args.fingerprint, link=args.link_static,
+            )
+            measured = None
+            if args.responsive_images:
+                from images import process_images
+                measured = process_images(args.static, args.dest, args.image_manifest, jobs)
+            result = build_site(
+                args.content, args.template, args.dest, args.manifest,
+                force=args.force, jobs=jobs, inline_cache=inline_cache, asset_map=static.asset_map,
+                highlight_cache=highlight_cache, ast_cache=ast_cache,
+                images=None if measured is None else measured.images, minify=args.minify,
+            )
+            search = None
+            if args.search:
+                from search import update_search_index
+                search = update_search_index(
+                    args.content, args.dest, result.manifest["pages"], args.search_state, ast_cache=ast_cache,
+                )
+            # Last, so it sees every file the other stages wrote.
+            precompressed = None
+            if args.precompress:
+                from precompress import precompress_site
+                precompressed = precompress_site(args.dest, args.precompress_manifest, jobs)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+        print(f"copied {len(static.copied)} assets, removed {len(static.removed)}, unchanged {static.unchanged}")
+        if measured is not None:
+            print(f"images: {len(measured.images)} measured, {len(measured.generated)} derivatives made, {len(measured.removed)} removed")
+        print(
+            f"rebuilt {len(result.rebuilt)} ({len(result.written)} changed on disk), "
+            f"removed {len(result.removed)}, unchanged {result.unchanged}"
+        )
+        if search is not None:
+            print(f"search: indexed {len(search.indexed)} pages, removed {len(search.removed)}, wrote {len(search.shards)} shards")
+        if precompressed is not None:
+            print(
+                f"precompressed {len(precompressed.compressed)} files ({', '.join(precompressed.encodings)}), "
+                f"removed {len(precompressed.removed)}, unchanged {precompressed.unchanged}"
+            )
+
+        from linkcheck import format_broken
+        for line in format_broken(result.broken):
+            print(line)
+        print(f"checked links on {len(result.checked)} pages, {len(result.broken)} with broken links")
+
+        if profiler is not None:
+            print(profiler.report(args.profile_top))
+            if args.profile_pstats:
+                profiler.dump_stats(args.profile_pstats)
+            if args.profile_trace:
+                profiler.write_trace(args.profile_trace)
+
+        if highlight_cache is not None:
+            highlight_cache.save(args.highlight_cache)
+            print(
+                f"highlight cache: {highlight_cache.hits} hits, {highlight_cache.misses} misses "
+                f"({highlight_cache.hit_rate:.0%} hit rate), {highlight_cache.evictions} evictions"
+            )
+
+        if inline_cache is not None:
+            inline_cache.save(args.inline_cache)
+            print(f"inline cache: {inline_cache.hits} hits, {inline_cache.misses} misses, {inline_cache.evictions} evictions")
+
+        if args.strict_links and result.broken:
+            return 1
+
+    elif args.command == "render":
+        from gencontent import generate_page, generate_page_html
+        from template import load_template
+
+        template = load_template(args.template)
+        if args.output:
+            generate_page(args.source, template, args.output)
+        else:
+            with open(args.source, encoding="utf-8") as f:
+                sys.stdout.write(generate_page_html(f.read(), template))
+
+    elif args.command == "why":
+        from build import load_manifest
+        from depgraph import DependencyGraph
+
+        manifest = load_manifest(args.manifest)
+        pages = manifest["pages"]
+        source = next((source for source, entry in pages.items() if args.page in (source, entry["output"])), None)
+        if source is None:
+            print(f"{args.page}: not in the manifest; build the site first")
+            return 1
+
+        graph = DependencyGraph.from_json(manifest["graph"])
+        output = pages[source]["output"]
+        dependents = sorted(graph.dependents([output]) - {source})
+        print(f"{source} -> {output}")
+        print(f"last rebuilt: {pages[source]['reason']}")
+        print(f"depends on: {', '.join(graph.dependencies_of(source)) or 'nothing'}")
+        print(f"rebuilt when its title changes: {', '.join(dependents) or 'nothing'}")
+
+    elif args.command == "serve":
+        from highlight import HighlightCache
+        from inline_cache import InlineCache
+        from server import serve
+
+        # The inline cache lives for the whole session, so edits only
+        # re-parse the text that actually changed.
+        serve(
+            args.content, args.template, args.dest, args.manifest, args.static, args.static_manifest,
+            port=args.port, watch=args.watch, interval=args.interval,
+            inline_cache=InlineCache(), highlight_cache=HighlightCache(),
+        )
+
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
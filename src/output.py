@@ -0,0 +1,293 @@
+import hashlib
+import io
+import os
+
+# Writer threads and the number of files that may wait for them. The queue
+# bound keeps memory flat when rendering outpaces the disk.
+OUTPUT_THREADS = 4
+OUTPUT_QUEUE_SIZE = 64
+# Characters of a page held in memory before it starts streaming to disk.
+# Most pages are smaller and go to the writer threads whole.
+PAGE_BUFFER_CHARS = 1 << 16
+
+def versions_dir_for(dest_dir):
+    # A sibling of the destination holding every version of the site, so
+    # building one is a matter of renames and hardlinks on the same
+    # filesystem rather than copies.
+    dest_dir = os.path.abspath(dest_dir)
+    return os.path.join(os.path.dirname(dest_dir), f".{os.path.basename(dest_dir)}.versions")
+
+def live_dir(dest_dir):
+    # The directory the site is currently served from: the version dest_dir
+    # links to, dest_dir itself for a site built before versioning, or None.
+    if os.path.islink(dest_dir):
+        return os.path.realpath(dest_dir)
+    return dest_dir if os.path.isdir(dest_dir) else None
+
+def next_version_dir(dest_dir):
+    versions_dir = versions_dir_for(dest_dir)
+    try:
+        names = os.listdir(versions_dir)
+    except FileNotFoundError:
+        names = []
+    number = max((int(name) for name in names if name.isdigit()), default=0) + 1
+    return os.path.join(versions_dir, str(number))
+
+def remove_site(dest_dir):
+    # Removes dest_dir with every version of it.
+    import shutil
+    if os.path.islink(dest_dir):
+        os.remove(dest_dir)
+    elif os.path.isdir(dest_dir):
+        shutil.rmtree(dest_dir)
+    shutil.rmtree(versions_dir_for(dest_dir), ignore_errors=True)
+
+def publish(version_dir, dest_dir):
+    # Points dest_dir at version_dir with a single rename of a symlink, so a
+    # reader sees either the whole previous site or the whole new one.
+    # Returns the directory that was live before.
+    dest_dir = os.path.abspath(dest_dir)
+    previous = live_dir(dest_dir)
+    link_path = f"{dest_dir}.link"
+    if os.path.lexists(link_path):
+        os.remove(link_path)
+    os.symlink(os.path.relpath(version_dir, os.path.dirname(dest_dir)), link_path)
+
+    if previous == dest_dir:
+        # A plain directory can't be replaced by a symlink in one step. It
+        # is moved aside first, once, the first time a site is versioned.
+        previous = next_version_dir(dest_dir) + ".old"
+        os.rename(dest_dir, previous)
+    os.replace(link_path, dest_dir)
+    return previous
+
+class PageFile:
+    # A page being rendered into an OutputWriter. Text is buffered until
+    # there's more than PAGE_BUFFER_CHARS of it; from then on it's encoded,
+    # hashed and written to the new version as it comes, so a large page
+    # is never held in memory whole, and the staged file is dropped again
+    # if the page turns out unchanged. Used as a context manager, the page
+    # is finished on a clean exit and its hash is left in self.hash.
+    def __init__(self, writer, output, old_hash=None):
+        self.writer = writer
+        self.output = output
+        self.old_hash = old_hash
+        self.digest = hashlib.sha256()
+        self.buffer = io.StringIO()
+        self.file = None
+        self.hash = None
+        # Single writes go straight to the buffer. The buffer's size is only
+        # checked after writelines, which the page's blocks are written
+        # with, so a page spills at block boundaries.
+        self.write = self.buffer.write
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        elif self.file is not None:
+            self.file.close()
+
+    def writelines(self, texts):
+        self.buffer.writelines(texts)
+        if self.buffer.tell() > PAGE_BUFFER_CHARS:
+            self.flush()
+
+    def take(self):
+        data = self.buffer.getvalue().encode("utf-8")
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.digest.update(data)
+        return data
+
+    def flush(self):
+        data = self.take()
+        if self.file is None:
+            path = os.path.join(self.writer.staging_dir, self.output)
+            self.writer.make_directory(os.path.dirname(path))
+            self.file = open(path, "wb")
+        self.file.write(data)
+
+    def close(self):
+        # Returns the hash of the page, for the manifest.
+        data = self.take()
+        if self.file is None:
+            self.hash = self.writer.store(self.output, self.digest.hexdigest(), data, self.old_hash)
+            return self.hash
+
+        self.file.write(data)
+        self.file.close()
+        self.hash = self.digest.hexdigest()
+        if self.hash == self.old_hash:
+            os.remove(self.file.name)
+            self.writer.skipped += 1
+        else:
+            self.writer.written.append(self.output)
+        return self.hash
+
+class OutputWriter:
+    # Writes rendered pages for build_site. Pages whose bytes hash the same
+    # as the manifest says the file on disk already has are skipped without
+    # reading it. The rest are written into a new version of the site by a
+    # small pool of threads. commit(), called once the whole build has
+    # succeeded, hardlinks every other file of the live version into it and
+    # then publishes it in one step, so readers never see a half-built site.
+    def __init__(self, dest_dir, threads=OUTPUT_THREADS, staging_dir=None):
+        self.dest_dir = dest_dir
+        self.staging_dir = staging_dir or next_version_dir(dest_dir)
+        self.threads = threads
+        self.queue = None
+        self.workers = []
+        self.errors = []
+        self.directories = set()
+        self.written = []
+        self.removed = set()
+        self.skipped = 0
+        self.cleanup = None
+
+    def __repr__(self):
+        return f"OutputWriter({self.dest_dir!r}, written={len(self.written)}, skipped={self.skipped})"
+
+    def write(self, output, data, old_hash=None):
+        # Returns the hash of data, for the manifest.
+        return self.store(output, hashlib.sha256(data).hexdigest(), data, old_hash)
+
+    def open(self, output, old_hash=None):
+        # A file-like object to render output into; see PageFile.
+        return PageFile(self, output, old_hash)
+
+    def store(self, output, digest, data, old_hash):
+        if digest == old_hash:
+            self.skipped += 1
+            return digest
+
+        self.written.append(output)
+        self.submit(self.write_file, os.path.join(self.staging_dir, output), data)
+        return digest
+
+    def remove(self, output):
+        # Leaves output out of the new version.
+        self.removed.add(output)
+
+    def submit(self, function, *args):
+        if self.threads <= 0:
+            function(*args)
+            return
+
+        if self.queue is None:
+            self.start()
+        if self.errors:
+            raise self.errors[0]
+        # Blocks while the queue is full.
+        self.queue.put((function, args))
+
+    def make_directory(self, directory):
+        if directory not in self.directories:
+            os.makedirs(directory, exist_ok=True)
+            self.directories.add(directory)
+
+    def write_file(self, path, data):
+        self.make_directory(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def start(self):
+        # Imported here, like the process pool: builds that write nothing
+        # never start a thread.
+        import queue
+        import threading
+
+        self.queue = queue.Queue(OUTPUT_QUEUE_SIZE)
+        for _ in range(self.threads):
+            worker = threading.Thread(target=self.run, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            function, args = item
+            try:
+                function(*args)
+            except OSError as error:
+                self.errors.append(error)
+
+    def stop(self):
+        if self.queue is None:
+            return
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.queue = None
+        self.workers = []
+
+    def wait(self):
+        self.stop()
+        if self.errors:
+            raise self.errors[0]
+
+    def link_unchanged(self, live):
+        # Fills the new version with hardlinks to every file of the live one
+        # that wasn't removed. Pages written again, some of them by worker
+        # processes, are already there and are kept. Linking is a syscall
+        # per file, so it's done in one walk here rather than through the
+        # writer threads.
+        pending = [("", live, self.staging_dir)]
+        while pending:
+            prefix, source_dir, target_dir = pending.pop()
+            # Made on the first file, so directories left empty by removed
+            # pages disappear.
+            made = False
+            with os.scandir(source_dir) as entries:
+                for entry in entries:
+                    target = f"{target_dir}{os.sep}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append((f"{prefix}{entry.name}/", entry.path, target))
+                        continue
+                    if prefix + entry.name in self.removed:
+                        continue
+                    if not made:
+                        os.makedirs(target_dir, exist_ok=True)
+                        made = True
+                    try:
+                        os.link(entry.path, target)
+                    except FileExistsError:
+                        pass
+
+    def commit(self):
+        self.wait()
+        if not os.path.isdir(self.staging_dir) and not self.removed:
+            return
+
+        live = live_dir(self.dest_dir)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        if live is not None:
+            self.link_unchanged(live)
+        previous = publish(self.staging_dir, self.dest_dir)
+        if previous is not None:
+            # Nothing reads the previous version any more, so it's removed
+            # while the rest of the build goes on. The thread isn't a
+            # daemon: the interpreter waits for it before exiting.
+            import shutil
+            import threading
+            self.cleanup = threading.Thread(target=shutil.rmtree, args=(previous, True))
+            self.cleanup.start()
+
+    def discard(self):
+        # Drops the version being built, and anything a crashed build left
+        # next to the live one.
+        self.stop()
+        versions_dir = versions_dir_for(self.dest_dir)
+        if not os.path.isdir(versions_dir):
+            return
+        import shutil
+        live = live_dir(self.dest_dir)
+        for name in os.listdir(versions_dir):
+            path = os.path.join(versions_dir, name)
+            if os.path.realpath(path) != live:
+                shutil.rmtree(path, ignore_errors=True)
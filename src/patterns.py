@@ -0,0 +1,8 @@
+import functools
+import re
+
+@functools.cache
+def compiled(pattern):
+    # Patterns are compiled on first use rather than at import time, so
+    # commands that never match one don't pay for compiling it.
+    return re.compile(pattern)
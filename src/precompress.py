@@ -0,0 +1,138 @@
+import json
+import os
+
+from build import find_files, hash_file, remove_output, save_manifest
+
+PRECOMPRESS_MANIFEST_VERSION = 1
+
+PRECOMPRESS_EXTENSIONS = (".html", ".css")
+# Small files gain nothing worth an extra file, and servers skip them too.
+PRECOMPRESS_MIN_BYTES = 256
+
+# Sibling suffix and encoding name of every encoding this stage can write.
+ENCODINGS = ((".gz", "gzip"), (".br", "br"))
+
+class PrecompressResult:
+    def __init__(self):
+        self.compressed = []
+        self.removed = []
+        self.unchanged = 0
+        self.encodings = []
+
+    def __repr__(self):
+        return (
+            f"PrecompressResult(compressed={len(self.compressed)}, removed={len(self.removed)}, "
+            f"unchanged={self.unchanged})"
+        )
+
+def available_encodings():
+    # gzip is always there; brotli only when the optional package is
+    # installed. Without it, stale .br siblings are removed rather than
+    # left behind to be served with the wrong content.
+    try:
+        import brotli
+    except ImportError:
+        return ("gzip",)
+    return ("gzip", "br")
+
+def compress(data, encoding):
+    if encoding == "gzip":
+        import gzip
+        # A fixed mtime keeps the output identical for identical input.
+        return gzip.compress(data, compresslevel=9, mtime=0)
+
+    import brotli
+    return brotli.compress(data, quality=11)
+
+def compress_file(task):
+    path, encodings = task
+    with open(path, "rb") as f:
+        data = f.read()
+    for suffix, encoding in ENCODINGS:
+        if encoding not in encodings:
+            continue
+        tmp_path = f"{path}{suffix}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compress(data, encoding))
+        os.replace(tmp_path, f"{path}{suffix}")
+
+def empty_precompress_manifest():
+    return {"version": PRECOMPRESS_MANIFEST_VERSION, "files": {}}
+
+def load_precompress_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return empty_precompress_manifest()
+
+    if not isinstance(manifest, dict) or manifest.get("version") != PRECOMPRESS_MANIFEST_VERSION:
+        return empty_precompress_manifest()
+
+    return manifest
+
+def precompress_site(dest_dir, manifest_path, jobs=1, encodings=None):
+    # Writes .gz (and .br) siblings next to every HTML and CSS file in
+    # dest_dir so a server can send them as they are. A file is only
+    # compressed again when its content hash changes or a sibling is
+    # missing; rewriting a page with the same bytes costs one hash.
+    if encodings is None:
+        encodings = available_encodings()
+
+    old_manifest = load_precompress_manifest(manifest_path)
+    old_files = old_manifest["files"]
+    dest_files = set(find_files(dest_dir, ""))
+
+    result = PrecompressResult()
+    result.encodings = list(encodings)
+    new_files = {}
+    tasks = []
+    for output in sorted(dest_files):
+        if not output.endswith(PRECOMPRESS_EXTENSIONS):
+            continue
+        path = os.path.join(dest_dir, output)
+        stat = os.stat(path)
+        if stat.st_size < PRECOMPRESS_MIN_BYTES:
+            continue
+
+        entry = old_files.get(output)
+        siblings = [f"{output}{suffix}" for suffix, encoding in ENCODINGS if encoding in encodings]
+        complete = all(sibling in dest_files for sibling in siblings)
+        if entry is not None and complete and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            new_files[output] = entry
+            result.unchanged += 1
+            continue
+
+        file_hash = hash_file(path)
+        new_files[output] = {"hash": file_hash, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        if entry is not None and complete and entry["hash"] == file_hash:
+            result.unchanged += 1
+            continue
+
+        tasks.append((path, encodings))
+        result.compressed.append(output)
+
+    # zlib and brotli release the GIL while compressing, so threads run in
+    # parallel without the cost of starting processes.
+    if jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(compress_file, tasks))
+    else:
+        for task in tasks:
+            compress_file(task)
+
+    # Siblings of files that went away, shrank below the threshold, or are
+    # in an encoding no longer available would be served stale.
+    for output in sorted(old_files.keys() | new_files.keys()):
+        for suffix, encoding in ENCODINGS:
+            sibling = f"{output}{suffix}"
+            if (output not in new_files or encoding not in encodings) and sibling in dest_files:
+                remove_output(dest_dir, sibling)
+                result.removed.append(sibling)
+
+    manifest = {"version": PRECOMPRESS_MANIFEST_VERSION, "files": new_files}
+    if manifest != old_manifest:
+        save_manifest(manifest_path, manifest)
+
+    return result
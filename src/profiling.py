@@ -0,0 +1,196 @@
+import cProfile
+import functools
+import importlib
+import json
+import sys
+import time
+
+# Pipeline entry points and the stage each one is billed to. Profiling is
+# opt-in: Profiler.start() swaps these for timing wrappers in every module
+# that imported them, and stop() puts the originals back, so a normal
+# build runs the unwrapped functions with no overhead at all.
+FUNCTION_STAGES = [
+    ("gencontent", "generate_page", "page_io"),
+    ("gencontent", "write_page_file", "page_io"),
+    ("gencontent", "generate_page_html", "page_io"),
+    ("block_markdown", "write_markdown_html", "block_parse"),
+    ("block_markdown", "markdown_to_html_node", "block_parse"),
+    ("block_markdown", "block_to_html_node", "tree_build"),
+    ("highlight", "highlight", "highlight"),
+    ("inline_markdown", "text_to_textnodes", "inline_parse"),
+    ("inline_markdown", "split_nodes_delimiter", "inline_parse"),
+    ("inline_markdown", "split_nodes_image", "inline_parse"),
+    ("inline_markdown", "split_nodes_link", "inline_parse"),
+    ("textnode", "text_nodes_to_html", "inline_render"),
+    ("textnode", "text_node_to_html_node", "inline_render"),
+]
+
+METHOD_STAGES = [
+    ("htmlnode", "HTMLNode", "write_html", "serialize"),
+    ("htmlnode", "ParentNode", "to_html", "serialize"),
+]
+
+STAGES = ["page_io", "block_parse", "tree_build", "highlight", "inline_parse", "inline_render", "serialize"]
+
+class StageStats:
+    __slots__ = ("calls", "seconds", "nodes", "chars")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.nodes = 0
+        self.chars = 0
+
+class CountingWriter:
+    def __init__(self, fp):
+        self.fp = fp
+        self.chars = 0
+
+    def write(self, text):
+        self.chars += len(text)
+        return self.fp.write(text)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+def count_nodes(result):
+    if isinstance(result, list):
+        return len(result)
+    children = getattr(result, "children", None)
+    if children is not None:
+        return 1 + len(children)
+    return 0
+
+class Profiler:
+    def __init__(self, trace=False, cprofile=False):
+        self.stages = {stage: StageStats() for stage in STAGES}
+        self.pages = []
+        self.events = [] if trace else None
+        self.cprofile = cProfile.Profile() if cprofile else None
+        # Each open call keeps a running total of time spent in nested
+        # instrumented calls, so stage times are exclusive.
+        self.stack = []
+        self.patched = []
+        self.origin = time.perf_counter()
+
+    def start(self):
+        for module_name, attribute, stage in FUNCTION_STAGES:
+            module = importlib.import_module(module_name)
+            original = getattr(module, attribute)
+            wrapper = self.wrap(original, stage)
+            for other in list(sys.modules.values()):
+                if getattr(other, "__dict__", {}).get(attribute) is original:
+                    setattr(other, attribute, wrapper)
+                    self.patched.append((other, attribute, original))
+
+        for module_name, class_name, attribute, stage in METHOD_STAGES:
+            cls = getattr(importlib.import_module(module_name), class_name)
+            original = cls.__dict__[attribute]
+            setattr(cls, attribute, self.wrap(original, stage))
+            self.patched.append((cls, attribute, original))
+
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def stop(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+        for target, attribute, original in reversed(self.patched):
+            setattr(target, attribute, original)
+        self.patched = []
+
+    def wrap(self, func, stage):
+        if func.__name__ in ("generate_page", "write_page_file"):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return self.call_page(func, args, kwargs)
+        elif func.__name__ == "write_html":
+            @functools.wraps(func)
+            def wrapper(node, fp, minify=False):
+                writer = CountingWriter(fp)
+                self.call(stage, func, (node, writer, minify), {})
+                self.stages[stage].chars += writer.chars
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return self.call(stage, func, args, kwargs)
+        return wrapper
+
+    def call(self, stage, func, args, kwargs):
+        self.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += elapsed
+
+            stats = self.stages[stage]
+            stats.calls += 1
+            stats.seconds += elapsed - nested
+            if self.events is not None:
+                self.events.append((func.__qualname__, stage, start, elapsed))
+
+        stats.nodes += count_nodes(result)
+        if isinstance(result, str):
+            stats.chars += len(result)
+        return result
+
+    def call_page(self, func, args, kwargs):
+        # generate_page calls write_page_file; only the outer call is a page.
+        if self.stack:
+            return self.call("page_io", func, args, kwargs)
+
+        before = {stage: stats.seconds for stage, stats in self.stages.items()}
+        start = time.perf_counter()
+        result = self.call("page_io", func, args, kwargs)
+        elapsed = time.perf_counter() - start
+        breakdown = {
+            stage: stats.seconds - before[stage] for stage, stats in self.stages.items()
+        }
+        self.pages.append((str(args[0]), elapsed, breakdown))
+        return result
+
+    def report(self, top=10):
+        lines = [f"{'stage':<14} {'calls':>9} {'seconds':>9} {'nodes':>10} {'chars':>12}"]
+        for stage, stats in self.stages.items():
+            lines.append(
+                f"{stage:<14} {stats.calls:>9} {stats.seconds:>9.3f} {stats.nodes:>10} {stats.chars:>12}"
+            )
+
+        if self.pages:
+            lines.append("")
+            lines.append(f"slowest {min(top, len(self.pages))} of {len(self.pages)} pages:")
+            slowest = sorted(self.pages, key=lambda page: page[1], reverse=True)[:top]
+            for path, elapsed, breakdown in slowest:
+                heaviest = max(breakdown, key=breakdown.get)
+                lines.append(f"  {elapsed * 1000:>9.2f} ms  {path}  (mostly {heaviest})")
+
+        return "\n".join(lines)
+
+    def dump_stats(self, path):
+        if self.cprofile is None:
+            raise ValueError("profiler was not created with cprofile=True")
+        self.cprofile.dump_stats(path)
+
+    def write_trace(self, path):
+        if self.events is None:
+            raise ValueError("profiler was not created with trace=True")
+
+        events = []
+        for name, stage, start, elapsed in self.events:
+            events.append({
+                "name": name,
+                "cat": stage,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": elapsed * 1e6,
+                "pid": 0,
+                "tid": 0,
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events}, f)
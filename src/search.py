@@ -0,0 +1,363 @@
+import functools
+import json
+import os
+import tempfile
+
+from block_markdown import block_inline_texts, iter_blocks
+from inline_markdown import text_to_textnodes
+from patterns import compiled
+from textnode import TextType
+
+# Bump whenever tokenizing, stemming or the shard encoding changes; an
+# index of another version is rebuilt from scratch. static/search.js must
+# match all three.
+SEARCH_INDEX_VERSION = 2
+
+# Terms are sharded by their first characters, so a query only fetches
+# the shards for its own terms.
+SEARCH_PREFIX_LENGTH = 2
+SHARD_NAME_PATTERN = r"^[a-z0-9]+$"
+
+# Postings waiting to be merged into shards are kept in memory up to about
+# this many bytes, then spilled to disk, so memory stays bounded however
+# many pages change at once.
+SEARCH_SPILL_BYTES = 8_000_000
+
+# Link text and image alt text describe other pages, so only these count.
+INDEXED_TEXT_TYPES = {TextType.TEXT, TextType.BOLD, TextType.ITALIC, TextType.CODE}
+TOKEN_PATTERN = r"[^\W_]+"
+
+# Suffix, replacement and the shortest word it applies to, tried in order.
+# Deliberately light: it conflates plurals and common verb forms and
+# little else, which keeps it predictable and easy to mirror in the browser.
+STEM_RULES = (
+    ("sses", "ss", 5),
+    ("ies", "y", 5),
+    ("ing", "", 6),
+    ("ed", "", 5),
+    ("ly", "", 5),
+    # "es" is only a plural ending after a sibilant ("boxes", "dishes");
+    # elsewhere the "s" rule keeps "pages" and "files" with "page" and
+    # "file". A single z or a ch before it usually belongs to the word
+    # ("sizes", "caches"), so those go to the "s" rule too.
+    ("xes", "x", 5),
+    ("zzes", "zz", 6),
+    ("shes", "sh", 6),
+    ("tches", "tch", 7),
+    ("s", "", 4),
+)
+
+class SearchResult:
+    def __init__(self):
+        self.indexed = []
+        self.removed = []
+        self.shards = []
+
+    def __repr__(self):
+        return f"SearchResult(indexed={len(self.indexed)}, removed={len(self.removed)}, shards={len(self.shards)})"
+
+# A site's vocabulary is far smaller than its word count, so most tokens
+# are stemmed once.
+@functools.lru_cache(maxsize=65536)
+def stem(token):
+    for suffix, replacement, min_length in STEM_RULES:
+        if len(token) >= min_length and token.endswith(suffix):
+            if suffix == "s" and token.endswith("ss"):
+                return token
+            stemmed = token[:-len(suffix)] + replacement
+            # "running" and "stopped" should meet "run" and "stop".
+            if suffix in ("ing", "ed") and stemmed[-1] == stemmed[-2] and stemmed[-1] not in "aeioulsz":
+                stemmed = stemmed[:-1]
+            return stemmed
+    return token
+
+def tokenize(text):
+    return list(map(stem, compiled(TOKEN_PATTERN).findall(text.lower())))
+
+def iter_inline_nodes(lines):
+    # The TextNodes of each piece of inline markdown on a page, parsed but
+    # never rendered, for pages the AST cache doesn't have.
+    for block in iter_blocks(lines):
+        for text in block_inline_texts(block):
+            yield text_to_textnodes(text)
+
+def cached_inline_nodes(blocks):
+    # The same, from blocks ASTCache.page_nodes returns.
+    for _, inline in blocks:
+        yield from inline
+
+def page_terms(inline_nodes):
+    # Maps each term of a page to the positions, in words from the start of
+    # its indexed text, where it occurs.
+    terms = {}
+    position = 0
+    for text_nodes in inline_nodes:
+        for node in text_nodes:
+            if node.text_type not in INDEXED_TEXT_TYPES:
+                continue
+            for term in tokenize(node.text):
+                terms.setdefault(term, []).append(position)
+                position += 1
+    return terms
+
+def shard_name(term):
+    prefix = term[:SEARCH_PREFIX_LENGTH]
+    return prefix if compiled(SHARD_NAME_PATTERN).match(prefix) else "_"
+
+def encode_varint(out, number):
+    while number >= 0x80:
+        out.append(number & 0x7F | 0x80)
+        number >>= 7
+    out.append(number)
+
+def decode_varint(data, offset):
+    number = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        number |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return number, offset
+        shift += 7
+
+def encode_positions(out, positions):
+    deltas = [position - previous for previous, position in zip([0] + positions, positions)]
+    # Nearly every gap fits in one byte, which bytes() writes in one go.
+    if len(deltas) < 0x80 and max(deltas) < 0x80:
+        out.append(len(deltas))
+        out += bytes(deltas)
+        return
+    encode_varint(out, len(deltas))
+    for delta in deltas:
+        encode_varint(out, delta)
+
+def decode_positions(data, offset):
+    count, offset = decode_varint(data, offset)
+    positions = []
+    position = 0
+    for _ in range(count):
+        delta, offset = decode_varint(data, offset)
+        position += delta
+        positions.append(position)
+    return positions, offset
+
+def encode_string(out, text):
+    data = text.encode("utf-8")
+    encode_varint(out, len(data))
+    out += data
+
+def decode_string(data, offset):
+    length, offset = decode_varint(data, offset)
+    return str(data[offset:offset + length], "utf-8"), offset + length
+
+def encode_shard(terms):
+    # terms maps term -> {doc id: positions}. Terms are sorted; each has its
+    # documents in id order, as gaps from the previous id, and each
+    # document its positions, as gaps from the previous position.
+    out = bytearray()
+    encode_varint(out, len(terms))
+    for term in sorted(terms):
+        postings = terms[term]
+        encode_string(out, term)
+        encode_varint(out, len(postings))
+        previous = 0
+        for doc in sorted(postings):
+            encode_varint(out, doc - previous)
+            encode_positions(out, postings[doc])
+            previous = doc
+    return bytes(out)
+
+def decode_shard(data):
+    terms = {}
+    count, offset = decode_varint(data, 0)
+    for _ in range(count):
+        term, offset = decode_string(data, offset)
+        documents, offset = decode_varint(data, offset)
+        postings = terms[term] = {}
+        doc = 0
+        for _ in range(documents):
+            delta, offset = decode_varint(data, offset)
+            doc += delta
+            postings[doc], offset = decode_positions(data, offset)
+    return terms
+
+def encode_page_postings(out, doc, terms):
+    # One page's terms within one shard, as spilled before merging.
+    encode_varint(out, doc)
+    encode_varint(out, len(terms))
+    for term, positions in terms:
+        encode_string(out, term)
+        encode_positions(out, positions)
+
+def merge_page_postings(shard, data):
+    offset = 0
+    while offset < len(data):
+        doc, offset = decode_varint(data, offset)
+        count, offset = decode_varint(data, offset)
+        for _ in range(count):
+            term, offset = decode_string(data, offset)
+            shard.setdefault(term, {})[doc], offset = decode_positions(data, offset)
+
+def empty_state():
+    return {"version": SEARCH_INDEX_VERSION, "docs": {}}
+
+def load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return empty_state()
+
+    if not isinstance(state, dict) or state.get("version") != SEARCH_INDEX_VERSION:
+        return empty_state()
+    return state
+
+def write_file(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class ShardWriter:
+    # Collects page postings by shard, spilling them to one file per shard
+    # once SEARCH_SPILL_BYTES are buffered.
+    def __init__(self, spill_dir, spill_bytes=SEARCH_SPILL_BYTES):
+        self.spill_dir = spill_dir
+        self.spill_bytes = spill_bytes
+        self.buffers = {}
+        self.buffered = 0
+        self.spilled = set()
+
+    def add(self, doc, terms):
+        # Returns the shards the page's terms fall in.
+        by_shard = {}
+        for term, positions in terms.items():
+            by_shard.setdefault(shard_name(term), []).append((term, positions))
+
+        for name, shard_terms in by_shard.items():
+            out = self.buffers.setdefault(name, bytearray())
+            size = len(out)
+            encode_page_postings(out, doc, shard_terms)
+            self.buffered += len(out) - size
+
+        if self.buffered > self.spill_bytes:
+            self.spill()
+        return sorted(by_shard)
+
+    def spill(self):
+        for name, out in self.buffers.items():
+            with open(os.path.join(self.spill_dir, name), "ab") as f:
+                f.write(out)
+            self.spilled.add(name)
+        self.buffers = {}
+        self.buffered = 0
+
+    def merge_into(self, name, shard):
+        if name in self.spilled:
+            with open(os.path.join(self.spill_dir, name), "rb") as f:
+                merge_page_postings(shard, f.read())
+        merge_page_postings(shard, self.buffers.get(name, b""))
+
+def update_search_index(content_dir, dest_dir, pages, state_path, spill_bytes=SEARCH_SPILL_BYTES, ast_cache=None):
+    # Brings the index in dest_dir/search up to date with pages, the build
+    # manifest's entries. Only pages whose source changed since they were
+    # indexed are read, from ast_cache when given, and only the shards
+    # holding their old or new terms are rewritten; everything else is
+    # left as it is on disk.
+    index_dir = os.path.join(dest_dir, "search")
+    state = load_state(state_path)
+    docs = state["docs"]
+    existing = set(os.listdir(index_dir)) if os.path.isdir(index_dir) else set()
+    # A shard that went missing can't be patched, so start over.
+    if any(f"{name}.bin" not in existing for _, _, shards in docs.values() for name in shards):
+        state = empty_state()
+        docs = state["docs"]
+    # Starting over, shards left by an older index would mix in its ids.
+    if not docs:
+        for name in existing:
+            if name.endswith(".bin"):
+                os.remove(os.path.join(index_dir, name))
+
+    result = SearchResult()
+    affected = set()
+    stale = set()
+    for source in [source for source in docs if source not in pages]:
+        doc, _, shards = docs.pop(source)
+        stale.add(doc)
+        affected.update(shards)
+        result.removed.append(source)
+
+    changed = [
+        source for source, entry in pages.items()
+        if source not in docs or docs[source][1] != entry["source"]
+    ]
+    if not changed and not result.removed and os.path.exists(os.path.join(index_dir, "docs.json")):
+        return result
+
+    os.makedirs(index_dir, exist_ok=True)
+    used = {doc for doc, _, _ in docs.values()}
+    free = (doc for doc in range(len(pages) + len(stale) + len(used) + 1) if doc not in used)
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        writer = ShardWriter(spill_dir, spill_bytes)
+        for source in sorted(changed):
+            # One page's terms at a time, straight into the writer.
+            if source in docs:
+                doc, _, shards = docs[source]
+                stale.add(doc)
+                affected.update(shards)
+            else:
+                doc = next(free)
+            source_path = os.path.join(content_dir, source)
+            if ast_cache is not None:
+                entry = pages[source]
+                blocks = ast_cache.page_nodes(entry["output"], source_path, entry["source"])
+                terms = page_terms(cached_inline_nodes(blocks))
+            else:
+                with open(source_path, encoding="utf-8") as f:
+                    terms = page_terms(iter_inline_nodes(f))
+            shards = writer.add(doc, terms)
+            docs[source] = [doc, pages[source]["source"], shards]
+            affected.update(shards)
+            result.indexed.append(source)
+
+        for name in sorted(affected):
+            path = os.path.join(index_dir, f"{name}.bin")
+            shard = {}
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    shard = decode_shard(f.read())
+                for term in list(shard):
+                    postings = shard[term]
+                    for doc in stale.intersection(postings):
+                        del postings[doc]
+                    if not postings:
+                        del shard[term]
+
+            writer.merge_into(name, shard)
+            if shard:
+                write_file(path, encode_shard(shard))
+            elif os.path.exists(path):
+                os.remove(path)
+            result.shards.append(name)
+
+    # The browser looks documents up by id, so removed ids become nulls
+    # until a new page reuses them.
+    urls = [None] * (max((doc for doc, _, _ in docs.values()), default=-1) + 1)
+    for source, (doc, _, _) in docs.items():
+        urls[doc] = ["/" + pages[source]["output"], pages[source]["title"]]
+    shards = sorted({name for _, _, names in docs.values() for name in names})
+    index = {
+        "version": SEARCH_INDEX_VERSION,
+        "prefix_length": SEARCH_PREFIX_LENGTH,
+        "docs": urls,
+        "shards": shards,
+    }
+    write_file(os.path.join(index_dir, "docs.json"), json.dumps(index, separators=(",", ":")).encode("utf-8"))
+
+    directory = os.path.dirname(state_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_file(state_path, json.dumps(state, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+    return result
@@ -0,0 +1,213 @@
+import functools
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build import build_site
+from copystatic import copy_static
+from linkcheck import format_broken
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + LIVERELOAD_PATH + "\")"
+    ".onmessage = function () { location.reload(); };</script>"
+)
+
+def inject_livereload(html):
+    index = html.rfind("</body>")
+    if index == -1:
+        return html + LIVERELOAD_SCRIPT
+    return html[:index] + LIVERELOAD_SCRIPT + html[index:]
+
+class ReloadNotifier:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.generation = 0
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+class Watcher:
+    # Polls modification times rather than relying on inotify, which keeps
+    # it portable and dependency-free.
+    def __init__(self, roots, include=None):
+        self.roots = roots
+        self.include = include
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        directories = []
+        for root in self.roots:
+            if os.path.isdir(root):
+                directories.append(root)
+            else:
+                self.record(snapshot, root)
+
+        while directories:
+            try:
+                entries = os.scandir(directories.pop())
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        directories.append(entry.path)
+                    else:
+                        self.record(snapshot, entry.path)
+        return snapshot
+
+    def record(self, snapshot, path):
+        if self.include is not None and not self.include(path):
+            return
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self):
+        snapshot = self.scan()
+        changed = {
+            path for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        return changed
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, notifier=None, **kwargs):
+        # Set before super().__init__, which handles the request.
+        self.notifier = notifier
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == LIVERELOAD_PATH:
+            self.send_events()
+            return
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            # Without the trailing slash, relative URLs on the index page
+            # would resolve against the parent; the stock handler
+            # redirects, as a static host would.
+            if not self.path.partition("?")[0].partition("#")[0].endswith("/"):
+                super().do_GET()
+                return
+            path = os.path.join(path, "index.html")
+
+        if self.notifier is None or not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+
+        with open(path, encoding="utf-8") as f:
+            body = inject_livereload(f.read()).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+        generation = self.notifier.generation
+        try:
+            while True:
+                current = self.notifier.wait(generation, timeout=15)
+                if current != generation:
+                    self.wfile.write(b"data: reload\n\n")
+                    generation = current
+                else:
+                    # Comments keep the connection alive and let us notice
+                    # closed tabs.
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(dest_dir, port, notifier=None):
+    handler = functools.partial(LiveReloadHandler, directory=dest_dir, notifier=notifier)
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+def serve(
+    content_dir, template_path, dest_dir, manifest_path, static_dir, static_manifest_path,
+    port=8888, watch=False, interval=0.1, inline_cache=None, highlight_cache=None,
+):
+    copy_static(static_dir, dest_dir, static_manifest_path)
+    result = build_site(
+        content_dir, template_path, dest_dir, manifest_path,
+        inline_cache=inline_cache, highlight_cache=highlight_cache,
+    )
+    print(f"rebuilt {len(result.rebuilt)}, removed {len(result.removed)}, unchanged {result.unchanged}")
+    for line in format_broken(result.broken):
+        print(line)
+
+    notifier = ReloadNotifier() if watch else None
+    server = make_server(dest_dir, port, notifier)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"serving {dest_dir} at http://127.0.0.1:{server.server_address[1]}/")
+
+    try:
+        if not watch:
+            thread.join()
+            return
+
+        sources = Watcher(
+            [content_dir, template_path],
+            include=lambda path: path == template_path or path.endswith(".md"),
+        )
+        assets = Watcher([static_dir])
+        manifest = result.manifest
+
+        while True:
+            time.sleep(interval)
+
+            if assets.poll():
+                try:
+                    copy_static(static_dir, dest_dir, static_manifest_path)
+                except OSError as e:
+                    print(f"copying static assets failed: {e}")
+                    continue
+                print("static assets updated")
+                notifier.notify()
+
+            if sources.poll():
+                start = time.perf_counter()
+                try:
+                    result = build_site(
+                        content_dir, template_path, dest_dir, manifest_path,
+                        inline_cache=inline_cache, manifest=manifest, highlight_cache=highlight_cache,
+                    )
+                except Exception as e:
+                    print(f"build failed: {e}")
+                    continue
+                manifest = result.manifest
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"rebuilt {', '.join(result.rebuilt) or 'nothing'} in {elapsed:.0f}ms")
+                for line in format_broken({source: result.broken[source] for source in result.checked if source in result.broken}):
+                    print(line)
+                notifier.notify()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,91 @@
+import os
+
+from patterns import compiled
+
+SLOT_PATTERN = r"\{\{\s*(\w+)\s*\}\}"
+
+# Compiled templates keyed by their text, so compiling the same layout for
+# every page is a dict lookup. Cleared when full, like PROPS_HTML_CACHE.
+COMPILED_TEMPLATES = {}
+COMPILED_TEMPLATES_SIZE = 64
+
+# Templates loaded from disk, keyed by path, with the (mtime_ns, size) they
+# were read at so an edited file is picked up on the next load.
+TEMPLATE_FILES = {}
+
+class Template:
+    __slots__ = ("source", "parts", "slots", "repeated")
+
+    def __init__(self, source):
+        self.source = source
+        # Literal segments and slots alternate in parts; each slot is a
+        # None placeholder whose index and name are kept in slots.
+        self.parts = []
+        self.slots = []
+        position = 0
+        for match in compiled(SLOT_PATTERN).finditer(source):
+            self.parts.append(source[position:match.start()])
+            self.slots.append((len(self.parts), match.group(1)))
+            self.parts.append(None)
+            position = match.end()
+        self.parts.append(source[position:])
+        names = [name for _, name in self.slots]
+        self.repeated = frozenset(name for name in names if names.count(name) > 1)
+
+    def render(self, values):
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            parts[index] = self.value(values, name)
+        return "".join(parts)
+
+    def write(self, fp, values):
+        # Slot values may be callables taking fp, which lets large content
+        # stream straight to the output instead of being rendered first.
+        # Such a value can only be written once, so it can't fill a slot
+        # the template repeats.
+        for name in self.repeated:
+            if callable(values.get(name)):
+                raise ValueError(f"invalid template: streamed slot {{{{ {name} }}}} appears more than once")
+        for index, name in self.slots:
+            fp.write(self.parts[index - 1])
+            value = self.value(values, name)
+            if callable(value):
+                value(fp)
+            else:
+                fp.write(value)
+        fp.write(self.parts[-1])
+
+    def value(self, values, name):
+        try:
+            return values[name]
+        except KeyError:
+            raise ValueError(f"invalid template: no value for slot {{{{ {name} }}}}") from None
+
+    def __eq__(self, other):
+        return isinstance(other, Template) and self.source == other.source
+
+    def __hash__(self):
+        return hash(self.source)
+
+    def __repr__(self):
+        return f"Template({self.source!r})"
+
+def compile_template(source):
+    template = COMPILED_TEMPLATES.get(source)
+    if template is None:
+        if len(COMPILED_TEMPLATES) >= COMPILED_TEMPLATES_SIZE:
+            COMPILED_TEMPLATES.clear()
+        template = COMPILED_TEMPLATES[source] = Template(source)
+    return template
+
+def load_template(path):
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = TEMPLATE_FILES.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(path, encoding="utf-8") as f:
+        template = compile_template(f.read())
+    TEMPLATE_FILES[path] = (key, template)
+    return template
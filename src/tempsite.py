@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+
+class TempSiteTestCase(unittest.TestCase):
+    # Base for tests that build sites or otherwise work on files. Each test
+    # gets a fresh temporary directory, self.root, removed afterwards, with
+    # the usual site paths under it. Subclasses call super().setUp() first.
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+
+    def write(self, path, data):
+        # Relative paths are taken from self.root. Bytes are written as
+        # they are, text as UTF-8. Returns the full path.
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(data, bytes):
+            with open(path, "wb") as f:
+                f.write(data)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        return path
+
+    def read(self, path):
+        with open(os.path.join(self.root, path), encoding="utf-8") as f:
+            return f.read()
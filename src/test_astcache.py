@@ -0,0 +1,133 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+import astcache
+from astcache import ASTCache, decode_nodes, encode_nodes
+from block_markdown import iter_block_nodes
+from build import build_site
+from htmlnode import LeafNode, ParentNode, RawLeafNode
+from textnode import TextNode, TextType
+
+MARKDOWN = """# Title
+
+Some **bold** text with [a link](/about) & more.
+
+```python
+print("hi")
+```
+
+> quoted
+
+- one
+- two"""
+
+def sha(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def to_html(nodes):
+    return "".join(node.to_html() for node in nodes)
+
+class TestEncoding(unittest.TestCase):
+    def test_round_trips_block_trees(self):
+        nodes = list(iter_block_nodes(MARKDOWN.splitlines()))
+        loaded = decode_nodes(encode_nodes(nodes, sha(MARKDOWN)))
+        self.assertEqual(to_html(loaded), to_html(nodes))
+        self.assertIsInstance(loaded[1], ParentNode)
+        self.assertIsInstance(loaded[1].children[0], RawLeafNode)
+
+    def test_round_trips_props_and_unknown_tags(self):
+        nodes = [ParentNode("section", [LeafNode("img", "", {"src": "/a.png", "alt": "a"}), LeafNode(None, "x")])]
+        loaded = decode_nodes(encode_nodes(nodes, sha("")))
+        self.assertEqual(loaded[0].tag, "section")
+        self.assertDictEqual(loaded[0].children[0].props, {"src": "/a.png", "alt": "a"})
+        self.assertIsNone(loaded[0].props)
+        self.assertEqual(to_html(loaded), to_html(nodes))
+
+    def test_round_trips_text_nodes(self):
+        nodes = [TextNode("a", TextType.TEXT), TextNode("b", TextType.LINK, "/x"), TextNode("a", TextType.BOLD)]
+        self.assertListEqual(decode_nodes(encode_nodes(nodes, sha(""))), nodes)
+
+    def test_round_trips_lists(self):
+        blocks = [[LeafNode("p", "x"), [[TextNode("x", TextType.TEXT)], []]], [RawLeafNode("<hr>"), []]]
+        loaded = decode_nodes(encode_nodes(blocks, sha("")))
+        self.assertEqual(to_html(node for node, _ in loaded), "<p>x</p><hr>")
+        self.assertListEqual([inline for _, inline in loaded], [[[TextNode("x", TextType.TEXT)], []], []])
+
+    def test_strings_are_interned(self):
+        once = encode_nodes([LeafNode("p", "repeated text")], sha(""))
+        many = encode_nodes([LeafNode("p", "repeated text")] * 10, sha(""))
+        self.assertLess(len(many) - len(once), 9 * len("repeated text"))
+
+    def test_deep_trees_do_not_recurse(self):
+        node = LeafNode("b", "x")
+        for _ in range(5000):
+            node = ParentNode("i", [node])
+        loaded = decode_nodes(encode_nodes([node], sha("")))
+        self.assertEqual(loaded[0].to_html(), node.to_html())
+
+    def test_rejects_other_versions(self):
+        data = encode_nodes([LeafNode("p", "x")], sha(""))
+        old_version = astcache.AST_FORMAT_VERSION
+        astcache.AST_FORMAT_VERSION = old_version + 1
+        try:
+            with self.assertRaises(ValueError):
+                decode_nodes(data)
+        finally:
+            astcache.AST_FORMAT_VERSION = old_version
+
+class TestASTCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.cache = ASTCache(os.path.join(self.root, "ast"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_checks_source_hash(self):
+        nodes = list(iter_block_nodes(MARKDOWN.splitlines()))
+        self.cache.save("blog/post.html", sha(MARKDOWN), nodes)
+        self.assertEqual(to_html(self.cache.load("blog/post.html", sha(MARKDOWN))), to_html(nodes))
+        self.assertIsNone(self.cache.load("blog/post.html", sha("edited")))
+        self.assertIsNone(self.cache.load("missing.html", sha(MARKDOWN)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_page_nodes_parses_on_miss(self):
+        source = os.path.join(self.root, "page.md")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write(MARKDOWN)
+        first = self.cache.page_nodes("page.html", source, sha(MARKDOWN))
+        second = self.cache.page_nodes("page.html", source, sha(MARKDOWN))
+        self.assertEqual(to_html(node for node, _ in second), to_html(iter_block_nodes(MARKDOWN.splitlines())))
+        self.assertListEqual([inline for _, inline in first], [inline for _, inline in second])
+        self.assertListEqual(second[1][1], [[
+            TextNode("Some ", TextType.TEXT), TextNode("bold", TextType.BOLD), TextNode(" text with ", TextType.TEXT),
+            TextNode("a link", TextType.LINK, "/about"), TextNode(" & more.", TextType.TEXT),
+        ]])
+        self.assertListEqual(second[2][1], [])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_build_saves_and_removes_trees(self):
+        content = os.path.join(self.root, "content")
+        os.makedirs(os.path.join(content, "blog"))
+        with open(os.path.join(content, "blog", "post.md"), "w", encoding="utf-8") as f:
+            f.write(MARKDOWN)
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w", encoding="utf-8") as f:
+            f.write("{{ Content }}")
+
+        dest = os.path.join(self.root, "public")
+        manifest = os.path.join(self.root, "manifest.json")
+        result = build_site(content, template, dest, manifest, ast_cache=self.cache)
+        blocks = self.cache.load("blog/post.html", result.manifest["pages"]["blog/post.md"]["source"])
+        with open(os.path.join(dest, "blog", "post.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), f"<div>{to_html(node for node, _ in blocks)}</div>")
+
+        os.remove(os.path.join(content, "blog", "post.md"))
+        build_site(content, template, dest, manifest, ast_cache=self.cache)
+        self.assertFalse(os.path.exists(self.cache.path("blog/post.html")))
+
+if __name__ == "__main__":
+    unittest.main()
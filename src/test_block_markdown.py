@@ -0,0 +1,138 @@
+import io
+import unittest
+
+from block_markdown import BlockType, block_to_block_type, iter_blocks, markdown_to_blocks, markdown_to_html_node, write_markdown_html
+
+class TestBlockMarkdown(unittest.TestCase):
+    def test_markdown_to_blocks(self):
+        md = """
+This is **bolded** paragraph
+
+This is another paragraph with _italic_ text
+This is the same paragraph on a new line
+
+"""
+        self.assertListEqual(
+            [
+                "This is **bolded** paragraph",
+                "This is another paragraph with _italic_ text\nThis is the same paragraph on a new line",
+            ],
+            markdown_to_blocks(md),
+        )
+
+    def test_paragraphs(self):
+        md = """
+This is **bolded** paragraph
+text in a p
+tag here
+
+This is another paragraph with _italic_ text and `code` here
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+        )
+
+    def test_headings(self):
+        md = "# Title\n\n### Sub **title**\n\n####### not a heading"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><h1 id="title">Title</h1><h3 id="sub-title">Sub <b>title</b></h3><p>####### not a heading</p></div>',
+        )
+
+    def test_repeated_headings_get_unique_ids(self):
+        md = "## Dup\n\n## Dup\n\nText\n\n## Dup"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><h2 id="dup">Dup</h2><h2 id="dup-1">Dup</h2><p>Text</p><h2 id="dup-2">Dup</h2></div>',
+        )
+
+    def test_blocks_keep_blank_lines_in_code(self):
+        md = "Intro\n\n```python\ndef f():\n\n    return 1\n```\n\nOutro"
+        self.assertListEqual(
+            ["Intro", "```python\ndef f():\n\n    return 1\n```", "Outro"],
+            markdown_to_blocks(md),
+        )
+
+    def test_iter_blocks_is_lazy(self):
+        def lines():
+            yield "first block\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+
+        self.assertEqual(next(iter_blocks(lines())), "first block")
+
+    def test_iter_blocks_multiple_blank_lines(self):
+        self.assertListEqual(["a", "b"], list(iter_blocks(["a\n", "\n", "\n", "  \n", "b\n"])))
+
+    def test_block_to_block_type(self):
+        self.assertEqual(block_to_block_type("## heading"), BlockType.HEADING)
+        self.assertEqual(block_to_block_type("```\ncode\n```"), BlockType.CODE)
+        self.assertEqual(block_to_block_type("> quote\n> more"), BlockType.QUOTE)
+        self.assertEqual(block_to_block_type("- one\n- two"), BlockType.UNORDERED_LIST)
+        self.assertEqual(block_to_block_type("1. one\n2. two"), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type("1. one\n3. two"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("> quote\nnot quote"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("####### seven"), BlockType.PARAGRAPH)
+
+    def test_codeblock(self):
+        md = """
+```
+This is text that _should_ remain
+the **same** even with inline stuff
+```
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
+        )
+
+    def test_codeblock_language(self):
+        self.assertEqual(
+            markdown_to_html_node("```python\nx = 1\n```").to_html(),
+            '<div><pre><code class="language-python">x = <span class="hl-number">1</span>\n</code></pre></div>',
+        )
+
+    def test_codeblock_is_escaped(self):
+        self.assertEqual(
+            markdown_to_html_node("```\nif a < b && c:\n```").to_html(),
+            "<div><pre><code>if a &lt; b &amp;&amp; c:\n</code></pre></div>",
+        )
+
+    def test_paragraph_is_escaped(self):
+        self.assertEqual(
+            markdown_to_html_node('Tom & "Jerry" <3 **a < b** [x > y](/q?a=1&b=2)').to_html(),
+            '<div><p>Tom &amp; "Jerry" &lt;3 <b>a &lt; b</b> <a href="/q?a=1&amp;b=2">x &gt; y</a></p></div>',
+        )
+
+    def test_quote(self):
+        self.assertEqual(
+            markdown_to_html_node("> quoted **text**\n> continues").to_html(),
+            "<div><blockquote>quoted <b>text</b> continues</blockquote></div>",
+        )
+
+    def test_lists(self):
+        md = "- first\n- _second_\n\n1. one\n2. [two](/two)"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><ul><li>first</li><li><i>second</i></li></ul><ol><li>one</li><li><a href="/two">two</a></li></ol></div>',
+        )
+
+    def test_write_markdown_html_matches_tree(self):
+        md = "# Title\n\nSome `code` here\n\n- a\n- b\n\n> quote"
+        fp = io.StringIO()
+        write_markdown_html(io.StringIO(md), fp)
+        self.assertEqual(fp.getvalue(), markdown_to_html_node(md).to_html())
+
+    def test_write_markdown_html_minifies_inline_attributes(self):
+        md = "Go [home](/index.html) or [search](/s?q=a b)\n\n![logo](/logo.png)"
+        fp = io.StringIO()
+        write_markdown_html(io.StringIO(md), fp, minify=True)
+        self.assertEqual(
+            fp.getvalue(),
+            '<div><p>Go <a href=/index.html>home</a> or <a href="/s?q=a b">search</a></p>'
+            '<p><img src=/logo.png alt=logo></img></p></div>',
+        )
+
+if __name__ == "__main__":
+    unittest.main()
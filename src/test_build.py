@@ -0,0 +1,151 @@
+import json
+import os
+import unittest
+
+from build import build_site, load_manifest, manifest_shard, manifest_shard_dir
+from tempsite import TempSiteTestCase
+
+class TestBuildSite(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = os.path.join(self.root, ".cache", "manifest.json")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nHello")
+
+    def build(self, force=False, minify=False):
+        return build_site(self.content, self.template, self.dest, self.manifest, force=force, minify=minify)
+
+    def test_cold_build_renders_every_page(self):
+        result = self.build()
+        self.assertListEqual(["blog/post.md", "index.md"], result.rebuilt)
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "blog", "post.html")),
+            '<title>Post</title><div><h1 id="post">Post</h1><p>Hello</p></div>',
+        )
+        manifest = load_manifest(self.manifest)
+        self.assertEqual(manifest["pages"]["index.md"]["output"], "index.html")
+
+    def test_noop_build_rebuilds_nothing(self):
+        self.build()
+        result = self.build()
+        self.assertListEqual([], result.rebuilt)
+        self.assertEqual(result.unchanged, 2)
+
+    def test_edit_rebuilds_only_changed_page(self):
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome back")
+        result = self.build()
+        self.assertListEqual(["index.md"], result.rebuilt)
+        self.assertIn("Welcome back", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_touch_without_content_change_is_not_rebuilt(self):
+        self.build()
+        path = os.path.join(self.content, "index.md")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        result = self.build()
+        self.assertListEqual([], result.rebuilt)
+
+    def test_template_change_rebuilds_every_page(self):
+        self.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        result = self.build()
+        self.assertListEqual(["blog/post.md", "index.md"], result.rebuilt)
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        result = self.build()
+        self.assertListEqual(["index.md"], result.rebuilt)
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        result = self.build()
+        self.assertListEqual(["blog/post.md"], result.removed)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_force_rebuilds_every_page(self):
+        self.build()
+        result = self.build(force=True)
+        self.assertEqual(len(result.rebuilt), 2)
+
+    def test_minify_rebuilds_every_page(self):
+        self.build()
+        result = self.build(minify=True)
+        self.assertListEqual(["blog/post.md", "index.md"], result.rebuilt)
+        self.assertEqual(result.reasons["index.md"], "template changed")
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "blog", "post.html")),
+            "<title>Post</title><div><h1 id=post>Post</h1><p>Hello</p></div>",
+        )
+        self.assertListEqual([], self.build(minify=True).rebuilt)
+
+    def test_edit_rewrites_only_its_manifest_shard(self):
+        for number in range(20):
+            self.write(os.path.join(self.content, "many", f"{number}.md"), f"# Page {number}\n")
+        self.build()
+        shard_dir = manifest_shard_dir(self.manifest)
+        shards = {name: os.stat(os.path.join(shard_dir, name)).st_mtime_ns for name in os.listdir(shard_dir)}
+        self.assertGreater(len(shards), 1)
+
+        self.write(os.path.join(self.content, "many", "7.md"), "# Seven\n")
+        self.assertListEqual(["many/7.md"], self.build().rebuilt)
+        changed = [name for name in shards if os.stat(os.path.join(shard_dir, name)).st_mtime_ns != shards[name]]
+        self.assertListEqual([f"{manifest_shard('many/7.md')}.json"], changed)
+        self.assertEqual(load_manifest(self.manifest)["pages"]["many/7.md"]["title"], "Seven")
+
+    def test_mismatched_manifest_shard_rebuilds_every_page(self):
+        self.build()
+        # As if the build was interrupted after writing a shard but before
+        # the manifest that records it.
+        shard_path = os.path.join(manifest_shard_dir(self.manifest), f"{manifest_shard('index.md')}.json")
+        with open(shard_path, encoding="utf-8") as f:
+            data = json.load(f)
+        data["save"] = "interrupted"
+        with open(shard_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        self.assertListEqual(["blog/post.md", "index.md"], self.build().rebuilt)
+
+    def test_identical_output_is_not_written(self):
+        self.build()
+        path = os.path.join(self.dest, "index.html")
+        stat = os.stat(path)
+        # Trailing blank lines change the source but not the page.
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome\n\n\n")
+        result = self.build()
+        self.assertListEqual(["index.md"], result.rebuilt)
+        self.assertListEqual([], result.written)
+        self.assertEqual(os.stat(path).st_mtime_ns, stat.st_mtime_ns)
+
+    def test_failed_build_leaves_site_untouched(self):
+        self.build()
+        # Every page is re-rendered: blog/post.md first, then index.md fails.
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome **unclosed")
+        with self.assertRaises(ValueError):
+            self.build()
+        self.assertTrue(self.read(os.path.join(self.dest, "blog", "post.html")).startswith("<title>"))
+        self.assertEqual(os.listdir(os.path.join(self.root, ".public.versions")), [os.path.basename(os.path.realpath(self.dest))])
+
+    def test_parallel_build_matches_serial(self):
+        for number in range(10):
+            self.write(os.path.join(self.content, "many", f"{number}.md"), f"# Page {number}\n\n**bold** [link](/{number})")
+        self.build()
+
+        parallel_dest = os.path.join(self.root, "parallel")
+        parallel_manifest = os.path.join(self.root, "parallel.json")
+        result = build_site(self.content, self.template, parallel_dest, parallel_manifest, jobs=2)
+        self.assertEqual(len(result.rebuilt), 12)
+
+        for source in result.rebuilt:
+            output = source[:-len(".md")] + ".html"
+            self.assertEqual(
+                self.read(os.path.join(self.dest, output)),
+                self.read(os.path.join(parallel_dest, output)),
+            )
+
+if __name__ == "__main__":
+    unittest.main()
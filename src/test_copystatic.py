@@ -0,0 +1,142 @@
+import os
+import unittest
+
+from build import build_site
+from copystatic import copy_static, fingerprinted_path, load_static_manifest
+from gencontent import rewrite_asset_urls
+from tempsite import TempSiteTestCase
+
+class TestCopyStatic(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = os.path.join(self.root, ".cache", "static.json")
+        self.write(os.path.join(self.static, "styles.css"), "body { color: red; }")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png")
+        self.write(os.path.join(self.static, "robots.txt"), "User-agent: *")
+
+    def copy(self, **kwargs):
+        return copy_static(self.static, self.dest, self.manifest, **kwargs)
+
+    def test_copies_every_file(self):
+        result = self.copy()
+        self.assertListEqual(["images/logo.png", "robots.txt", "styles.css"], result.copied)
+        self.assertEqual(self.read(os.path.join(self.dest, "styles.css")), "body { color: red; }")
+        self.assertEqual(self.read(os.path.join(self.dest, "images", "logo.png")), "png")
+        self.assertDictEqual({}, result.asset_map)
+
+    def test_second_copy_skips_unchanged_files(self):
+        self.copy()
+        result = self.copy()
+        self.assertListEqual([], result.copied)
+        self.assertEqual(3, result.unchanged)
+
+    def test_touched_file_with_same_content_is_not_copied(self):
+        self.copy()
+        path = os.path.join(self.static, "styles.css")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        result = self.copy()
+        self.assertListEqual([], result.copied)
+        self.assertEqual(3, result.unchanged)
+
+    def test_changed_file_is_copied(self):
+        self.copy()
+        self.write(os.path.join(self.static, "styles.css"), "body { color: blue; }")
+        result = self.copy()
+        self.assertListEqual(["styles.css"], result.copied)
+        self.assertEqual(self.read(os.path.join(self.dest, "styles.css")), "body { color: blue; }")
+
+    def test_missing_output_is_copied_again(self):
+        self.copy()
+        os.remove(os.path.join(self.dest, "robots.txt"))
+        result = self.copy()
+        self.assertListEqual(["robots.txt"], result.copied)
+
+    def test_deleted_file_is_removed(self):
+        self.copy()
+        os.remove(os.path.join(self.static, "images", "logo.png"))
+        result = self.copy()
+        self.assertListEqual(["images/logo.png"], result.removed)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path("css/site.css", "0123456789abcdef"), "css/site.01234567.css")
+        self.assertEqual(fingerprinted_path("robots.txt", "0123456789abcdef"), "robots.txt")
+
+    def test_fingerprint_renames_assets(self):
+        result = self.copy(fingerprint=True)
+        styles = result.asset_map["/styles.css"]
+        self.assertRegex(styles, r"^/styles\.[0-9a-f]{8}\.css$")
+        self.assertRegex(result.asset_map["/images/logo.png"], r"^/images/logo\.[0-9a-f]{8}\.png$")
+        self.assertNotIn("/robots.txt", result.asset_map)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, styles[1:])))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "styles.css")))
+
+    def test_changed_content_removes_stale_fingerprint(self):
+        old = self.copy(fingerprint=True).asset_map["/styles.css"]
+        self.write(os.path.join(self.static, "styles.css"), "body { color: blue; }")
+        new = self.copy(fingerprint=True).asset_map["/styles.css"]
+        self.assertNotEqual(old, new)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, old[1:])))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, new[1:])))
+
+    def test_turning_fingerprinting_off_restores_plain_names(self):
+        fingerprinted = self.copy(fingerprint=True).asset_map["/styles.css"]
+        result = self.copy()
+        self.assertIn("styles.css", result.copied)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "styles.css")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, fingerprinted[1:])))
+        self.assertFalse(load_static_manifest(self.manifest)["fingerprint"])
+
+    def test_link_mode_hardlinks_assets(self):
+        self.copy(link=True)
+        source = os.path.join(self.static, "styles.css")
+        output = os.path.join(self.dest, "styles.css")
+        self.assertTrue(os.path.samefile(source, output))
+
+        self.write(source, "body { color: blue; }")
+        self.copy(link=True)
+        self.assertEqual(self.read(output), "body { color: blue; }")
+
+    def test_missing_static_directory_copies_nothing(self):
+        result = copy_static(os.path.join(self.root, "missing"), self.dest, self.manifest)
+        self.assertListEqual([], result.copied)
+
+class TestAssetUrls(TempSiteTestCase):
+    def test_rewrites_known_urls(self):
+        asset_map = {"/styles.css": "/styles.0123abcd.css"}
+        self.assertEqual(
+            rewrite_asset_urls('<link href="/styles.css"><a href="/about">x</a>', asset_map),
+            '<link href="/styles.0123abcd.css"><a href="/about">x</a>',
+        )
+
+    def test_leaves_text_outside_tags_alone(self):
+        asset_map = {"/styles.css": "/styles.0123abcd.css"}
+        self.assertEqual(
+            rewrite_asset_urls('<p>Write href="/styles.css".</p>', asset_map),
+            '<p>Write href="/styles.css".</p>',
+        )
+
+    def test_build_rewrites_pages(self):
+        self.write(
+            os.path.join(self.content, "index.md"),
+            '# Home\n\n![logo](/logo.png) [styles](/styles.css) `href="/styles.css"` src="/logo.png"',
+        )
+        self.write(self.template, '<link href="/styles.css">{{ Content }}')
+
+        manifest = os.path.join(self.root, "manifest.json")
+        asset_map = {"/styles.css": "/styles.0123abcd.css", "/logo.png": "/logo.4567ef01.png"}
+        build_site(self.content, self.template, self.dest, manifest, asset_map=asset_map)
+        html = self.read(os.path.join(self.dest, "index.html"))
+        self.assertIn('<link href="/styles.0123abcd.css">', html)
+        self.assertIn('<img src="/logo.4567ef01.png" alt="logo"></img>', html)
+        self.assertIn('<a href="/styles.0123abcd.css">styles</a>', html)
+        # Code and text that only look like attributes keep their URLs.
+        self.assertIn('<code>href="/styles.css"</code> src="/logo.png"', html)
+
+        # A new asset map changes every page even though no source did.
+        result = build_site(self.content, self.template, self.dest, manifest, asset_map={})
+        self.assertListEqual(["index.md"], result.rebuilt)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import io
+import os
+import unittest
+
+from build import build_site, load_manifest
+from depgraph import TEMPLATE_NODE, DependencyGraph
+from gencontent import generate_page_html, write_page
+from inline_cache import InlineCache
+from linkcheck import LinkTitles
+from tempsite import TempSiteTestCase
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.set_dependencies("index.md", [TEMPLATE_NODE, "about.html", "blog/post.html"])
+        self.graph.set_dependencies("about.md", [TEMPLATE_NODE])
+        self.graph.set_dependencies("blog/post.md", [TEMPLATE_NODE, "about.html"])
+
+    def test_dependents(self):
+        self.assertSetEqual(self.graph.dependents(["about.html"]), {"index.md", "blog/post.md"})
+        self.assertSetEqual(self.graph.dependents(["blog/post.html"]), {"index.md"})
+        self.assertSetEqual(self.graph.dependents([TEMPLATE_NODE]), {"index.md", "about.md", "blog/post.md"})
+        self.assertSetEqual(self.graph.dependents(["missing.html"]), set())
+
+    def test_remove(self):
+        self.graph.dependents(["about.html"])
+        self.graph.remove("index.md")
+        self.assertSetEqual(self.graph.dependents(["about.html"]), {"blog/post.md"})
+
+    def test_json_round_trip(self):
+        data = self.graph.to_json()
+        self.assertListEqual(data["nodes"], [TEMPLATE_NODE, "about.html", "blog/post.html"])
+        self.assertListEqual(data["pages"]["about.md"], [0])
+        self.assertListEqual(data["pages"]["index.md"], [0, 1, 2])
+        graph = DependencyGraph.from_json(data)
+        self.assertDictEqual(graph.dependencies, self.graph.dependencies)
+        graph.set_dependencies("about.md", [TEMPLATE_NODE, "new.html"])
+        self.assertListEqual(data["pages"]["about.md"], [0])
+
+    def test_unused_nodes_are_dropped(self):
+        for number in range(40):
+            self.graph.set_dependencies(f"{number}.md", [f"{number}.html"])
+        for number in range(40):
+            self.graph.remove(f"{number}.md")
+        data = self.graph.to_json()
+        self.assertListEqual(data["nodes"], [TEMPLATE_NODE, "about.html", "blog/post.html"])
+        self.assertSetEqual(self.graph.dependents(["about.html"]), {"index.md", "blog/post.md"})
+
+class TestLinkTitles(unittest.TestCase):
+    def test_fills_empty_links(self):
+        titles = {"about.html": "About <us>", "index.html": "Home"}
+        html = generate_page_html("# Home\n\nSee [](/about) and [](/missing).", "{{ Content }}")
+        self.assertIn('<a href="/about"></a>', html)
+
+        for inline_cache in (None, InlineCache()):
+            fp = io.StringIO()
+            write_page(
+                ["# Home", "", "See [](/about) and [](/missing), `[](/about)`."], "Home",
+                '<a href="/"></a>{{ Content }}', fp, inline_cache, link_titles=LinkTitles("index.html", titles),
+            )
+            self.assertEqual(
+                fp.getvalue(),
+                '<a href="/"></a><div><h1 id="home">Home</h1><p>See <a href="/about">About &lt;us&gt;</a>'
+                ' and <a href="/missing">/missing</a>, <code>[](/about)</code>.</p></div>',
+            )
+
+    def test_dependencies(self):
+        link_titles = LinkTitles("blog/post.html", {"about.html": "About", "blog/post.html": "Post"})
+        self.assertSetEqual(
+            link_titles.dependencies(["/about#team", "#top", "https://example.com", "../new"]),
+            {"about.html", "new", "new.html", "new/index.html"},
+        )
+
+class TestIncrementalDependencies(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nRead [](/about) or [](/blog/new).")
+        self.write(os.path.join(self.content, "about.md"), "# About\n\nHello")
+        self.write(os.path.join(self.content, "contact.md"), "# Contact\n\n[about](/about)")
+
+    def build(self):
+        return build_site(self.content, self.template, self.dest, self.manifest)
+
+    def test_cold_build_renders_titles(self):
+        self.build()
+        html = self.read(os.path.join(self.dest, "index.html"))
+        self.assertIn('<a href="/about">About</a>', html)
+        self.assertIn('<a href="/blog/new">/blog/new</a>', html)
+
+    def test_title_change_rebuilds_pages_showing_it(self):
+        self.build()
+        self.write(os.path.join(self.content, "about.md"), "# About us\n\nHello")
+        result = self.build()
+        self.assertListEqual(["about.md", "index.md"], result.rebuilt)
+        self.assertEqual(result.reasons["index.md"], "title of about.html changed")
+        self.assertIn('<a href="/about">About us</a>', self.read(os.path.join(self.dest, "index.html")))
+
+    def test_body_change_rebuilds_only_that_page(self):
+        self.build()
+        self.write(os.path.join(self.content, "about.md"), "# About\n\nHello again")
+        result = self.build()
+        self.assertListEqual(["about.md"], result.rebuilt)
+
+    def test_new_page_rebuilds_pages_linking_to_it(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "new.md"), "# New post\n\nFresh")
+        result = self.build()
+        self.assertListEqual(["blog/new.md", "index.md"], result.rebuilt)
+        self.assertIn('<a href="/blog/new">New post</a>', self.read(os.path.join(self.dest, "index.html")))
+
+    def test_template_change_is_recorded_as_reason(self):
+        self.build()
+        self.write(self.template, "<main>{{ Content }}</main>")
+        result = self.build()
+        self.assertListEqual(["about.md", "contact.md", "index.md"], result.rebuilt)
+        self.assertEqual(result.reasons["contact.md"], "template changed")
+
+    def test_manifest_records_graph_and_reasons(self):
+        self.build()
+        manifest = load_manifest(self.manifest)
+        self.assertEqual(manifest["pages"]["index.md"]["reason"], "new page")
+        graph = DependencyGraph.from_json(manifest["graph"])
+        self.assertListEqual(
+            graph.dependencies_of("index.md"),
+            [TEMPLATE_NODE, "about.html", "blog/new", "blog/new.html", "blog/new/index.html"],
+        )
+        self.assertListEqual(graph.dependencies_of("contact.md"), [TEMPLATE_NODE])
+
+    def test_parallel_build_fills_titles(self):
+        build_site(self.content, self.template, self.dest, self.manifest, jobs=2)
+        self.assertIn('<a href="/about">About</a>', self.read(os.path.join(self.dest, "index.html")))
+
+if __name__ == "__main__":
+    unittest.main()
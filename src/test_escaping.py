@@ -0,0 +1,29 @@
+import unittest
+from html import escape
+
+from escaping import escape_attribute, escape_text, needs_escape
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a < b && c > "d"'), 'a &lt; b &amp;&amp; c &gt; "d"')
+
+    def test_escape_text_fast_path_returns_same_string(self):
+        text = "nothing to see here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attribute(text), text)
+
+    def test_escape_attribute(self):
+        self.assertEqual(escape_attribute("""/q?a=1&b="2"&c='<3>'"""), escape("""/q?a=1&b="2"&c='<3>'"""))
+
+    def test_matches_html_escape(self):
+        for text in ["", "&amp;", "<<>>", "it's", 'say "hi"', "ünïcode & more"]:
+            self.assertEqual(escape_text(text), escape(text, quote=False))
+            self.assertEqual(escape_attribute(text), escape(text))
+
+    def test_needs_escape(self):
+        self.assertFalse(needs_escape("plain **bold** [link](/about)"))
+        for character in "&<>\"'":
+            self.assertTrue(needs_escape(f"a {character} b"))
+
+if __name__ == "__main__":
+    unittest.main()
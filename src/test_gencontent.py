@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from gencontent import extract_title, generate_page, generate_page_html
+
+class TestGenContent(unittest.TestCase):
+    def test_extract_title(self):
+        self.assertEqual(extract_title("intro\n# Hello  \n## Sub"), "Hello")
+
+    def test_extract_title_missing(self):
+        with self.assertRaises(ValueError):
+            extract_title("## Only a subheading")
+
+    def test_generate_page_html(self):
+        template = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+        self.assertEqual(
+            generate_page_html("# Hi\n\nSome [link](/about)", template),
+            '<title>Hi</title><main><div><h1 id="hi">Hi</h1><p>Some <a href="/about">link</a></p></div></main>',
+        )
+
+    def test_generate_page_html_escapes_title(self):
+        self.assertEqual(
+            generate_page_html("# Fish & <Chips>", "<title>{{ Title }}</title>"),
+            "<title>Fish &amp; &lt;Chips&gt;</title>",
+        )
+
+    def test_generate_page_html_lists_and_code(self):
+        template = "{{ Content }}"
+        md = "# T\n\n- one\n- **two**\n\n```\nx < 1\n```"
+        self.assertEqual(
+            generate_page_html(md, template),
+            '<div><h1 id="t">T</h1><ul><li>one</li><li><b>two</b></li></ul><pre><code>x &lt; 1\n</code></pre></div>',
+        )
+
+    def test_generate_page_streams_file(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "page.md")
+            dest = os.path.join(root, "public", "nested", "page.html")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("# Title\n\nHello _there_\n")
+
+            generate_page(source, "<title>{{ Title }}</title>{{ Content }}", dest)
+
+            with open(dest, encoding="utf-8") as f:
+                self.assertEqual(
+                    f.read(),
+                    '<title>Title</title><div><h1 id="title">Title</h1><p>Hello <i>there</i></p></div>',
+                )
+
+if __name__ == "__main__":
+    unittest.main()
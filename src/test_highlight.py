@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+
+from block_markdown import iter_code_blocks, markdown_to_html_node
+from highlight import HIGHLIGHT_POOL_THRESHOLD, HighlightCache, highlight, lexer_name
+
+class TestHighlight(unittest.TestCase):
+    def test_python(self):
+        self.assertEqual(
+            highlight('def f(x):  # add\n    return x + 1.5, "a<b"\n', "python"),
+            '<span class="hl-keyword">def</span> f(x):  <span class="hl-comment"># add</span>\n'
+            '    <span class="hl-keyword">return</span> x + <span class="hl-number">1.5</span>, '
+            '<span class="hl-string">"a&lt;b"</span>\n',
+        )
+
+    def test_python_decorator_and_builtin(self):
+        self.assertEqual(
+            highlight("@cache\nprint(len(x))", "py"),
+            '<span class="hl-decorator">@cache</span>\n'
+            '<span class="hl-builtin">print</span>(<span class="hl-builtin">len</span>(x))',
+        )
+
+    def test_triple_quoted_string_spans_lines(self):
+        self.assertEqual(
+            highlight('x = """a\nb"""', "python"),
+            'x = <span class="hl-string">"""a\nb"""</span>',
+        )
+
+    def test_javascript(self):
+        self.assertEqual(
+            highlight("const x = `hi`; // note", "js"),
+            '<span class="hl-keyword">const</span> x = <span class="hl-string">`hi`</span>; '
+            '<span class="hl-comment">// note</span>',
+        )
+
+    def test_shell(self):
+        self.assertEqual(
+            highlight("echo $HOME # home", "bash"),
+            '<span class="hl-builtin">echo</span> <span class="hl-variable">$HOME</span> '
+            '<span class="hl-comment"># home</span>',
+        )
+
+    def test_json(self):
+        self.assertEqual(
+            highlight('{"a": [1, true]}', "json"),
+            '{<span class="hl-key">"a"</span>: [<span class="hl-number">1</span>, '
+            '<span class="hl-keyword">true</span>]}',
+        )
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight("x", "cobol"))
+        self.assertIsNone(lexer_name("cobol"))
+        self.assertEqual(lexer_name("TypeScript"), "javascript")
+
+    def test_unknown_language_block_is_escaped_not_highlighted(self):
+        self.assertEqual(
+            markdown_to_html_node("```cobol\nA < B\n```").to_html(),
+            '<div><pre><code class="language-cobol">A &lt; B\n</code></pre></div>',
+        )
+
+    def test_iter_code_blocks(self):
+        md = "# T\n\n```python\nx = 1\n```\n\ntext\n\n```\nplain\n```"
+        self.assertListEqual([("python", "x = 1\n"), ("", "plain\n")], list(iter_code_blocks(md.splitlines())))
+
+class TestHighlightCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = HighlightCache()
+        first = cache.render("x = 1\n", "python")
+        self.assertEqual(first, cache.render("x = 1\n", "py"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+        self.assertIsNone(cache.render("x", "cobol"))
+        self.assertEqual(len(cache), 1)
+
+    def test_rendering_uses_cache(self):
+        cache = HighlightCache()
+        md = "```python\nx = 1\n```"
+        self.assertEqual(
+            markdown_to_html_node(md, highlight_cache=cache).to_html(),
+            markdown_to_html_node(md).to_html(),
+        )
+        markdown_to_html_node(md, highlight_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_size_eviction(self):
+        cache = HighlightCache(max_bytes=300)
+        for number in range(10):
+            cache.render(f"x = {number}\n", "python")
+        self.assertGreater(cache.evictions, 0)
+        self.assertLessEqual(cache.size, 300)
+        self.assertEqual(len(cache), 10 - cache.evictions)
+
+    def test_warm(self):
+        cache = HighlightCache()
+        snippets = [("python", f"x = {number}\n") for number in range(HIGHLIGHT_POOL_THRESHOLD)]
+        self.assertEqual(cache.warm(snippets + snippets[:2] + [("cobol", "x")], jobs=2), HIGHLIGHT_POOL_THRESHOLD)
+        self.assertEqual((cache.hits, cache.misses), (2, HIGHLIGHT_POOL_THRESHOLD))
+        # A warm cache reports every snippet as a hit.
+        self.assertEqual(cache.warm(snippets), 0)
+        self.assertEqual((cache.hits, cache.misses), (2 + HIGHLIGHT_POOL_THRESHOLD, HIGHLIGHT_POOL_THRESHOLD))
+        self.assertEqual(cache.render("x = 3\n", "python"), highlight("x = 3\n", "python"))
+        self.assertEqual(cache.hits, 3 + HIGHLIGHT_POOL_THRESHOLD)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache", "highlight.json")
+            cache = HighlightCache()
+            cache.render("x = 1\n", "python")
+            cache.save(path)
+
+            loaded = HighlightCache()
+            loaded.load(path)
+            loaded.render("x = 1\n", "python")
+            self.assertEqual((loaded.hits, loaded.misses), (1, 0))
+
+    def test_load_missing_file(self):
+        cache = HighlightCache()
+        cache.load("/nonexistent/highlight.json")
+        self.assertEqual(len(cache), 0)
+
+if __name__ == "__main__":
+    unittest.main()
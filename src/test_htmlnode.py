@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawLeafNode
 
 class TestHTMLNode(unittest.TestCase):
     def test_props_to_html_basic(self):
@@ -25,6 +26,29 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode(tag="p", value="hello", props={})
         self.assertEqual(node.props_to_html(), "")
 
+    def test_props_to_html_escapes_values(self):
+        node = HTMLNode(tag="a", props={"href": '/search?q=a&b="c"', "title": "<x>"})
+        self.assertEqual(
+            node.props_to_html(),
+            ' href="/search?q=a&amp;b=&quot;c&quot;" title="&lt;x&gt;"',
+        )
+
+    def test_props_to_html_invalidated_on_change(self):
+        node = HTMLNode(tag="a", props={"href": "/one"})
+        self.assertEqual(node.props_to_html(), ' href="/one"')
+        node.props["href"] = "/two"
+        self.assertEqual(node.props_to_html(), ' href="/two"')
+        self.assertEqual(node.props_to_html(minify=True), " href=/two")
+        node.props["href"] = "/three"
+        self.assertEqual(node.props_to_html(minify=True), " href=/three")
+        node.props = {"class": "btn"}
+        self.assertEqual(node.props_to_html(), ' class="btn"')
+
+    def test_props_to_html_shared_between_nodes(self):
+        first = HTMLNode(tag="p", props={"class": "note shared"})
+        second = HTMLNode(tag="p", props={"class": "note shared"})
+        self.assertIs(first.props_to_html(), second.props_to_html())
+
     def test_repr_includes_fields(self):
         node = HTMLNode(tag="a", value="Link", props={"href": "https://example.com"})
         rep = repr(node)
@@ -42,6 +66,14 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(node.children, children)
         self.assertEqual(node.props, props)
 
+    def test_nodes_have_no_instance_dict(self):
+        for node in (
+            HTMLNode(tag="p", value="hello"),
+            LeafNode("b", "bold"),
+            ParentNode("p", [LeafNode("b", "bold")]),
+        ):
+            self.assertFalse(hasattr(node, "__dict__"))
+
 class TestLeafNode(unittest.TestCase):
     def test_leaf_to_html_a(self):
         node = LeafNode("a", "Hello, world!")
@@ -161,6 +193,77 @@ class TestParentNode(unittest.TestCase):
             '<div id="outer"><span class="inner"><i>deep</i></span></div>',
         )
 
+    def test_parent_iter_html_chunks(self):
+        parent_node = ParentNode("p", [LeafNode("b", "bold"), LeafNode(None, " text")])
+        self.assertListEqual(
+            ["<p>", "<b>bold</b>", " text", "</p>"],
+            list(parent_node.iter_html()),
+        )
+
+    def test_parent_write_html(self):
+        parent_node = ParentNode("div", [ParentNode("span", [LeafNode("i", "deep")])])
+        fp = io.StringIO()
+        parent_node.write_html(fp)
+        self.assertEqual(fp.getvalue(), "<div><span><i>deep</i></span></div>")
+
+    def test_leaf_write_html(self):
+        fp = io.StringIO()
+        LeafNode("b", "bold").write_html(fp)
+        self.assertEqual(fp.getvalue(), "<b>bold</b>")
+
+    def test_parent_to_html_deep_nesting(self):
+        node = LeafNode(None, "x")
+        for _ in range(10000):
+            node = ParentNode("span", [node])
+        self.assertEqual(
+            node.to_html(),
+            "<span>" * 10000 + "x" + "</span>" * 10000,
+        )
+
+    def test_leaf_to_html_escapes_value(self):
+        self.assertEqual(LeafNode("p", "1 < 2 & 3").to_html(), "<p>1 &lt; 2 &amp; 3</p>")
+        self.assertEqual(LeafNode(None, "<script>").to_html(), "&lt;script&gt;")
+
+    def test_raw_leaf_is_not_escaped(self):
+        node = ParentNode("p", [RawLeafNode("<b>bold</b> &amp; more")])
+        self.assertEqual(node.to_html(), "<p><b>bold</b> &amp; more</p>")
+
+    def test_raw_leaf_without_value(self):
+        with self.assertRaises(ValueError):
+            RawLeafNode(None).to_html()
+
+class TestMinifiedHTML(unittest.TestCase):
+    def test_attribute_quotes_dropped_when_safe(self):
+        node = LeafNode("a", "link", {"href": "/docs/intro.html#setup", "title": "two words", "data-x": "", "alt": "a=b"})
+        self.assertEqual(
+            node.to_html(minify=True),
+            '<a href=/docs/intro.html#setup title="two words" data-x alt="a=b">link</a>',
+        )
+        self.assertEqual(LeafNode("a", "x", {"href": "/?a=1&b=2"}).to_html(minify=True), '<a href="/?a=1&amp;b=2">x</a>')
+
+    def test_whitespace_collapsed_outside_pre(self):
+        node = ParentNode("div", [
+            ParentNode("p", [RawLeafNode("one  <b>two</b>\n\tthree")], {"class": "note"}),
+            ParentNode("pre", [LeafNode("code", "a\n    b", {"class": "language-py"})]),
+            LeafNode("p", "non\xa0\xa0breaking"),
+        ])
+        self.assertEqual(
+            node.to_html(minify=True),
+            '<div><p class=note>one <b>two</b> three</p>'
+            '<pre><code class=language-py>a\n    b</code></pre><p>non\xa0\xa0breaking</p></div>',
+        )
+        self.assertEqual(LeafNode("pre", " a  b ").to_html(minify=True), "<pre> a  b </pre>")
+
+    def test_default_output_unchanged(self):
+        node = ParentNode("p", [LeafNode("a", "x  y", {"href": "/a"})], {"class": "note"})
+        node.to_html(minify=True)
+        self.assertEqual(node.to_html(), '<p class="note"><a href="/a">x  y</a></p>')
+
+    def test_write_html_minified(self):
+        fp = io.StringIO()
+        ParentNode("p", [LeafNode(None, "a   b")]).write_html(fp, minify=True)
+        self.assertEqual(fp.getvalue(), "<p>a b</p>")
+
 if __name__ == "__main__":
     unittest.main()
       
\ No newline at end of file
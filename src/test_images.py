@@ -0,0 +1,139 @@
+import os
+import struct
+import unittest
+
+import images
+from build import build_site
+from images import image_size, process_images
+from tempsite import TempSiteTestCase
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 8
+
+def jpeg(width, height):
+    app0 = b"\xFF\xE0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xFF\xC0" + struct.pack(">HBHH", 17, 8, height, width) + b"\x00" * 10
+    return b"\xFF\xD8" + app0 + sof
+
+def webp_lossless(width, height):
+    bits = (width - 1) | (height - 1) << 14
+    return b"RIFF\x00\x00\x00\x00WEBPVP8L\x00\x00\x00\x00\x2F" + bits.to_bytes(4, "little") + b"\x00" * 8
+
+def webp_extended(width, height):
+    return (
+        b"RIFF\x00\x00\x00\x00WEBPVP8X\x0A\x00\x00\x00\x00\x00\x00\x00"
+        + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")
+    )
+
+class TestImageSize(TempSiteTestCase):
+    def size_of(self, data):
+        return image_size(self.write("image", data))
+
+    def test_formats(self):
+        self.assertEqual(self.size_of(png(800, 600)), (800, 600))
+        self.assertEqual(self.size_of(gif(40, 30)), (40, 30))
+        self.assertEqual(self.size_of(jpeg(1920, 1080)), (1920, 1080))
+        self.assertEqual(self.size_of(webp_lossless(300, 200)), (300, 200))
+        self.assertEqual(self.size_of(webp_extended(5000, 4000)), (5000, 4000))
+
+    def test_unknown_format(self):
+        self.assertIsNone(self.size_of(b"<svg></svg>"))
+
+class TestProcessImages(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = os.path.join(self.root, "images.json")
+        self.write(os.path.join(self.static, "images", "photo.png"), png(1200, 800))
+        self.write(os.path.join(self.static, "styles.css"), b"body {}")
+
+        # Pillow isn't needed to test the pipeline around it.
+        self.made = []
+        self.make_derivative = images.make_derivative
+        images.make_derivative = self.fake_make_derivative
+
+    def tearDown(self):
+        images.make_derivative = self.make_derivative
+
+    def fake_make_derivative(self, task):
+        _, output_path, width, _ = task
+        self.made.append(width)
+        self.write(output_path, b"derivative")
+
+    def process(self, formats=(("webp", "WEBP", "image/webp"),)):
+        return process_images(self.static, self.dest, self.manifest, formats=formats)
+
+    def test_without_pillow_only_measures(self):
+        result = self.process(formats=())
+        self.assertDictEqual(result.images, {"images/photo.png": {"width": 1200, "height": 800, "sources": []}})
+        self.assertListEqual([], self.made)
+
+    def test_makes_each_derivative_once(self):
+        result = self.process()
+        self.assertListEqual([480, 960, 1200], self.made)
+        mime_type, srcset = result.images["images/photo.png"]["sources"][0]
+        self.assertEqual(mime_type, "image/webp")
+        self.assertRegex(srcset, r"^/_img/[0-9a-f]{16}-480w\.webp 480w, /_img/\S+-960w\.webp 960w, /_img/\S+-1200w\.webp 1200w$")
+
+        result = self.process()
+        self.assertListEqual([480, 960, 1200], self.made)
+        self.assertListEqual([], result.generated)
+
+    def test_changed_image_replaces_derivatives(self):
+        old = self.process().generated
+        self.write(os.path.join(self.static, "images", "photo.png"), png(600, 400) + b"changed")
+        result = self.process()
+        self.assertEqual(len(result.generated), 2)
+        self.assertListEqual(sorted(old), result.removed)
+        for output in old:
+            self.assertFalse(os.path.exists(os.path.join(self.dest, output)))
+
+class TestResponsivePages(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.write(self.template, '<img src="/logo.png" alt="logo"></img>{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![a photo](/images/photo.png) ![remote](https://example.com/x.png)")
+        self.write(os.path.join(self.content, "about.md"), "# About\n\nNo images here")
+        self.images = {
+            "images/photo.png": {
+                "width": 1200,
+                "height": 800,
+                "sources": [["image/webp", "/_img/a-480w.webp 480w, /_img/a-1200w.webp 1200w"]],
+            },
+        }
+
+    def build(self, images):
+        return build_site(self.content, self.template, self.dest, self.manifest, images=images)
+
+    def test_images_are_sized_and_lazy(self):
+        self.build(self.images)
+        html = self.read(os.path.join(self.dest, "index.html"))
+        self.assertIn(
+            '<picture><source type="image/webp" srcset="/_img/a-480w.webp 480w, /_img/a-1200w.webp 1200w"'
+            ' sizes="(max-width: 1200px) 100vw, 1200px"></source>'
+            '<img src="/images/photo.png" alt="a photo" width="1200" height="800" loading="lazy" decoding="async">'
+            "</img></picture>",
+            html,
+        )
+        self.assertIn('<img src="https://example.com/x.png" alt="remote" loading="lazy" decoding="async"></img>', html)
+        self.assertTrue(html.startswith('<img src="/logo.png" alt="logo"></img>'))
+
+    def test_changed_image_rebuilds_only_pages_showing_it(self):
+        self.build(self.images)
+        self.images["images/photo.png"]["width"] = 600
+        result = self.build(self.images)
+        self.assertListEqual(["index.md"], result.rebuilt)
+        self.assertEqual(result.reasons["index.md"], "image images/photo.png changed")
+        self.assertIn('width="600"', self.read(os.path.join(self.dest, "index.html")))
+
+    def test_turning_images_on_rebuilds_pages_with_images(self):
+        self.build(None)
+        self.assertNotIn("loading", self.read(os.path.join(self.dest, "index.html")))
+        result = self.build(self.images)
+        self.assertListEqual(["index.md"], result.rebuilt)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+
+from block_markdown import markdown_to_html_node
+from inline_cache import InlineCache, inline_to_html
+
+class TestInlineCache(unittest.TestCase):
+    def test_inline_to_html(self):
+        self.assertEqual(
+            inline_to_html("**bold** and [link](https://boot.dev)"),
+            '<b>bold</b> and <a href="https://boot.dev">link</a>',
+        )
+
+    def test_hits_and_misses(self):
+        cache = InlineCache()
+        self.assertEqual(cache.render("_hi_"), "<i>hi</i>")
+        self.assertEqual(cache.render("_hi_"), "<i>hi</i>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = InlineCache(max_entries=2)
+        cache.render("a")
+        cache.render("b")
+        cache.render("a")
+        cache.render("c")
+        self.assertListEqual(["a", "c"], list(cache.entries))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_evicts_by_size(self):
+        cache = InlineCache(max_bytes=10)
+        cache.render("aaa")
+        cache.render("bbb")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, 6)
+
+    def test_persists_between_builds(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "inline.json")
+            cache = InlineCache()
+            cache.render("**bold**")
+            cache.save(path)
+
+            warm = InlineCache()
+            warm.load(path)
+            self.assertEqual(warm.render("**bold**"), "<b>bold</b>")
+            self.assertEqual((warm.hits, warm.misses), (1, 0))
+
+    def test_persists_text_nodes(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "inline.json")
+            cache = InlineCache()
+            fragment = cache.lookup("see [docs](/docs)")
+            cache.save(path)
+
+            warm = InlineCache()
+            warm.load(path)
+            self.assertEqual(warm.lookup("see [docs](/docs)"), fragment)
+
+    def test_load_ignores_other_versions(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "inline.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"version": -1, "entries": [["x", "stale"]]}, f)
+
+            cache = InlineCache()
+            cache.load(path)
+            self.assertEqual(cache.render("x"), "x")
+
+    def test_cached_render_matches_uncached(self):
+        md = "# Title `code`\n\nSome **bold** and [link](/a)\n\nSome **bold** and [link](/a)"
+        cache = InlineCache()
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            markdown_to_html_node(md, cache).to_html(),
+        )
+        self.assertEqual(cache.hits, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from inline_markdown import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link
+from inline_markdown import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes
 
 from textnode import TextNode, TextType
 
@@ -308,5 +308,96 @@ class TestInlineMarkdown(unittest.TestCase):
             new_nodes,
         )
 
+    def test_split_images_repeated_literal_text(self):
+        node = TextNode(
+            "[img](https://a.com) then ![img](https://a.com)",
+            TextType.TEXT,
+        )
+        new_nodes = split_nodes_image([node])
+        self.assertListEqual(
+            [
+                TextNode("[img](https://a.com) then ", TextType.TEXT),
+                TextNode("img", TextType.IMAGE, "https://a.com"),
+            ],
+            new_nodes,
+        )
+
+    def test_split_links_after_matching_image(self):
+        node = TextNode(
+            "![same](https://a.com) and [same](https://a.com)",
+            TextType.TEXT,
+        )
+        new_nodes = split_nodes_link([node])
+        self.assertListEqual(
+            [
+                TextNode("![same](https://a.com) and ", TextType.TEXT),
+                TextNode("same", TextType.LINK, "https://a.com"),
+            ],
+            new_nodes,
+        )
+
+    def test_text_to_textnodes(self):
+        nodes = text_to_textnodes(
+            "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
+        )
+        self.assertListEqual(
+            [
+                TextNode("This is ", TextType.TEXT),
+                TextNode("text", TextType.BOLD),
+                TextNode(" with an ", TextType.TEXT),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" word and a ", TextType.TEXT),
+                TextNode("code block", TextType.CODE),
+                TextNode(" and an ", TextType.TEXT),
+                TextNode("obi wan image", TextType.IMAGE, "https://i.imgur.com/fJRm4Vk.jpeg"),
+                TextNode(" and a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://boot.dev"),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_plain(self):
+        self.assertListEqual(
+            [TextNode("Just plain text.", TextType.TEXT)],
+            text_to_textnodes("Just plain text."),
+        )
+
+    def test_text_to_textnodes_empty(self):
+        self.assertListEqual([], text_to_textnodes(""))
+
+    def test_text_to_textnodes_link_inside_code(self):
+        self.assertListEqual(
+            [
+                TextNode("see ", TextType.TEXT),
+                TextNode("[link](https://boot.dev)", TextType.CODE),
+            ],
+            text_to_textnodes("see `[link](https://boot.dev)`"),
+        )
+
+    def test_text_to_textnodes_unclosed(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This is **bold text")
+
+    def test_text_to_textnodes_overlapping_delimiters(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("_italic **bold_ text**")
+
+    def test_text_to_textnodes_matches_chained_passes(self):
+        samples = [
+            "**bold** and **more bold** then _it_ and `code`_x_",
+            "**_not italic_ inside bold** [link](https://a.com)",
+            "![img](https://a.com/a.png)![img2](https://b.com/b.png)[l](https://c.com)",
+            "[a_b_](https://a.com) and *single stars* !bang",
+            "_[link](https://a.com)_ and `![img](https://b.com)`",
+            "****empty bold__empty italic``",
+        ]
+        for text in samples:
+            nodes = [TextNode(text, TextType.TEXT)]
+            nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+            nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+            nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+            nodes = split_nodes_link(split_nodes_image(nodes))
+            self.assertListEqual(nodes, text_to_textnodes(text), text)
+
 if __name__ == "__main__":
     unittest.main()
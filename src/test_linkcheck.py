@@ -0,0 +1,110 @@
+import os
+import unittest
+
+from build import build_site
+from linkcheck import index_markdown, is_external, resolve_url
+from tempsite import TempSiteTestCase
+
+class TestLinkIndex(unittest.TestCase):
+    def test_index_markdown(self):
+        md = (
+            "# Title\n\nSee [about](/about) and [docs](docs.html#setup).\n\n"
+            "![logo](/logo.png)\n\n```\n[not](/a-link)\n```\n\n## Set **up**\n\n[about](/about) [](/blog/)"
+        )
+        self.assertDictEqual(
+            index_markdown(md.splitlines()),
+            {
+                "links": ["/about", "docs.html#setup", "/blog/"],
+                "images": ["/logo.png"],
+                "anchors": ["title", "set-up"],
+                "title_links": ["/blog/"],
+            },
+        )
+
+    def test_links_in_inline_code_are_not_indexed(self):
+        md = "# Title\n\nUse `[x](/nope)` or `![](/no.png)` for [real](/yes) ones: `[](/about)`"
+        self.assertDictEqual(
+            index_markdown(md.splitlines()),
+            {"links": ["/yes"], "images": [], "anchors": ["title"], "title_links": []},
+        )
+
+    def test_repeated_headings_get_unique_anchors(self):
+        md = "# Dup\n\n## Dup\n\n## Dup-1\n\n### Dup"
+        self.assertListEqual(index_markdown(md.splitlines())["anchors"], ["dup", "dup-1", "dup-1-1", "dup-2"])
+
+    def test_is_external(self):
+        self.assertTrue(is_external("https://example.com"))
+        self.assertTrue(is_external("mailto:me@example.com"))
+        self.assertTrue(is_external("//cdn.example.com/x.js"))
+        self.assertFalse(is_external("/about"))
+        self.assertFalse(is_external("../about.html#x"))
+
+    def test_resolve_url(self):
+        self.assertEqual(resolve_url("#top", "blog/post.html"), (["blog/post.html"], "top"))
+        self.assertEqual(resolve_url("/", "blog/post.html"), (["index.html"], ""))
+        self.assertEqual(resolve_url("/blog/", "index.html"), (["blog/index.html"], ""))
+        self.assertEqual(
+            resolve_url("../about?x=1#team", "blog/post.html"),
+            (["about", "about.html", "about/index.html"], "team"),
+        )
+
+class TestLinkCheck(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[blog](/blog/post) [about](/about#team)")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n[home](../#home) ![logo](/logo.png)")
+        self.write(os.path.join(self.content, "other.md"), "# Other\n\n[home](/)")
+
+    def build(self):
+        return build_site(self.content, self.template, self.dest, self.manifest)
+
+    def test_reports_broken_links(self):
+        result = self.build()
+        self.assertDictEqual(
+            result.broken,
+            {
+                "index.md": [["/about#team", "missing page"]],
+                "blog/post.md": [["/logo.png", "missing image"]],
+            },
+        )
+
+    def test_noop_build_checks_nothing(self):
+        self.build()
+        result = self.build()
+        self.assertListEqual([], result.checked)
+        self.assertEqual(2, len(result.broken))
+
+    def test_new_target_rechecks_only_linking_pages(self):
+        self.build()
+        self.write(os.path.join(self.content, "about.md"), "# About\n\n## Team")
+        result = self.build()
+        self.assertListEqual(["about.md", "index.md"], sorted(result.checked))
+        self.assertNotIn("index.md", result.broken)
+
+    def test_anchor_change_rechecks_linking_pages(self):
+        self.write(os.path.join(self.content, "about.md"), "# About\n\n## Team")
+        self.build()
+        self.write(os.path.join(self.content, "about.md"), "# About\n\n## People")
+        result = self.build()
+        self.assertListEqual(["about.md", "index.md"], sorted(result.checked))
+        self.assertEqual(result.broken["index.md"], [["/about#team", "missing anchor"]])
+
+    def test_static_asset_satisfies_image(self):
+        self.build()
+        self.write(os.path.join(self.dest, "logo.png"), "png")
+        result = self.build()
+        self.assertListEqual(["blog/post.md"], result.checked)
+        self.assertNotIn("blog/post.md", result.broken)
+
+    def test_fingerprinted_asset_satisfies_image(self):
+        self.write(os.path.join(self.dest, "logo.0123abcd.png"), "png")
+        result = build_site(
+            self.content, self.template, self.dest, self.manifest,
+            asset_map={"/logo.png": "/logo.0123abcd.png"},
+        )
+        self.assertNotIn("blog/post.md", result.broken)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from output import OutputWriter, versions_dir_for
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.dest = os.path.join(self.root, "public")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, output):
+        with open(os.path.join(self.dest, output), "rb") as f:
+            return f.read()
+
+    def test_writes_appear_only_on_commit(self):
+        writer = OutputWriter(self.dest)
+        for number in range(100):
+            writer.write(f"pages/{number}.html", f"page {number}".encode())
+        writer.write("index.html", b"home")
+        self.assertFalse(os.path.exists(self.dest))
+
+        writer.commit()
+        self.assertEqual(self.read("pages/42.html"), b"page 42")
+        self.assertEqual(self.read("index.html"), b"home")
+        self.assertTrue(os.path.islink(self.dest))
+        self.assertEqual(os.path.realpath(self.dest), os.path.realpath(writer.staging_dir))
+
+    def test_commit_swaps_whole_versions(self):
+        writer = OutputWriter(self.dest, threads=0)
+        writer.write("index.html", b"home")
+        writer.write("about.html", b"about")
+        writer.commit()
+        first = os.path.realpath(self.dest)
+        inode = os.stat(os.path.join(self.dest, "about.html")).st_ino
+
+        writer = OutputWriter(self.dest)
+        writer.write("index.html", b"new home")
+        writer.commit()
+        # Unchanged files are linked into the new version, not copied, and
+        # the previous version is gone once nothing points at it.
+        self.assertEqual(self.read("index.html"), b"new home")
+        self.assertEqual(os.stat(os.path.join(self.dest, "about.html")).st_ino, inode)
+        writer.cleanup.join()
+        self.assertFalse(os.path.exists(first))
+        self.assertListEqual([os.path.basename(writer.staging_dir)], os.listdir(versions_dir_for(self.dest)))
+
+    def test_removed_outputs_are_left_out(self):
+        writer = OutputWriter(self.dest, threads=0)
+        writer.write("index.html", b"home")
+        writer.write("old/page.html", b"old")
+        writer.commit()
+
+        writer = OutputWriter(self.dest, threads=0)
+        writer.remove("old/page.html")
+        writer.commit()
+        self.assertEqual(self.read("index.html"), b"home")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "old")))
+
+    def test_commit_merges_into_existing_site(self):
+        os.makedirs(os.path.join(self.dest, "pages"))
+        with open(os.path.join(self.dest, "pages", "old.html"), "wb") as f:
+            f.write(b"old")
+        with open(os.path.join(self.dest, "styles.css"), "wb") as f:
+            f.write(b"body {}")
+
+        writer = OutputWriter(self.dest, threads=0)
+        writer.write("pages/new.html", b"new")
+        writer.write("blog/post.html", b"post")
+        writer.commit()
+        # A site built before versioning becomes the first version.
+        self.assertTrue(os.path.islink(self.dest))
+        self.assertEqual(self.read("pages/old.html"), b"old")
+        self.assertEqual(self.read("pages/new.html"), b"new")
+        self.assertEqual(self.read("blog/post.html"), b"post")
+        self.assertEqual(self.read("styles.css"), b"body {}")
+        writer.cleanup.join()
+        self.assertListEqual([os.path.basename(writer.staging_dir)], os.listdir(versions_dir_for(self.dest)))
+
+    def test_identical_bytes_are_skipped(self):
+        writer = OutputWriter(self.dest)
+        digest = writer.write("index.html", b"home", hashlib.sha256(b"home").hexdigest())
+        self.assertEqual(digest, hashlib.sha256(b"home").hexdigest())
+        self.assertEqual(writer.skipped, 1)
+        self.assertListEqual([], writer.written)
+        writer.commit()
+        self.assertFalse(os.path.exists(self.dest))
+
+    def test_large_pages_stream_to_disk(self):
+        chunk = "x" * 1000
+        page = (chunk * 200).encode()
+        writer = OutputWriter(self.dest, threads=0)
+        with writer.open("big.html") as fp:
+            for _ in range(20):
+                fp.writelines([chunk] * 10)
+            self.assertTrue(os.path.exists(os.path.join(writer.staging_dir, "big.html")))
+        self.assertEqual(fp.hash, hashlib.sha256(page).hexdigest())
+        writer.commit()
+        self.assertEqual(self.read("big.html"), page)
+
+        # The same page again is dropped from the new version, and the live
+        # file is linked in its place.
+        inode = os.stat(os.path.join(self.dest, "big.html")).st_ino
+        writer = OutputWriter(self.dest, threads=0)
+        writer.write("index.html", b"home")
+        with writer.open("big.html", fp.hash) as fp:
+            for _ in range(20):
+                fp.writelines([chunk] * 10)
+        self.assertEqual(writer.skipped, 1)
+        self.assertListEqual(["index.html"], writer.written)
+        writer.commit()
+        self.assertEqual(os.stat(os.path.join(self.dest, "big.html")).st_ino, inode)
+
+    def test_small_pages_are_written_whole(self):
+        writer = OutputWriter(self.dest)
+        with writer.open("index.html") as fp:
+            fp.write("<p>")
+            fp.write("home")
+            fp.write("</p>")
+        self.assertEqual(fp.hash, hashlib.sha256(b"<p>home</p>").hexdigest())
+        writer.commit()
+        self.assertEqual(self.read("index.html"), b"<p>home</p>")
+
+    def test_discard_drops_staged_pages(self):
+        writer = OutputWriter(self.dest)
+        writer.write("index.html", b"home")
+        writer.discard()
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertFalse(os.path.exists(writer.staging_dir))
+
+    def test_write_errors_are_raised(self):
+        writer = OutputWriter(self.dest)
+        writer.write("index.html", b"home")
+        writer.write("index.html/nested.html", b"not a directory")
+        with self.assertRaises(OSError):
+            writer.commit()
+        writer.discard()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import gzip
+import os
+import unittest
+
+from precompress import precompress_site
+from tempsite import TempSiteTestCase
+
+PAGE = "<p>" + "Some words worth compressing. " * 20 + "</p>"
+
+class TestPrecompress(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = os.path.join(self.root, "precompress.json")
+        self.write(os.path.join(self.dest, "index.html"), PAGE)
+        self.write(os.path.join(self.dest, "blog", "post.html"), PAGE + "post")
+        self.write(os.path.join(self.dest, "styles.css"), "body { margin: 0 }\n" * 20)
+        self.write(os.path.join(self.dest, "tiny.html"), "<p>hi</p>")
+        self.write(os.path.join(self.dest, "logo.png"), "not text" * 100)
+
+    def precompress(self, jobs=1, encodings=("gzip",)):
+        return precompress_site(self.dest, self.manifest, jobs, encodings)
+
+    def test_compresses_html_and_css(self):
+        result = self.precompress()
+        self.assertListEqual(["blog/post.html", "index.html", "styles.css"], result.compressed)
+        with gzip.open(os.path.join(self.dest, "index.html.gz"), "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), PAGE)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "tiny.html.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "logo.png.gz")))
+
+    def test_rewritten_with_same_content_is_skipped(self):
+        self.precompress()
+        self.write(os.path.join(self.dest, "index.html"), PAGE)
+        self.write(os.path.join(self.dest, "styles.css"), "body { margin: 1px }\n" * 20)
+        result = self.precompress()
+        self.assertListEqual(["styles.css"], result.compressed)
+        self.assertEqual(result.unchanged, 2)
+
+    def test_missing_sibling_is_rewritten(self):
+        self.precompress()
+        os.remove(os.path.join(self.dest, "index.html.gz"))
+        self.assertListEqual(["index.html"], self.precompress().compressed)
+
+    def test_removed_file_loses_its_siblings(self):
+        self.precompress()
+        os.remove(os.path.join(self.dest, "blog", "post.html"))
+        result = self.precompress()
+        self.assertListEqual(["blog/post.html.gz"], result.removed)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_unavailable_encoding_removes_stale_siblings(self):
+        self.write(os.path.join(self.dest, "index.html.br"), "stale")
+        result = self.precompress()
+        self.assertListEqual(["index.html.br"], result.removed)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html.br")))
+
+    def test_parallel_matches_serial(self):
+        self.precompress(jobs=4)
+        with open(os.path.join(self.dest, "styles.css.gz"), "rb") as f:
+            parallel = f.read()
+        os.remove(self.manifest)
+        self.precompress()
+        with open(os.path.join(self.dest, "styles.css.gz"), "rb") as f:
+            self.assertEqual(f.read(), parallel)
+
+if __name__ == "__main__":
+    unittest.main()
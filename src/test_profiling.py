@@ -0,0 +1,88 @@
+import json
+import os
+import pstats
+import tempfile
+import unittest
+
+import block_markdown
+import gencontent
+import htmlnode
+import inline_markdown
+from gencontent import generate_page_html
+from profiling import Profiler
+
+class TestProfiler(unittest.TestCase):
+    def test_stop_restores_originals(self):
+        originals = (
+            gencontent.generate_page,
+            block_markdown.text_to_textnodes,
+            inline_markdown.text_to_textnodes,
+            htmlnode.ParentNode.to_html,
+            htmlnode.HTMLNode.write_html,
+        )
+        profiler = Profiler()
+        profiler.start()
+        self.assertIsNot(block_markdown.text_to_textnodes, originals[1])
+        profiler.stop()
+        self.assertEqual(
+            originals,
+            (
+                gencontent.generate_page,
+                block_markdown.text_to_textnodes,
+                inline_markdown.text_to_textnodes,
+                htmlnode.ParentNode.to_html,
+                htmlnode.HTMLNode.write_html,
+            ),
+        )
+
+    def test_collects_stage_stats(self):
+        profiler = Profiler()
+        profiler.start()
+        try:
+            html = generate_page_html("# Title\n\nSome **bold** text\n\n- a\n- b", "{{ Content }}")
+        finally:
+            profiler.stop()
+
+        self.assertEqual(html, generate_page_html("# Title\n\nSome **bold** text\n\n- a\n- b", "{{ Content }}"))
+        self.assertEqual(profiler.stages["page_io"].calls, 1)
+        self.assertEqual(profiler.stages["tree_build"].calls, 3)
+        self.assertEqual(profiler.stages["inline_parse"].calls, 4)
+        self.assertEqual(profiler.stages["inline_parse"].nodes, 6)
+        self.assertEqual(profiler.stages["serialize"].chars, len(html) - len("<div></div>"))
+
+    def test_records_pages_and_exports(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "page.md")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("# Page\n\nHello")
+
+            profiler = Profiler(trace=True, cprofile=True)
+            profiler.start()
+            try:
+                gencontent.generate_page(source, "{{ Content }}", os.path.join(root, "out", "page.html"))
+            finally:
+                profiler.stop()
+
+            self.assertEqual(len(profiler.pages), 1)
+            self.assertEqual(profiler.pages[0][0], source)
+            self.assertIn(source, profiler.report())
+
+            trace_path = os.path.join(root, "trace.json")
+            profiler.write_trace(trace_path)
+            with open(trace_path, encoding="utf-8") as f:
+                events = json.load(f)["traceEvents"]
+            self.assertIn("generate_page", [event["name"] for event in events])
+
+            stats_path = os.path.join(root, "build.prof")
+            profiler.dump_stats(stats_path)
+            self.assertGreater(pstats.Stats(stats_path).total_calls, 0)
+
+    def test_exports_require_opt_in(self):
+        profiler = Profiler()
+        with self.assertRaises(ValueError):
+            profiler.write_trace("unused.json")
+        with self.assertRaises(ValueError):
+            profiler.dump_stats("unused.prof")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import json
+import os
+import unittest
+
+from astcache import ASTCache
+from build import build_site
+from search import (
+    decode_shard,
+    encode_shard,
+    iter_inline_nodes,
+    page_terms,
+    shard_name,
+    tokenize,
+    update_search_index,
+)
+from tempsite import TempSiteTestCase
+
+class TestTerms(unittest.TestCase):
+    def test_tokenize_stems_lightly(self):
+        self.assertListEqual(
+            tokenize("Running runs, stopped! Classes & studies: pass_it 42"),
+            ["run", "run", "stop", "class", "study", "pass", "it", "42"],
+        )
+
+    def test_plurals_meet_their_singular(self):
+        for singular, plural in (
+            ("page", "pages"), ("file", "files"), ("image", "images"), ("size", "sizes"),
+            ("box", "boxes"), ("dish", "dishes"), ("match", "matches"), ("buzz", "buzzes"),
+        ):
+            self.assertListEqual(tokenize(f"{singular} {plural}"), tokenize(f"{singular} {singular}"), plural)
+
+    def test_page_terms_skip_links_images_and_code_blocks(self):
+        md = "# Hello world\n\nThe **world** of [links](/x) ![alt](/a.png) and `code`.\n\n```\nskipped\n```\n\n- item"
+        self.assertDictEqual(
+            page_terms(iter_inline_nodes(md.splitlines())),
+            {"hello": [0], "world": [1, 3], "the": [2], "of": [4], "and": [5], "code": [6], "item": [7]},
+        )
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("search"), "se")
+        self.assertEqual(shard_name("a"), "a")
+        self.assertEqual(shard_name("été"), "_")
+
+    def test_shard_round_trip(self):
+        terms = {"hello": {0: [1, 5], 300: [2]}, "help": {7: [0, 1000]}}
+        data = encode_shard(terms)
+        self.assertDictEqual(decode_shard(data), terms)
+        self.assertLess(len(data), 30)
+
+class TestSearchIndex(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.state = os.path.join(self.root, "search.json")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome to the docs")
+        self.write(os.path.join(self.content, "guide.md"), "# Guide\n\nRunning the docs server")
+
+    def build(self, spill_bytes=1_000_000, ast_cache=None):
+        result = build_site(self.content, self.template, self.dest, self.manifest, ast_cache=ast_cache)
+        return update_search_index(
+            self.content, self.dest, result.manifest["pages"], self.state, spill_bytes, ast_cache,
+        )
+
+    def docs(self):
+        with open(os.path.join(self.dest, "search", "docs.json"), encoding="utf-8") as f:
+            return json.load(f)["docs"]
+
+    def lookup(self, term):
+        path = os.path.join(self.dest, "search", f"{shard_name(term)}.bin")
+        if not os.path.exists(path):
+            return {}
+        with open(path, "rb") as f:
+            postings = decode_shard(f.read()).get(term, {})
+        docs = self.docs()
+        return {docs[doc][0]: positions for doc, positions in postings.items()}
+
+    def test_cold_build_indexes_every_page(self):
+        result = self.build()
+        self.assertListEqual(["guide.md", "index.md"], result.indexed)
+        self.assertDictEqual(self.lookup("doc"), {"/guide.html": [3], "/index.html": [4]})
+        self.assertDictEqual(self.lookup("run"), {"/guide.html": [1]})
+        self.assertIn(["/guide.html", "Guide"], self.docs())
+
+    def test_reads_pages_from_ast_cache(self):
+        cache = ASTCache(os.path.join(self.root, "ast"))
+        self.build(ast_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+        self.assertDictEqual(self.lookup("doc"), {"/guide.html": [3], "/index.html": [4]})
+        self.assertDictEqual(self.lookup("run"), {"/guide.html": [1]})
+
+    def test_noop_build_writes_nothing(self):
+        self.build()
+        result = self.build()
+        self.assertListEqual([], result.indexed)
+        self.assertListEqual([], result.shards)
+
+    def test_edit_rewrites_only_affected_shards(self):
+        self.build()
+        self.write(os.path.join(self.content, "guide.md"), "# Guide\n\nStopping the docs server")
+        result = self.build()
+        self.assertListEqual(["guide.md"], result.indexed)
+        self.assertIn("ru", result.shards)
+        self.assertIn("st", result.shards)
+        self.assertNotIn("we", result.shards)
+        self.assertDictEqual(self.lookup("run"), {})
+        self.assertDictEqual(self.lookup("stop"), {"/guide.html": [1]})
+        self.assertDictEqual(self.lookup("doc"), {"/guide.html": [3], "/index.html": [4]})
+
+    def test_removed_page_is_dropped_and_its_id_reused(self):
+        self.build()
+        os.remove(os.path.join(self.content, "guide.md"))
+        result = self.build()
+        self.assertListEqual(["guide.md"], result.removed)
+        self.assertDictEqual(self.lookup("doc"), {"/index.html": [4]})
+        self.assertIsNone(self.docs()[0])
+
+        self.write(os.path.join(self.content, "new.md"), "# New\n\nMore docs")
+        self.build()
+        self.assertDictEqual(self.lookup("doc"), {"/new.html": [2], "/index.html": [4]})
+
+    def test_spilling_gives_the_same_index(self):
+        for number in range(20):
+            self.write(os.path.join(self.content, "many", f"{number}.md"), f"# Page {number}\n\nShared words for page {number}")
+        self.build(spill_bytes=1)
+        spilled = {name: self.lookup(name) for name in ("word", "page", "7")}
+
+        os.remove(self.state)
+        self.build()
+        self.assertDictEqual(spilled, {name: self.lookup(name) for name in ("word", "page", "7")})
+        self.assertEqual(len(spilled["word"]), 20)
+
+    def test_missing_shard_rebuilds_index(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "search", "ru.bin"))
+        result = self.build()
+        self.assertListEqual(["guide.md", "index.md"], result.indexed)
+        self.assertDictEqual(self.lookup("run"), {"/guide.html": [1]})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import http.client
+import os
+import threading
+import unittest
+import urllib.request
+
+from server import LIVERELOAD_SCRIPT, ReloadNotifier, Watcher, inject_livereload, make_server
+from tempsite import TempSiteTestCase
+
+class TestLiveReload(unittest.TestCase):
+    def test_inject_livereload_before_body_close(self):
+        self.assertEqual(
+            inject_livereload("<body><p>hi</p></body></html>"),
+            f"<body><p>hi</p>{LIVERELOAD_SCRIPT}</body></html>",
+        )
+
+    def test_inject_livereload_without_body(self):
+        self.assertEqual(inject_livereload("<p>hi</p>"), f"<p>hi</p>{LIVERELOAD_SCRIPT}")
+
+    def test_notifier_wait(self):
+        notifier = ReloadNotifier()
+        self.assertEqual(notifier.wait(0, timeout=0), 0)
+        notifier.notify()
+        self.assertEqual(notifier.wait(0, timeout=0), 1)
+
+class TestWatcher(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+
+    def test_poll_reports_added_modified_and_removed(self):
+        page = self.write("page.md", "# Page")
+        removed = self.write("old/removed.md", "# Old")
+        self.write("notes.txt", "ignored")
+        watcher = Watcher([self.root], include=lambda path: path.endswith(".md"))
+        self.assertEqual(watcher.poll(), set())
+
+        stat = os.stat(page)
+        os.utime(page, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        os.remove(removed)
+        added = self.write("new.md", "# New")
+        self.write("notes.txt", "still ignored")
+
+        self.assertEqual(watcher.poll(), {page, removed, added})
+        self.assertEqual(watcher.poll(), set())
+
+    def test_watches_single_file_root(self):
+        template = self.write("template.html", "{{ Content }}")
+        watcher = Watcher([template])
+        self.write("template.html", "<main>{{ Content }}</main>")
+        self.assertEqual(watcher.poll(), {template})
+
+class TestServer(TempSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("index.html", "<html><body>home</body></html>")
+        self.write("styles.css", "body {}")
+        self.write("docs/index.html", "<html><body>docs</body></html>")
+
+    def fetch(self, notifier, path):
+        server = make_server(self.root, 0, notifier)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def head(self, notifier, path):
+        # The raw response, without following redirects.
+        server = make_server(self.root, 0, notifier)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            return response.status, response.getheader("Location")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_html_gets_livereload_script(self):
+        self.assertEqual(
+            self.fetch(ReloadNotifier(), "/"),
+            f"<html><body>home{LIVERELOAD_SCRIPT}</body></html>",
+        )
+
+    def test_assets_served_unchanged(self):
+        self.assertEqual(self.fetch(ReloadNotifier(), "/styles.css"), "body {}")
+
+    def test_directory_without_slash_redirects(self):
+        self.assertEqual(self.head(ReloadNotifier(), "/docs"), (301, "/docs/"))
+        self.assertEqual(self.head(ReloadNotifier(), "/docs?x=1"), (301, "/docs/?x=1"))
+        self.assertEqual(
+            self.fetch(ReloadNotifier(), "/docs"),
+            f"<html><body>docs{LIVERELOAD_SCRIPT}</body></html>",
+        )
+
+    def test_no_script_without_watch(self):
+        self.assertEqual(self.fetch(None, "/index.html"), "<html><body>home</body></html>")
+
+if __name__ == "__main__":
+    unittest.main()
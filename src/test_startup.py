@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# The modules listed below are what keeps startup fast, and their absence
+# is the check that matters. Import time is only checked loosely, against
+# a bare interpreter started in the same test, so a busy machine slows
+# both down alike: the CLI's imports take about 8 times as long as the
+# interpreter's own, and eagerly importing the server and process pool
+# machinery was well over this.
+STARTUP_BUDGET_FACTOR = 12
+
+HEAVY_MODULES = {
+    "concurrent.futures", "multiprocessing", "http.server", "socketserver",
+    "cProfile", "profiling", "server", "inline_cache",
+}
+
+def import_times(args, cwd):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    # Each line is "import time: self | cumulative | name", with nested
+    # imports indented under the module that triggered them.
+    modules = set()
+    total = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return modules, total
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "content"))
+        with open(os.path.join(self.root, "content", "index.md"), "w", encoding="utf-8") as f:
+            f.write("# Home\n\nSome **text** with a [link](/about)")
+        with open(os.path.join(self.root, "template.html"), "w", encoding="utf-8") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def check(self, *args):
+        modules, total = import_times([MAIN, *args], self.root)
+        self.assertSetEqual(set(), HEAVY_MODULES & modules)
+        _, bare = import_times(["-c", "pass"], self.root)
+        self.assertLess(
+            total, bare * STARTUP_BUDGET_FACTOR,
+            f"imports took {total / 1000:.1f}ms, a bare interpreter's {bare / 1000:.1f}ms",
+        )
+
+    def test_render_startup(self):
+        self.check("render", "content/index.md", "-o", "public/index.html")
+        self.assertTrue(os.path.exists(os.path.join(self.root, "public", "index.html")))
+
+    def test_build_startup(self):
+        self.check("build")
+        self.assertTrue(os.path.exists(os.path.join(self.root, "public", "index.html")))
+
+if __name__ == "__main__":
+    unittest.main()
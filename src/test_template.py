@@ -0,0 +1,69 @@
+import io
+import os
+import tempfile
+import unittest
+
+from template import Template, compile_template, load_template
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_splits_literals_and_slots(self):
+        template = Template("<title>{{ Title }}</title>{{Content}}")
+        self.assertListEqual(["<title>", None, "</title>", None, ""], template.parts)
+        self.assertListEqual([(1, "Title"), (3, "Content")], template.slots)
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1><title>{{ Title }}</title>{{ Content }}!")
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>x</p>"}),
+            "<h1>Hi</h1><title>Hi</title><p>x</p>!",
+        )
+
+    def test_render_without_slots(self):
+        self.assertEqual(Template("plain").render({}), "plain")
+
+    def test_render_leaves_template_reusable(self):
+        template = Template("{{ A }}")
+        self.assertEqual(template.render({"A": "one"}), "one")
+        self.assertEqual(template.render({"A": "two"}), "two")
+
+    def test_missing_value(self):
+        with self.assertRaises(ValueError):
+            Template("{{ Title }} {{ Author }}").render({"Title": "Hi"})
+
+    def test_write_streams_callable_values(self):
+        fp = io.StringIO()
+        Template("<main>{{ Content }}</main>").write(
+            fp, {"Content": lambda out: out.write("<p>streamed</p>")}
+        )
+        self.assertEqual(fp.getvalue(), "<main><p>streamed</p></main>")
+
+    def test_write_rejects_repeated_streamed_slot(self):
+        template = Template("{{ Content }}<hr>{{ Content }}")
+        fp = io.StringIO()
+        with self.assertRaises(ValueError):
+            template.write(fp, {"Content": lambda out: out.write("<p>once</p>")})
+        self.assertEqual(fp.getvalue(), "")
+        template.write(fp, {"Content": "<p>twice</p>"})
+        self.assertEqual(fp.getvalue(), "<p>twice</p><hr><p>twice</p>")
+
+    def test_equal_templates_hash_equal(self):
+        self.assertEqual(Template("<p>{{ X }}</p>"), Template("<p>{{ X }}</p>"))
+        self.assertEqual(len({Template("<p>{{ X }}</p>"), Template("<p>{{ X }}</p>")}), 1)
+
+    def test_compile_template_is_cached(self):
+        self.assertIs(compile_template("<p>{{ X }}</p>"), compile_template("<p>{{ X }}</p>"))
+
+    def test_load_template_reloads_changed_file(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("<b>{{ Title }}</b>")
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("<i>{{ Title }}</i>!")
+            self.assertEqual(load_template(path).render({"Title": "x"}), "<i>x</i>!")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from textnode import TextNode, TextType, text_node_to_html_node, text_nodes_to_html
 
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
@@ -33,6 +33,10 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.BOLD)
         self.assertNotEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_text_to_html_text(self):
         text_node = TextNode("This is a text node", TextType.TEXT)
         html_node = text_node_to_html_node(text_node)
@@ -60,6 +64,61 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.props["src"], "https://example.com/image.png")
         self.assertEqual(html_node.props["alt"], "alt text")
 
+    def test_text_to_html_italic_and_code(self):
+        self.assertEqual(text_node_to_html_node(TextNode("it", TextType.ITALIC)).to_html(), "<i>it</i>")
+        self.assertEqual(text_node_to_html_node(TextNode("x = 1", TextType.CODE)).to_html(), "<code>x = 1</code>")
+
+    def test_text_to_html_invalid_type(self):
+        with self.assertRaises(Exception):
+            text_node_to_html_node(TextNode("text", "underline"))
+
+    def test_text_nodes_to_html(self):
+        nodes = [
+            TextNode("This is ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("italic", TextType.ITALIC),
+            TextNode("code {0}", TextType.CODE),
+            TextNode("link", TextType.LINK, "https://boot.dev"),
+            TextNode("alt text", TextType.IMAGE, "https://example.com/image.png"),
+        ]
+        self.assertEqual(
+            text_nodes_to_html(nodes),
+            "".join(text_node_to_html_node(node).to_html() for node in nodes),
+        )
+
+    def test_text_nodes_to_html_minified_attributes(self):
+        nodes = [
+            TextNode("plain", TextType.TEXT),
+            TextNode("home", TextType.LINK, "/index.html"),
+            TextNode("a cat", TextType.IMAGE, "/cat.png"),
+        ]
+        self.assertEqual(
+            text_nodes_to_html(nodes, minify=True),
+            'plain<a href=/index.html>home</a><img src=/cat.png alt="a cat"></img>',
+        )
+
+    def test_text_nodes_to_html_empty(self):
+        self.assertEqual(text_nodes_to_html([]), "")
+
+    def test_text_nodes_to_html_invalid_type(self):
+        with self.assertRaises(Exception):
+            text_nodes_to_html([TextNode("text", "underline")])
+
+    def test_text_nodes_to_html_escapes_attributes(self):
+        nodes = [
+            TextNode("a & b", TextType.LINK, "/q?a=1&b=2"),
+            TextNode('say "hi"', TextType.IMAGE, "/img.png?w=1&h=2"),
+        ]
+        self.assertEqual(
+            text_nodes_to_html(nodes),
+            '<a href="/q?a=1&amp;b=2">a &amp; b</a><img src="/img.png?w=1&amp;h=2" alt="say &quot;hi&quot;"></img>',
+        )
+        self.assertEqual(
+            text_nodes_to_html(nodes),
+            "".join(text_node_to_html_node(node).to_html() for node in nodes),
+        )
+
 if __name__ == "__main__":
     unittest.main()
     
\ No newline at end of file
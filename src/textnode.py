@@ -1,6 +1,7 @@
 from enum import Enum
 
-from htmlnode import LeafNode
+from escaping import escape_attribute, escape_text
+from htmlnode import LeafNode, ParentNode
 
 class TextType(Enum):
     TEXT = "text"
@@ -11,6 +12,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -29,25 +32,145 @@ class TextNode:
             and self.url == other.url
         )
         
-def text_node_to_html_node(text_node):
-    if text_node.text_type == TextType.TEXT:
-        return LeafNode(None, text_node.text)
-    
-    elif text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
-    
-    elif text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
-    
-    elif text_node.text_type == TextType.CODE:
-        return LeafNode("code", text_node.text)
-    
-    elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    
-    elif text_node.text_type == TextType.IMAGE:
+def text_to_leaf(text_node):
+    return LeafNode(None, text_node.text)
+
+def bold_to_leaf(text_node):
+    return LeafNode("b", text_node.text)
+
+def italic_to_leaf(text_node):
+    return LeafNode("i", text_node.text)
+
+def code_to_leaf(text_node):
+    return LeafNode("code", text_node.text)
+
+def link_to_leaf(text_node, context=None):
+    text = text_node.text
+    # An empty link, "[](/about)", shows the title of the page it points
+    # to, or the URL when there is no such page.
+    if not text and context is not None and context.link_titles is not None:
+        title = context.link_titles.get(text_node.url)
+        text = text_node.url if title is None else title
+    url = text_node.url if context is None else context.url(text_node.url)
+    return LeafNode("a", text, {"href": url})
+
+def image_to_leaf(text_node, context=None):
+    if context is None:
         return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-    
-    else:
+
+    props = {"src": context.url(text_node.url), "alt": text_node.text}
+    if context.images is None:
+        return LeafNode("img", "", props)
+
+    # Every image loads lazily. A measured one also gets its size, so the
+    # page doesn't shift as it loads, and a <picture> of its resized copies
+    # when there are any.
+    info = context.images.get(text_node.url)
+    if info is not None:
+        props["width"] = str(info["width"])
+        props["height"] = str(info["height"])
+    props["loading"] = "lazy"
+    props["decoding"] = "async"
+    img = LeafNode("img", "", props)
+    if info is None or not info["sources"]:
+        return img
+
+    sizes = f"(max-width: {info['width']}px) 100vw, {info['width']}px"
+    sources = [
+        LeafNode("source", "", {"type": mime_type, "srcset": srcset, "sizes": sizes})
+        for mime_type, srcset in info["sources"]
+    ]
+    return ParentNode("picture", [*sources, img])
+
+HTML_NODE_CONVERTERS = {
+    TextType.TEXT: text_to_leaf,
+    TextType.BOLD: bold_to_leaf,
+    TextType.ITALIC: italic_to_leaf,
+    TextType.CODE: code_to_leaf,
+    TextType.LINK: link_to_leaf,
+    TextType.IMAGE: image_to_leaf,
+}
+
+# Types whose markup depends on the rest of the site, through a PageContext.
+CONTEXT_TEXT_TYPES = {TextType.LINK, TextType.IMAGE}
+
+class PageContext:
+    # What the links and images of one page need from the rest of the
+    # site: link_titles (a linkcheck.LinkTitles) names the pages empty links
+    # point to, images (a linkcheck.PageImages) measures images, and
+    # asset_map maps root-relative asset URLs to fingerprinted ones. Any of
+    # them may be None. minify serializes their attributes minified, since
+    # they are rendered to HTML fragments before the page is written.
+    __slots__ = ("link_titles", "images", "asset_map", "minify")
+
+    def __init__(self, link_titles=None, images=None, asset_map=None, minify=False):
+        self.link_titles = link_titles
+        self.images = images
+        self.asset_map = asset_map
+        self.minify = minify
+
+    def __repr__(self):
+        return (
+            f"PageContext(link_titles={self.link_titles!r}, images={self.images!r}, "
+            f"asset_map={self.asset_map!r}, minify={self.minify!r})"
+        )
+
+    def url(self, url):
+        if self.asset_map:
+            return self.asset_map.get(url, url)
+        return url
+
+def text_node_to_html_node(text_node, context=None):
+    converter = HTML_NODE_CONVERTERS.get(text_node.text_type)
+    if converter is None:
         raise Exception("Invalid TextType for text_node_to_html_node")
-    
\ No newline at end of file
+
+    if context is not None and text_node.text_type in CONTEXT_TEXT_TYPES:
+        return converter(text_node, context)
+    return converter(text_node)
+
+# Markup for each TextType, formatted with (text, url), so
+# text_nodes_to_html never has to build a LeafNode. Output is identical to
+# LeafNode.to_html for the converted node.
+INLINE_HTML_FORMATS = {
+    TextType.BOLD: "<b>{0}</b>",
+    TextType.ITALIC: "<i>{0}</i>",
+    TextType.CODE: "<code>{0}</code>",
+    TextType.LINK: '<a href="{1}">{0}</a>',
+    TextType.IMAGE: '<img src="{1}" alt="{0}"></img>',
+}
+
+def text_nodes_to_html(text_nodes, escape_needed=True, context=None, minify=False):
+    # Callers that have checked the source text with needs_escape can pass
+    # escape_needed=False to skip the per-node checks. With a context, or
+    # minified, links and images are built as nodes, which escape and
+    # minify themselves.
+    if escape_needed:
+        text_escape, attribute_escape = escape_text, escape_attribute
+    else:
+        text_escape = attribute_escape = str
+
+    parts = []
+    for text_node in text_nodes:
+        if text_node.text_type is TextType.TEXT:
+            parts.append(text_escape(text_node.text))
+            continue
+
+        if (context is not None or minify) and text_node.text_type in CONTEXT_TEXT_TYPES:
+            parts.append(text_node_to_html_node(text_node, context).to_html(minify))
+            continue
+
+        html_format = INLINE_HTML_FORMATS.get(text_node.text_type)
+        if html_format is None:
+            raise Exception("Invalid TextType for text_nodes_to_html")
+
+        if text_node.text_type is TextType.IMAGE:
+            text = attribute_escape(text_node.text)
+        else:
+            text = text_escape(text_node.text)
+        url = text_node.url
+        if url is not None:
+            url = attribute_escape(url)
+        parts.append(html_format.format(text, url))
+
+    return "".join(parts)
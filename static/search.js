@@ -0,0 +1,117 @@
+// Client for the index written by src/search.py. Tokenizing, stemming and
+// the shard encoding must match it exactly.
+//
+//   const results = await siteSearch("some words");
+//   // [{url, title, score}, ...], best first
+(function () {
+  const STEM_RULES = [
+    ["sses", "ss", 5],
+    ["ies", "y", 5],
+    ["ing", "", 6],
+    ["ed", "", 5],
+    ["ly", "", 5],
+    ["xes", "x", 5],
+    ["zzes", "zz", 6],
+    ["shes", "sh", 6],
+    ["tches", "tch", 7],
+    ["s", "", 4],
+  ];
+
+  function stem(token) {
+    for (const [suffix, replacement, minLength] of STEM_RULES) {
+      if (token.length >= minLength && token.endsWith(suffix)) {
+        if (suffix === "s" && token.endsWith("ss")) return token;
+        let stemmed = token.slice(0, -suffix.length) + replacement;
+        const last = stemmed[stemmed.length - 1];
+        if ((suffix === "ing" || suffix === "ed") && last === stemmed[stemmed.length - 2] && !"aeioulsz".includes(last)) {
+          stemmed = stemmed.slice(0, -1);
+        }
+        return stemmed;
+      }
+    }
+    return token;
+  }
+
+  function tokenize(text) {
+    return (text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || []).map(stem);
+  }
+
+  function decodeShard(bytes) {
+    let offset = 0;
+    const decoder = new TextDecoder();
+    function varint() {
+      let number = 0;
+      let scale = 1;
+      for (;;) {
+        const byte = bytes[offset++];
+        number += (byte & 0x7f) * scale;
+        if (byte < 0x80) return number;
+        scale *= 128;
+      }
+    }
+
+    const terms = new Map();
+    for (let count = varint(); count > 0; count--) {
+      const length = varint();
+      const term = decoder.decode(bytes.subarray(offset, offset + length));
+      offset += length;
+      const postings = new Map();
+      let doc = 0;
+      for (let documents = varint(); documents > 0; documents--) {
+        doc += varint();
+        const positions = [];
+        let position = 0;
+        for (let occurrences = varint(); occurrences > 0; occurrences--) {
+          position += varint();
+          positions.push(position);
+        }
+        postings.set(doc, positions);
+      }
+      terms.set(term, postings);
+    }
+    return terms;
+  }
+
+  const base = (document.currentScript && document.currentScript.dataset.index) || "/search/";
+  let index = null;
+  const shards = new Map();
+
+  function loadIndex() {
+    if (!index) index = fetch(base + "docs.json").then((response) => response.json());
+    return index;
+  }
+
+  function loadShard(name) {
+    if (!shards.has(name)) {
+      shards.set(name, fetch(`${base}${name}.bin`)
+        .then((response) => (response.ok ? response.arrayBuffer() : new ArrayBuffer(1)))
+        .then((buffer) => decodeShard(new Uint8Array(buffer))));
+    }
+    return shards.get(name);
+  }
+
+  async function siteSearch(query) {
+    const { prefix_length: prefixLength, docs } = await loadIndex();
+    const terms = [...new Set(tokenize(query))];
+    if (!terms.length) return [];
+
+    const postings = await Promise.all(terms.map(async (term) => {
+      const prefix = term.slice(0, prefixLength);
+      const shard = await loadShard(/^[a-z0-9]+$/.test(prefix) ? prefix : "_");
+      return shard.get(term) || new Map();
+    }));
+
+    // Every term must match; pages that use them more often rank higher.
+    const results = [];
+    for (const [doc, positions] of postings[0]) {
+      let score = positions.length;
+      if (postings.slice(1).every((other) => other.has(doc) && (score += other.get(doc).length))) {
+        const [url, title] = docs[doc];
+        results.push({ url, title, score });
+      }
+    }
+    return results.sort((a, b) => b.score - a.score);
+  }
+
+  window.siteSearch = siteSearch;
+})();